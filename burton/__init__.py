@@ -1,19 +1,25 @@
 import cProfile
+import csv
 import glob
 import logging
+import multiprocessing
 import os
 import re
 import subprocess
 import sys
+import time
 
 import database
+import outputfile
 import parser
 import translation
 import vcs
 
 from config import Config
-from logginghandler import BurtonLoggingHandler
+from localizationmanifest import LocalizationManifest
+from logginghandler import BufferingLoggingHandler, BurtonLoggingHandler
 from stringmapping import StringMapping
+from translationfilecache import TranslationFileCache
 
 logger_name = "extensis.burton"
 logging_handler = BurtonLoggingHandler()
@@ -207,17 +213,169 @@ def update_base_localizations(conf, vcs_class):
 
             vcs_class.add_file(output_path)
 
+def update_translation_files(
+    conf,
+    platform_translation_keys,
+    all_translation_keys,
+    vcs_class,
+    translation_files
+):
+    """Calls update_translation_file for each output language. If more than
+    one worker process is configured, the languages are updated in a process
+    pool, and the log records and VCS adds of each language are passed on in
+    language order once all of them have finished, as if they had been updated
+    one after another.
+    """
+    languages = conf.get(Config.output_languages)
+    processes = conf.get(Config.worker_processes)
+
+    platform_translation_keys = index_translation_keys(
+        platform_translation_keys
+    )
+    all_translation_keys = index_translation_keys(all_translation_keys)
+
+    if processes == 1 or len(languages) < 2:
+        for language in languages:
+            update_translation_file(
+                conf,
+                platform_translation_keys,
+                all_translation_keys,
+                language,
+                vcs_class,
+                translation_files
+            )
+
+        return
+
+    if processes < 1:
+        processes = multiprocessing.cpu_count()
+
+    logger     = logging.getLogger(logger_name)
+    work_items = [ ]
+    for language in languages:
+        work_items.append((
+            logger.getEffectiveLevel(),
+            conf,
+            platform_translation_keys,
+            all_translation_keys,
+            language,
+            translation_files.lookup(
+                _get_translation_file_path(conf, language),
+                _get_translation_file_settings(conf, language)
+            ),
+        ))
+
+    pool = multiprocessing.Pool(min(processes, len(languages)))
+    try:
+        results = pool.map(_update_translation_file_in_worker, work_items)
+    finally:
+        pool.close()
+        pool.join()
+
+    for language, (
+        records,
+        deferred_vcs,
+        translation_file,
+        filename,
+        exception
+    ) in zip(languages, results):
+        for record in records:
+            logger.handle(record)
+
+        deferred_vcs.replay(vcs_class)
+
+        if exception is not None:
+            raise exception
+
+        translation_files.add(
+            filename,
+            translation_file,
+            _get_translation_file_settings(conf, language)
+        )
+
+def _update_translation_file_in_worker(work_item):
+    """Updates the translation file for one language in a worker process,
+    returning its log records, its VCS adds, and the updated translation object
+    instead of logging, adding and caching them.
+    """
+    logging_level, conf, platform_translation_keys, all_translation_keys, \
+        language, translation_file = work_item
+
+    filename          = _get_translation_file_path(conf, language)
+    settings          = _get_translation_file_settings(conf, language)
+    deferred_vcs      = vcs.Deferred()
+    translation_files = TranslationFileCache()
+    if translation_file is not None:
+        translation_files.add(filename, translation_file, settings)
+
+    buffering_handler, saved_state = _start_buffering_log_records(
+        logging_level
+    )
+
+    exception = None
+    try:
+        update_translation_file(
+            conf,
+            platform_translation_keys,
+            all_translation_keys,
+            language,
+            deferred_vcs,
+            translation_files
+        )
+
+        translation_file = translation_files.lookup(filename, settings)
+
+    except Exception as e:
+        exception        = e
+        translation_file = None
+
+    finally:
+        _stop_buffering_log_records(saved_state)
+
+    return (
+        buffering_handler.records,
+        deferred_vcs,
+        translation_file,
+        filename,
+        exception
+    )
+
+def _start_buffering_log_records(logging_level):
+    """Sends the records logged in a worker process to a
+    BufferingLoggingHandler instead of its usual handlers, so that they can be
+    passed back to the burton process. Returns the handler, and the state to
+    pass to _stop_buffering_log_records() to restore the usual handlers.
+    """
+    logger            = logging.getLogger(logger_name)
+    buffering_handler = BufferingLoggingHandler()
+    saved_state       = (logger.handlers, logger.propagate)
+
+    logger.handlers  = [ buffering_handler ]
+    logger.propagate = False
+    logger.setLevel(logging_level)
+
+    return buffering_handler, saved_state
+
+def _stop_buffering_log_records(saved_state):
+    logger                            = logging.getLogger(logger_name)
+    logger.handlers, logger.propagate = saved_state
+
 def update_translation_file(
     conf,
     platform_translation_keys,
     all_translation_keys,
     language,
-    vcs_class
+    vcs_class,
+    translation_files = None
 ):
-    translation_file, filename = _open_translation_file_for_language(
+    if translation_files is None:
+        translation_files = TranslationFileCache()
+
+    translation_file, filename = _get_translation_file(
         conf,
         language,
-        vcs_class
+        vcs_class,
+        translation_files
     )
     translation_dict = translation_file.translation_dict
 
@@ -251,27 +409,48 @@ def update_translation_file(
     translation_file.write(file)
     file.close()
 
-    translation_file, filename = _open_translation_file_for_language(
-        conf,
-        language,
-        vcs_class
-    )
+    translation_files.update(filename)
+
+    # Existing files were added when they were opened, but the changes just
+    # written, and files created by this run, still need to be added
+    if conf.get(Config.use_vcs):
+        vcs_class.add_file(
+            conf.get(Config.files_by_language)[language],
+            os.path.abspath(conf.get(Config.xlf_repo_path))
+        )
 
     _check_for_untranslated_strings(translation_file, filename)
 
+class _TranslationKeyIndex(frozenset):
+    """A set of translation keys which have already been filtered with
+    parser.replace_params"""
+
+def index_translation_keys(translation_keys):
+    """Returns a set of the translation keys as they are stored in translation
+    files, with their params replaced by parser.replace_params. Building the
+    set once for each platform and passing it to update_translation_file for
+    every language avoids filtering every key again for each language, and
+    makes checking whether a key is in use a hash lookup.
+
+    Passing a set returned by this function returns it unchanged.
+    """
+    if isinstance(translation_keys, _TranslationKeyIndex):
+        return translation_keys
+
+    return _TranslationKeyIndex(
+        parser.replace_params(key)[0] for key in translation_keys
+    )
+
 def _add_new_keys_to_translation_file(
     translation_keys,
     translation_dict,
     translation_file
 ):
-    replaced_translation_keys = [ ]
-    for key in translation_keys:
-        filtered_string, replaced_params = parser.replace_params(key)
-        replaced_translation_keys.append(filtered_string)
+    for translation_key in index_translation_keys(translation_keys):
+        # Blank keys are never written to the translation file
+        if translation_key.strip() == "":
+            continue
 
-    translation_keys = replaced_translation_keys
-
-    for translation_key in translation_keys:
         if translation_key not in translation_dict:
             translation_file.add_translation(translation_key, None)
 
@@ -281,13 +460,9 @@ def _remove_unused_strings_from_language_file(
     translation_file,
     filename
 ):
-    replaced_translation_keys = []
+    replaced_translation_keys = index_translation_keys(translation_keys)
     strings_to_remove         = []
 
-    for key in translation_keys:
-        replaced_key, replaced_params = parser.replace_params(key)
-        replaced_translation_keys.append(replaced_key)
-
     for key in translation_dict:
         if key is not None and key not in replaced_translation_keys and \
           translation_dict[key] is None:
@@ -316,21 +491,31 @@ def _check_for_untranslated_strings(translation_file, filename):
         logger = logging.getLogger(logger_name)
         logger.warning("There are untranslated strings in " + filename)
 
-def create_localized_resources(conf, native_strings, vcs_class):
+def create_localized_resources(
+    conf,
+    native_strings,
+    vcs_class,
+    translation_files = None
+):
     logger = logging.getLogger(logger_name)
     logger.info("Creating localized resources")
 
-    orig_path = os.getcwd()
-    os.chdir(conf.get(Config.root_path))
+    if translation_files is None:
+        translation_files = TranslationFileCache()
 
+    # Translation file paths are relative to the directory burton was run from
+    translation_dicts = [ ]
     for language in conf.get(Config.output_languages):
-        translation_file, filename = _open_translation_file_for_language(
+        translation_file, filename = _get_translation_file(
             conf,
             language,
-            vcs_class
+            vcs_class,
+            translation_files
         )
 
-        translation_dict = translation_file.translation_dict
+        # The translation file is shared with the rest of the run, so mark and
+        # restore params in a copy of its translations
+        translation_dict = dict(translation_file.translation_dict)
 
         _mark_untranslated_strings(translation_dict)
 
@@ -339,60 +524,378 @@ def create_localized_resources(conf, native_strings, vcs_class):
             translation_dict
         )
 
-        paths = []
+        translation_dicts.append((language, translation_dict))
+
+    orig_path = os.getcwd()
+    os.chdir(conf.get(Config.root_path))
 
-        if conf.get(Config.recursive_localization):
-            for root, dirs, files in os.walk(conf.get(Config.source_path)):
-                for dir in dirs:
-                    paths.append(os.path.join(root, dir))
+    paths = []
 
-                paths.append(root)
-        else:
-            paths = conf.get(Config.paths_to_localize)
+    if conf.get(Config.recursive_localization):
+        for root, dirs, files in os.walk(conf.get(Config.source_path)):
+            for dir in dirs:
+                paths.append(os.path.join(root, dir))
 
-        for path in paths:
-            path = os.path.join(conf.get(Config.root_path), path)
-            for listing in os.listdir(path):
-                disallowed_file = False
-                for disallowed_path in conf.get(Config.disallowed_paths):
-                    if disallowed_path.search(listing) is not None:
-                        disallowed_file = True
-
-                if disallowed_file:
-                    continue
-
-                for extension in conf.get(Config.extensions_to_localize):
-                    if listing.endswith(extension):
-                        localized_resource = _get_localized_resource_instance(
-                            conf,
-                            extension
-                        )
+            paths.append(root)
+    else:
+        paths = conf.get(Config.paths_to_localize)
 
-                        output_dir = conf.get(Config.localization_output_dir)
-                        if output_dir == "None":
-                            output_dir = path
-                        else:
-                            output_dir = os.path.join(
-                                conf.get(Config.root_path),
-                                output_dir
-                            )
-
-                        localized_resource.translate(
-                            os.path.join(path, listing),
-                            output_dir,
-                            translation_dict,
-                            language,
-                            conf.get(Config.language_codes)[language],
-                            conf.get(Config.use_vcs),
-                            vcs_class,
-                            conf.get(Config.project_path)
+    work_items = [ ]
+    for path in paths:
+        path = os.path.join(conf.get(Config.root_path), path)
+        for listing in os.listdir(path):
+            disallowed_file = False
+            for disallowed_path in conf.get(Config.disallowed_paths):
+                if disallowed_path.search(listing) is not None:
+                    disallowed_file = True
+
+            if disallowed_file:
+                continue
+
+            for extension in conf.get(Config.extensions_to_localize):
+                if listing.endswith(extension):
+                    output_dir = conf.get(Config.localization_output_dir)
+                    if output_dir == "None":
+                        output_dir = path
+                    else:
+                        output_dir = os.path.join(
+                            conf.get(Config.root_path),
+                            output_dir
                         )
 
-    os.chdir(orig_path)
+                    work_items.append(
+                        (os.path.join(path, listing), extension, output_dir)
+                    )
+
+    try:
+        _localize_resources(conf, work_items, translation_dicts, vcs_class)
+    finally:
+        os.chdir(orig_path)
+
+def _localize_resources(conf, work_items, translation_dicts, vcs_class):
+    """Translates each resource file in work_items, which are tuples of its
+    filename, extension and output directory, into every language at once, so
+    that parsers only need to read and parse it once. If more than one worker
+    process is configured, the files are translated in a process pool, and the
+    log records and VCS adds of each file are passed on in order, as if they
+    had been translated one after another.
+
+    If a localization manifest is configured, outputs whose inputs have not
+    changed since they were last written are skipped. Localized files are added
+    to the project file, if one is configured, once they have all been written.
+    """
+    logger          = logging.getLogger(logger_name)
+    processes       = conf.get(Config.worker_processes)
+    start           = time.time()
+    skipped         = 0
+    proj_file_edits = parser.ProjectFileEdits()
+
+    manifest      = None
+    manifest_path = conf.get(Config.localization_manifest_path)
+    if manifest_path != "None":
+        manifest = LocalizationManifest(
+            os.path.join(conf.get(Config.root_path), manifest_path),
+            conf.get(Config.root_path)
+        )
+
+    try:
+        if processes == 1 or len(work_items) < 2:
+            for work_item in work_items:
+                item_start = time.time()
+                entries, item_skipped = _localize_resource(
+                    conf,
+                    work_item,
+                    translation_dicts,
+                    vcs_class,
+                    manifest,
+                    proj_file_edits
+                )
+                _log_localization_time(work_item, time.time() - item_start)
+
+                for key, entry in entries:
+                    manifest.set(key, entry)
+
+                skipped += item_skipped
+
+        else:
+            if processes < 1:
+                processes = multiprocessing.cpu_count()
+
+            # Worker processes start in the current directory, the root path,
+            # so they never need to change it
+            pool = multiprocessing.Pool(
+                min(processes, len(work_items)),
+                _initialize_localization_worker,
+                (logger.getEffectiveLevel(), conf, translation_dicts, manifest)
+            )
+
+            try:
+                for result in pool.imap(
+                    _localize_resource_in_worker,
+                    work_items
+                ):
+                    records, deferred_vcs, entries, item_skipped, \
+                        item_proj_file_edits, exception = result
+
+                    for record in records:
+                        logger.handle(record)
+
+                    deferred_vcs.replay(vcs_class)
+
+                    if exception is not None:
+                        raise exception
+
+                    for key, entry in entries:
+                        manifest.set(key, entry)
+
+                    skipped += item_skipped
+                    proj_file_edits.extend(item_proj_file_edits)
+
+                pool.close()
+
+            except Exception:
+                pool.terminate()
+                raise
+
+            finally:
+                pool.join()
+
+        proj_file_edits.save(conf.get(Config.use_vcs), vcs_class)
+
+    finally:
+        if manifest is not None:
+            manifest.save()
+
+    logger.info(
+        "Localized " + str(len(work_items)) + " resource files in " +
+            "{0:.2f}".format(time.time() - start) + " seconds"
+    )
+
+    if manifest is not None:
+        logger.info(
+            "Skipped " + str(skipped) + " localized resources which had not " +
+                "changed"
+        )
+
+def _localize_resource(
+    conf,
+    work_item,
+    translation_dicts,
+    vcs_class,
+    manifest = None,
+    proj_file_edits = None
+):
+    """Translates one resource file into every language, skipping languages
+    whose output is current in manifest, and collecting its project file edits
+    in proj_file_edits. Returns a list of the manifest key and entry to record
+    for each language which was translated, and the number of languages which
+    were skipped. Skipped outputs are still added to proj_file_edits, so that
+    they are added back to the project file if they were removed from it.
+    """
+    input_filename, extension, output_dir = work_item
+
+    localized_resource = _get_localized_resource_instance(conf, extension)
+    localized_resource.proj_file_edits = proj_file_edits
+    translations = [
+        (
+            output_dir,
+            translation_dict,
+            language,
+            conf.get(Config.language_codes)[language],
+        )
+        for language, translation_dict in translation_dicts
+    ]
+
+    source_hash = None
+    if manifest is not None:
+        source_hash = outputfile.hash_file(input_filename)
+
+    if source_hash is None:
+        localized_resource.translate_languages(
+            input_filename,
+            translations,
+            conf.get(Config.use_vcs),
+            vcs_class,
+            conf.get(Config.project_path)
+        )
+
+        return [ ], 0
+
+    logger           = logging.getLogger(logger_name)
+    translation_keys = localized_resource.get_translation_keys(input_filename)
+    entries          = [ ]
+    changed          = [ ]
+    skipped          = [ ]
+
+    for translation in translations:
+        output_directory, mapping, language, language_code = translation
+        key = manifest.get_key(input_filename, language)
+        inputs_hash = manifest.get_inputs_hash(
+            source_hash,
+            [
+                localized_resource.__class__.__name__,
+                manifest.get_relative_path(output_directory),
+                language_code,
+                conf.get(Config.use_vcs),
+                conf.get(Config.project_path),
+            ],
+            mapping,
+            translation_keys
+        )
+
+        if manifest.is_current(key, inputs_hash):
+            logger.debug(
+                "Skipped localizing " + input_filename + " into " + language +
+                    ", which has not changed"
+            )
+            skipped.append(translation)
+        else:
+            changed.append((key, inputs_hash, translation))
+
+    if len(skipped) > 0:
+        localized_resource.add_proj_file_edits(
+            input_filename,
+            skipped,
+            conf.get(Config.project_path)
+        )
+
+    if len(changed) > 0:
+        output_filenames = localized_resource.translate_languages(
+            input_filename,
+            [ translation for key, inputs_hash, translation in changed ],
+            conf.get(Config.use_vcs),
+            vcs_class,
+            conf.get(Config.project_path)
+        )
+
+        for index, (key, inputs_hash, translation) in enumerate(changed):
+            entries.append((
+                key,
+                manifest.create_entry(inputs_hash, [ output_filenames[index] ])
+            ))
+
+    return entries, len(skipped)
+
+def _log_localization_time(work_item, elapsed):
+    logger = logging.getLogger(logger_name)
+    logger.debug(
+        "Localized " + work_item[0] + " in " + "{0:.3f}".format(elapsed) +
+            " seconds"
+    )
+
+_localization_worker_state = None
+
+def _initialize_localization_worker(
+    logging_level,
+    conf,
+    translation_dicts,
+    manifest
+):
+    """Keeps the configuration, translations and manifest in each worker
+    process, so that they are only sent to it once rather than with every
+    resource file.
+    """
+    global _localization_worker_state
+    _localization_worker_state = (
+        logging_level,
+        conf,
+        translation_dicts,
+        manifest
+    )
+
+def _localize_resource_in_worker(work_item):
+    """Translates one resource file in a worker process, returning its log
+    records, its VCS adds, the manifest entries to record and its project file
+    edits instead of logging, adding, recording and saving them.
+    """
+    logging_level, conf, translation_dicts, manifest = \
+        _localization_worker_state
+
+    deferred_vcs      = vcs.Deferred()
+    buffering_handler, saved_state = _start_buffering_log_records(
+        logging_level
+    )
+
+    entries         = [ ]
+    skipped         = 0
+    proj_file_edits = parser.ProjectFileEdits()
+    exception       = None
+    start           = time.time()
+    try:
+        entries, skipped = _localize_resource(
+            conf,
+            work_item,
+            translation_dicts,
+            deferred_vcs,
+            manifest,
+            proj_file_edits
+        )
+        _log_localization_time(work_item, time.time() - start)
+
+    except Exception as e:
+        exception = e
+
+    finally:
+        _stop_buffering_log_records(saved_state)
+
+    return (
+        buffering_handler.records,
+        deferred_vcs,
+        entries,
+        skipped,
+        proj_file_edits,
+        exception,
+    )
 
 def _get_localized_resource_instance(conf, extension):
     cls = _class_from_string(conf.get(Config.parsers_by_extension)[extension])
-    return cls()
+    localized_resource = cls()
+
+    template_cache_path = conf.get(Config.template_cache_path)
+    if template_cache_path != "None":
+        localized_resource.template_cache = parser.TemplateCache(
+            os.path.join(conf.get(Config.root_path), template_cache_path)
+        )
+
+    return localized_resource
+
+def _get_translation_file(conf, language, vcs_class, translation_files):
+    """Returns a tuple of the translation object for language and the full
+    path to its file, which is only opened if it is not already in
+    translation_files with the same settings.
+    """
+    full_path = _get_translation_file_path(conf, language)
+    translation_file = translation_files.get(
+        full_path,
+        lambda : _open_translation_file_for_language(
+            conf,
+            language,
+            vcs_class
+        )[0],
+        _get_translation_file_settings(conf, language)
+    )
+
+    return translation_file, full_path
+
+def _get_translation_file_path(conf, language):
+    return os.path.join(
+        os.path.abspath(conf.get(Config.xlf_repo_path)),
+        conf.get(Config.files_by_language)[language]
+    )
+
+def _get_translation_file_settings(conf, language):
+    """Returns the config values which the translation object for language
+    is created with. These can differ between platforms, so a translation
+    object cached for one platform is only reused by another if they match.
+    """
+    return (
+        conf.get(Config.translation_files_class),
+        conf.get(Config.language_codes)[language],
+        conf.get(Config.language_codes)[conf.get(Config.native_language)],
+        conf.get(Config.company_name),
+        conf.get(Config.product_name),
+        conf.get(Config.contact_email),
+    )
 
 def _open_translation_file_for_language(conf, language, vcs_class):
     filename = conf.get(Config.files_by_language)[language]
@@ -465,14 +968,108 @@ def _mark_untranslated_strings(translation_dict):
 
     return translation_dict
 
+def write_coverage_report(db, output_file):
+    """Writes a tab-separated matrix to output_file with a row for every
+    translation key in the database and a column for every platform, marking
+    the platforms each key is mapped on. Rows are written as they are read from
+    the database.
+    """
+    platforms = db.get_platforms()
+
+    writer = csv.writer(output_file, dialect = "excel-tab")
+    writer.writerow(
+        [ "Translation Key" ] + [ _encode_report_value(p) for p in platforms ]
+    )
+
+    for translation_key, key_platforms in db.iter_translation_key_coverage():
+        writer.writerow(
+            [ _encode_report_value(translation_key) ] +
+            [ "x" if p in key_platforms else "" for p in platforms ]
+        )
+
+def write_differences_report(db, output_file):
+    """Writes a tab-separated matrix to output_file with a row for every
+    translation key whose native translation differs between platforms, and a
+    column with the native translation on each platform. Rows are written as
+    they are read from the database.
+    """
+    platforms = db.get_platforms()
+
+    writer = csv.writer(output_file, dialect = "excel-tab")
+    writer.writerow(
+        [ "Translation Key" ] + [ _encode_report_value(p) for p in platforms ]
+    )
+
+    for translation_key, translations in \
+      db.iter_native_translation_differences():
+        writer.writerow(
+            [ _encode_report_value(translation_key) ] +
+            [ _encode_report_value(translations.get(p, u"")) for p in platforms ]
+        )
+
+def _encode_report_value(value):
+    if isinstance(value, unicode):
+        return value.encode("utf-8")
+
+    return value
+
+_reports = {
+    "coverage"    : write_coverage_report,
+    "differences" : write_differences_report,
+}
+
+def report():
+    """Writes the report named by the first command-line argument, either
+    coverage or differences, to stdout. The remaining arguments are parsed as
+    in run(), and the database is located using the config for the first
+    platform in the config file. The database is only read, and is closed
+    without being saved.
+    """
+    setup_default_logger()
+    logger = logging.getLogger(logger_name)
+
+    if len(sys.argv) < 2 or sys.argv[1] not in _reports:
+        logger.error(
+            "usage: python " + sys.argv[0] + " [" +
+                "|".join(sorted(_reports)) + "] [path] [arguments]"
+        )
+        exit(1)
+
+    conf = _create_config_instance()
+    if not conf.parse_command_line_options(sys.argv[0], sys.argv[2:]):
+        logger.error("Unable to parse command-line options")
+        exit(1)
+
+    elif not conf.parse_config_file_for_next_platform():
+        logger.error("Unable to parse config file")
+        exit(1)
+
+    db = _create_db_instance(conf)
+    db.connect()
+
+    try:
+        _reports[sys.argv[1]](db, sys.stdout)
+    finally:
+        db.close()
+
 def _create_config_instance():
     return Config()
 
 def _create_db_instance(conf):
-    return database.SQLite(os.path.join(
+    filename = os.path.join(
         os.path.abspath(conf.get(Config.xlf_repo_path)),
         conf.get(Config.database_path)
-    ))
+    )
+
+    cls = _class_from_string(conf.get(Config.database_adaptor))
+    if isinstance(cls, type) and cls is not database.SQLite:
+        return cls(filename)
+
+    return database.SQLite(
+        filename,
+        in_memory = conf.get(Config.database_in_memory),
+        pragmas   = conf.get(Config.database_pragmas)
+    )
 
 def run():
     setup_default_logger()
@@ -488,6 +1085,10 @@ def run():
 
     orig_path = os.getcwd()
 
+    # Platforms usually share translation files, so they are kept for the
+    # whole run
+    translation_files = TranslationFileCache()
+
     while conf.num_remaining_platforms() > 0:
         os.chdir(orig_path)
 
@@ -544,28 +1145,48 @@ def run():
                     string_mapping.string_mapping_dict,
                 )
 
-                for language in conf.get(Config.output_languages):
-                    update_translation_file(
-                        conf,
-                        db.get_native_translations_for_platform(
-                            conf.get(Config.platform)
-                        ),
-                        db.get_all_native_translations(),
-                        language,
-                        vcs_class
-                   )
+                platform_translation_keys = \
+                    db.get_native_translations_for_platform(
+                        conf.get(Config.platform)
+                    )
+
+                update_translation_files(
+                    conf,
+                    platform_translation_keys,
+                    db.get_all_native_translations(),
+                    vcs_class,
+                    translation_files
+                )
 
                 create_localized_resources(
                     conf,
-                    db.get_native_translations_for_platform(
-                        conf.get(Config.platform)
-                    ),
-                    vcs_class
+                    platform_translation_keys,
+                    vcs_class,
+                    translation_files
                 )
 
-                db.disconnect()
+                # The dump is measured just before and after pruning, so that
+                # the mapping written above is not counted as shrinkage
+                prune_interval = conf.get(Config.database_prune_interval)
+                if prune_interval > 0 and db.is_prune_due(prune_interval):
+                    dump_size  = db.get_dump_size()
+                    num_pruned = db.prune_if_due(
+                        prune_interval,
+                        conf.get(Config.database_prune_age)
+                    )
+                    pruned_dump_size = db.get_dump_size()
 
-                if should_use_vcs:
+                    logger.info(
+                        "Pruned " + str(num_pruned) + " unused translation " +
+                            "keys, which shrank the database by " +
+                            str(dump_size - pruned_dump_size) + " bytes, " +
+                            "from " + str(dump_size) + " to " +
+                            str(pruned_dump_size) + " bytes"
+                    )
+
+                database_changed = db.disconnect()
+
+                if should_use_vcs and database_changed:
                     vcs_class.add_file(db.filename, xlf_repo_path)
 
                 if conf.get(Config.commit_vcs):
@@ -581,6 +1202,7 @@ def run():
                 logger.exception(e)
                 logger.error("Reverting checkout")
                 vcs_class.revert_all(xlf_repo_path)
+                translation_files.clear()
             finally:
                 logger.info(
                     "Finished running for platform " + conf.get(Config.platform)
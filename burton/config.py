@@ -50,6 +50,13 @@ class Config(object):
     strings_to_ignore_file   = "strings_to_ignore_file"
     database_adaptor         = "database_adaptor"
     database_path            = "database_path"
+    database_in_memory       = "database_in_memory"
+    database_pragmas         = "database_pragmas"
+    database_prune_interval  = "database_prune_interval"
+    database_prune_age       = "database_prune_age"
+    worker_processes         = "worker_processes"
+    template_cache_path      = "template_cache_path"
+    localization_manifest_path = "localization_manifest_path"
     logging_level            = "logging_level"
     vcs_class                = "vcs_class"
     extensions_to_parse      = "extensions_to_parse"
@@ -86,6 +93,13 @@ class Config(object):
         strings_to_ignore_file   : strings_to_ignore_file,
         database_adaptor         : None,
         database_path            : None,
+        database_in_memory       : "false",
+        database_pragmas         : "{}",
+        database_prune_interval  : "7",
+        database_prune_age       : "90",
+        worker_processes         : "1",
+        template_cache_path      : '"None"',
+        localization_manifest_path : '"None"',
         logging_level            : '"info"',
         vcs_class                : '"vcs.NoOp"',
         extensions_to_parse      : None,
@@ -1 +1,5 @@
 from sqlite import SQLite
+from flatfile import FlatFile
+from mergeconflict import MergeConflict
+from merge import merge_databases
+from util import *
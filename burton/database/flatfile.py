@@ -0,0 +1,488 @@
+import datetime
+import heapq
+import itertools
+import os
+import re
+import urllib
+
+from burton import parser
+
+class FlatFile(object):
+    """Implements the same interface as SQLite, but stores the database as a
+    directory of sorted, line-oriented UTF-8 text files instead of a SQL dump.
+
+    The directory contains a translation_keys file, with one key and the time
+    it was last updated per line, and a platforms directory, with one file per
+    platform mapping each key to its native translation. Every file is sorted
+    by key, so adding, changing or removing a string only changes the lines for
+    that string, and nothing has to be replayed into a database on connect.
+
+    Nothing is loaded on connect. The translation_keys file is streamed line
+    by line, and so are the platform files when the coverage and differences
+    reports read them. Every other operation on a platform needs its whole
+    mapping, so a platform file is loaded into memory in full the first time
+    one of them uses it. Changes are kept in memory and written on disconnect.
+    Files whose contents did not change are left untouched.
+
+    Platform names are percent-encoded to make their filenames, so that a name
+    can never refer to a file outside the platforms directory.
+
+    Replaced params are not stored, since they can always be recomputed from
+    the native translations with burton.parser.replace_params.
+
+    Keys removed by remove_old_unmapped_strings are archived in the
+    defunct_translations file, and the time prune_if_due last ran is recorded
+    in the maintenance file.
+    """
+
+    keys_filename        = "translation_keys"
+    platforms_dirname    = "platforms"
+    defunct_filename     = "defunct_translations"
+    maintenance_filename = "maintenance"
+
+    _escape_regex       = re.compile(r"\\(.)")
+    _escaped_characters = { "t" : "\t", "n" : "\n", "r" : "\r" }
+
+    _unsafe_filename_regex = re.compile(r"[^A-Za-z0-9 ._-]")
+
+    def __init__(self, filename):
+        object.__init__(self)
+        self.filename = filename
+
+        self._mappings          = { }
+        self._changed_platforms = set([])
+        self._key_updates       = { }
+        self._deleted_keys      = set([])
+        self._defunct_keys      = { }
+        self._maintenance       = { }
+        self._query_cache       = { }
+
+    def update_from_vcs(self, vcs, submodule_path = None):
+        """Gets the latest version of the database from VCS and opens it for
+        editing. If using VCS, call this method before calling connect.
+        """
+
+        full_path = os.path.abspath(self.filename)
+        vcs.add_file(full_path, submodule_path)
+
+    def connect(self):
+        """Opens the database directory, creating it if it does not exist."""
+        self._mappings.clear()
+        self._changed_platforms.clear()
+        self._key_updates.clear()
+        self._deleted_keys.clear()
+        self._defunct_keys.clear()
+        self._maintenance.clear()
+        self._query_cache.clear()
+
+        platforms_path = self._platforms_path()
+        if not os.path.isdir(platforms_path):
+            os.makedirs(platforms_path)
+
+    def disconnect(self):
+        """Writes any changes to the database directory and closes it.
+
+        Returns True if any file was written, or False if the contents of the
+        database were unchanged.
+        """
+        contents_by_path = self._get_changed_contents()
+
+        self.close()
+
+        saved = False
+        for path in sorted(contents_by_path):
+            if self._write_if_changed(path, contents_by_path[path]):
+                saved = True
+
+        return saved
+
+    def get_dump_size(self):
+        """Returns the total size in bytes of the files in the database
+        directory once disconnect has written the changes made to it.
+        """
+        contents_by_path = self._get_changed_contents()
+        size = sum(len(contents) for contents in contents_by_path.values())
+
+        for root, subdirs, files in os.walk(self.filename):
+            for file in files:
+                path = os.path.join(root, file)
+                if path not in contents_by_path:
+                    size += os.path.getsize(path)
+
+        return size
+
+    def _get_changed_contents(self):
+        """Returns the new contents of every file which may have changed since
+        connecting, by path.
+        """
+        contents_by_path = { }
+
+        if len(self._key_updates) > 0 or len(self._deleted_keys) > 0:
+            contents_by_path[self._keys_path()] = "".join(
+                "%s\t%s\n" % (escaped_key, last_updated)
+                for escaped_key, last_updated in self._iter_translation_keys()
+            )
+
+        for filename, updates in [
+            (FlatFile.defunct_filename,     self._defunct_keys),
+            (FlatFile.maintenance_filename, self._maintenance),
+        ]:
+            if len(updates) > 0:
+                path = os.path.join(self.filename, filename)
+                lines = dict(self._read_lines(path))
+                lines.update(updates)
+                contents_by_path[path] = "".join(
+                    "%s\t%s\n" % line for line in sorted(lines.items())
+                )
+
+        for platform in self._changed_platforms:
+            mapping = self._mappings[platform]
+            contents_by_path[self._platform_path(platform)] = "".join(
+                "%s\t%s\n" % (escaped_key, self._escape(mapping[key]))
+                for escaped_key, key in sorted(
+                    (self._escape(key), key) for key in mapping
+                )
+            )
+
+        return contents_by_path
+
+    def close(self):
+        """Closes the database directory without writing any changes."""
+        self._query_cache.clear()
+
+    def write_string_mapping_for_platform(self, platform, mapping):
+        """Replaces the mapping for the platform with the one passed in. Keys
+        whose native translations were added, changed or removed have their
+        last updated time set to the current time, as in SQLite.
+        """
+        self._query_cache.clear()
+
+        current_time = self._get_current_time()
+        old_mapping  = self._get_mapping(platform)
+        new_mapping  = { }
+
+        for key in old_mapping:
+            if key not in mapping:
+                self._touch_key(key, current_time)
+
+        for key in mapping:
+            translation = mapping[key]
+            if old_mapping.get(key) != translation:
+                self._touch_key(key, current_time)
+
+            new_mapping[key] = translation
+
+        if new_mapping != old_mapping or \
+          not os.path.exists(self._platform_path(platform)):
+            self._changed_platforms.add(platform)
+
+        self._mappings[platform] = new_mapping
+
+    def get_all_translation_keys(self):
+        return [
+            self._unescape(escaped_key)
+            for escaped_key, last_updated in self._iter_translation_keys()
+        ]
+
+    def get_all_native_translations(self):
+        cache_key = ("all_native_translations",)
+        if cache_key not in self._query_cache:
+            translations = set([])
+            for platform in self.get_platforms():
+                translations.update(self._get_mapping(platform).values())
+
+            self._query_cache[cache_key] = frozenset(translations)
+
+        return self._query_cache[cache_key]
+
+    def get_native_translations_for_platform(self, platform):
+        cache_key = ("native_translations_for_platform", platform)
+        if cache_key not in self._query_cache:
+            self._query_cache[cache_key] = frozenset(
+                self._get_mapping(platform).values()
+            )
+
+        return self._query_cache[cache_key]
+
+    def get_string_mapping_for_platform(self, platform):
+        return dict(self._get_mapping(platform))
+
+    def iter_translation_key_coverage(self):
+        """Yields each translation key, in sorted order, with a frozenset of the
+        platforms it has a native translation on. Keys which are not mapped on
+        any platform are yielded with an empty frozenset.
+
+        The platform files are merged line by line, so only one key is held in
+        memory at a time for platforms which have not been written to.
+        """
+        rows = itertools.groupby(
+            self._iter_platform_rows(),
+            lambda(row) : row[0]
+        )
+        next_group = next(rows, None)
+
+        for escaped_key, last_updated in self._iter_translation_keys():
+            while next_group is not None and next_group[0] < escaped_key:
+                next_group = next(rows, None)
+
+            platforms = frozenset([])
+            if next_group is not None and next_group[0] == escaped_key:
+                platforms = frozenset(row[1] for row in next_group[1])
+                next_group = next(rows, None)
+
+            yield self._unescape(escaped_key), platforms
+
+    def iter_native_translation_differences(self):
+        """Yields each translation key, in sorted order, whose native
+        translation is not the same on every platform it is mapped on, with a
+        dictionary mapping each of those platforms to its native translation.
+
+        Translations are compared after their params are replaced, so "%@" on
+        one platform and "{0}" on another are not a difference.
+        """
+        for escaped_key, rows in itertools.groupby(
+            self._iter_platform_rows(),
+            lambda(row) : row[0]
+        ):
+            translations = dict(
+                (row[1], self._unescape(row[2])) for row in rows
+            )
+            if len(set(translations.values())) > 1 and len(set(
+                parser.replace_params(translation)[0]
+                for translation in translations.values()
+            )) > 1:
+                yield self._unescape(escaped_key), translations
+
+    def get_platforms(self):
+        platforms = set(self._mappings)
+        platforms.update(
+            urllib.unquote(filename).decode("utf-8")
+            for filename in os.listdir(self._platforms_path())
+        )
+
+        return sorted(platforms)
+
+    def remove_old_unmapped_strings(self, age_days = 90):
+        """Removes translation keys which are not mapped on any platform and
+        have not been updated in age_days days, archiving them in the
+        defunct_translations file.
+
+        Returns the number of translation keys removed.
+        """
+        self._query_cache.clear()
+
+        mapped_keys = set([])
+        for platform in self.get_platforms():
+            mapped_keys.update(
+                self._escape(key) for key in self._get_mapping(platform)
+            )
+
+        num_removed = 0
+        threshold = self._get_translation_key_date_threshold(age_days)
+        for escaped_key, last_updated in list(self._iter_translation_keys()):
+            if escaped_key not in mapped_keys and last_updated < threshold:
+                key = self._unescape(escaped_key)
+                self._key_updates.pop(key, None)
+                self._deleted_keys.add(escaped_key)
+                self._defunct_keys[escaped_key] = last_updated
+                num_removed += 1
+
+        return num_removed
+
+    def is_prune_due(self, interval_days):
+        """Returns whether prune_if_due has not run in the last interval_days
+        days.
+        """
+        maintenance = dict(self._read_lines(
+            os.path.join(self.filename, FlatFile.maintenance_filename)
+        ))
+        maintenance.update(self._maintenance)
+
+        last_run = maintenance.get("prune")
+        return last_run is None or \
+            last_run < self._get_date_threshold(interval_days)
+
+    def prune_if_due(self, interval_days, age_days):
+        """Calls remove_old_unmapped_strings with age_days, unless it was
+        already done in the last interval_days days.
+
+        Returns the number of translation keys removed, or None if pruning was
+        not due.
+        """
+        if not self.is_prune_due(interval_days):
+            return None
+
+        num_removed = self.remove_old_unmapped_strings(age_days)
+        self._maintenance["prune"] = self._get_current_time()
+
+        return num_removed
+
+    def _touch_key(self, key, current_time):
+        self._key_updates[key] = current_time
+        self._deleted_keys.discard(self._escape(key))
+
+    def _get_mapping(self, platform):
+        """Returns the mapping for platform, loading its file in full the first
+        time it is needed.
+        """
+        if platform not in self._mappings:
+            mapping = { }
+            for escaped_key, escaped_translation in \
+              self._iter_lines(self._platform_path(platform)):
+                mapping[self._unescape(escaped_key)] = \
+                    self._unescape(escaped_translation)
+
+            self._mappings[platform] = mapping
+
+        return self._mappings[platform]
+
+    def _iter_platform_rows(self):
+        """Yields the escaped key, platform and escaped native translation of
+        every mapping on every platform, sorted by key and then by platform.
+        """
+        return heapq.merge(*[
+            self._iter_platform_file_rows(platform)
+            for platform in self.get_platforms()
+        ])
+
+    def _iter_platform_file_rows(self, platform):
+        if platform in self._mappings:
+            mapping = self._mappings[platform]
+            for escaped_key, key in sorted(
+                (self._escape(key), key) for key in mapping
+            ):
+                yield escaped_key, platform, self._escape(mapping[key])
+
+        else:
+            for escaped_key, escaped_translation in \
+              self._iter_lines(self._platform_path(platform)):
+                yield escaped_key, platform, escaped_translation
+
+    def _iter_translation_keys(self):
+        """Yields the escaped key and last updated time of every translation
+        key in sorted order, merging the keys file with the changes made since
+        connecting.
+        """
+        updates = sorted(
+            (self._escape(key), self._key_updates[key])
+            for key in self._key_updates
+        )
+
+        stored = (
+            (escaped_key, last_updated)
+            for escaped_key, last_updated in self._iter_lines(self._keys_path())
+            if escaped_key not in self._deleted_keys
+        )
+
+        update_index = 0
+        for escaped_key, last_updated in stored:
+            while update_index < len(updates) and \
+              updates[update_index][0] < escaped_key:
+                yield updates[update_index]
+                update_index += 1
+
+            if update_index < len(updates) and \
+              updates[update_index][0] == escaped_key:
+                yield updates[update_index]
+                update_index += 1
+            else:
+                yield escaped_key, last_updated
+
+        for update in updates[update_index:]:
+            yield update
+
+    def _read_lines(self, path):
+        return list(self._iter_lines(path))
+
+    def _iter_lines(self, path):
+        """Yields the key and value on each line of the file at path, reading
+        one line at a time. A file which does not exist has no lines.
+        """
+        if not os.path.exists(path):
+            return
+
+        input_file = self._open_for_reading(path)
+        try:
+            for line in input_file:
+                line = line.rstrip("\n")
+                if line:
+                    yield tuple(line.split("\t", 1))
+        finally:
+            input_file.close()
+
+    def _write_if_changed(self, path, contents):
+        if os.path.exists(path):
+            input_file = self._open_for_reading(path)
+            previous_contents = input_file.read()
+            input_file.close()
+
+            if previous_contents == contents:
+                return False
+
+        temp_path = path + ".tmp"
+        output_file = self._open_for_writing(temp_path)
+        output_file.write(contents)
+        output_file.close()
+
+        if os.path.exists(path):
+            os.remove(path)
+
+        os.rename(temp_path, path)
+        return True
+
+    def _escape(self, value):
+        return value.replace("\\", "\\\\") \
+            .replace("\t", "\\t") \
+            .replace("\n", "\\n") \
+            .replace("\r", "\\r") \
+            .encode("utf-8")
+
+    def _unescape(self, value):
+        if "\\" in value:
+            value = FlatFile._escape_regex.sub(
+                lambda match : FlatFile._escaped_characters.get(
+                    match.group(1),
+                    match.group(1)
+                ),
+                value
+            )
+
+        return value.decode("utf-8")
+
+    def _keys_path(self):
+        return os.path.join(self.filename, FlatFile.keys_filename)
+
+    def _platforms_path(self):
+        return os.path.join(self.filename, FlatFile.platforms_dirname)
+
+    def _platform_path(self, platform):
+        if len(platform) == 0:
+            raise ValueError("Platform names must not be empty")
+
+        filename = FlatFile._unsafe_filename_regex.sub(
+            lambda match : "%%%02X" % ord(match.group(0)),
+            platform.encode("utf-8")
+        )
+
+        # "." and ".." are the only names made of safe characters which refer
+        # to another directory
+        if filename.strip(".") == "":
+            filename = filename.replace(".", "%2E")
+
+        return os.path.join(self._platforms_path(), filename)
+
+    def _get_current_time(self):
+        return datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+
+    def _get_translation_key_date_threshold(self, age_days = 90):
+        return self._get_date_threshold(age_days)
+
+    def _get_date_threshold(self, days):
+        threshold = datetime.datetime.utcnow() - datetime.timedelta(days = days)
+        return threshold.strftime("%Y-%m-%d %H:%M:%S")
+
+    def _open_for_reading(self, filename):
+        return open(filename, "rb")
+
+    def _open_for_writing(self, filename):
+        return open(filename, "wb")
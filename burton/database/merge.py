@@ -0,0 +1,173 @@
+from mergeconflict import MergeConflict
+from sqlite import SQLite
+
+def merge_databases(base_filename, filenames, output_filename):
+    """Merges SQL files saved by SQLite from runs of different platforms, which
+    all started from the SQL file at base_filename, and saves the result to
+    output_filename.
+
+    Each run only rewrites the native translations of its own platform, so the
+    mapping of every platform which changed in one of the SQL files is written
+    on top of the base, in the order the files are passed in. This produces the
+    same SQL file as running the platforms one after the other, in that order,
+    since write_string_mapping_for_platform numbers new rows in sorted key
+    order rather than in the order the mapping iterates in. Last updated times
+    are taken from the SQL files rather than the time of the merge, translation
+    keys pruned in any of them are pruned, and their defunct_translations and
+    maintenance rows are combined.
+
+    Raises MergeConflict if more than one of the SQL files changed the mapping
+    for the same platform in different ways.
+    """
+    base = _load(base_filename)
+    base_mappings = { }
+    for platform in base.get_platforms():
+        base_mappings[platform] = base.get_string_mapping_for_platform(platform)
+
+    base_last_updated = dict(_select(
+        base,
+        "select translation_key, last_updated from translation_keys"
+    ))
+    base.close()
+
+    merged = _load(base_filename)
+    changed_platforms = { }
+    databases = [ ]
+
+    try:
+        for filename in filenames:
+            db = _load(filename)
+            databases.append(db)
+
+            for platform in db.get_platforms():
+                mapping = db.get_string_mapping_for_platform(platform)
+                if mapping == base_mappings.get(platform):
+                    continue
+
+                if platform in changed_platforms:
+                    changed_filename, changed_mapping = \
+                        changed_platforms[platform]
+
+                    if mapping == changed_mapping:
+                        continue
+
+                    raise MergeConflict(
+                        "The mapping for " + platform + " was changed in both " +
+                            changed_filename + " and " + filename
+                    )
+
+                changed_platforms[platform] = (filename, mapping)
+                merged.write_string_mapping_for_platform(platform, mapping)
+
+        _merge_translation_keys(merged, databases, base_last_updated)
+        _merge_rows(merged, databases, "defunct_translations")
+        _merge_maintenance(merged, databases)
+
+    except Exception:
+        merged.close()
+        raise
+
+    finally:
+        for db in databases:
+            db.close()
+
+    merged.filename = output_filename
+    merged.disconnect()
+
+def _load(filename):
+    db = SQLite(filename, in_memory = True)
+    db.connect()
+    return db
+
+def _merge_translation_keys(merged, databases, base_last_updated):
+    """Sets the last updated time of every translation key to the latest time
+    in the base or any of the databases, and removes keys which were pruned
+    from any of the databases and are no longer mapped on any platform.
+    """
+    last_updated_by_key = dict(base_last_updated)
+    pruned_keys = set([])
+
+    for db in databases:
+        keys = dict(_select(
+            db,
+            "select translation_key, last_updated from translation_keys"
+        ))
+        pruned_keys.update(set(base_last_updated).difference(keys))
+
+        for key in keys:
+            if key not in last_updated_by_key or \
+              keys[key] > last_updated_by_key[key]:
+                last_updated_by_key[key] = keys[key]
+
+    cursor = merged.dbh.cursor()
+    cursor.executemany(
+        """update translation_keys
+            set last_updated = ?
+        where translation_key = ?
+        """,
+        [ (last_updated_by_key[key], key) for key in last_updated_by_key ]
+    )
+
+    cursor.executemany(
+        """delete from translation_keys
+        where translation_key = ?
+            and translation_key_no not in (
+                select translation_key_no
+                from native_translations
+            )
+        """,
+        [ (key,) for key in pruned_keys ]
+    )
+
+    cursor.close()
+    merged.dbh.commit()
+
+def _merge_rows(merged, databases, table):
+    rows = set(_select(merged, "select * from " + table))
+    new_rows = [ ]
+    for db in databases:
+        for row in _select(db, "select * from " + table):
+            if row not in rows:
+                rows.add(row)
+                new_rows.append(row)
+
+    if len(new_rows) > 0:
+        cursor = merged.dbh.cursor()
+        cursor.executemany(
+            "insert or replace into {0} values ({1})".format(
+                table,
+                ", ".join([ "?" ] * len(new_rows[0]))
+            ),
+            new_rows
+        )
+        cursor.close()
+        merged.dbh.commit()
+
+def _merge_maintenance(merged, databases):
+    last_run_by_task = dict(_select(
+        merged,
+        "select task, last_run from maintenance"
+    ))
+
+    for db in databases:
+        for task, last_run in _select(
+            db,
+            "select task, last_run from maintenance"
+        ):
+            if task not in last_run_by_task or \
+              last_run > last_run_by_task[task]:
+                last_run_by_task[task] = last_run
+
+    cursor = merged.dbh.cursor()
+    cursor.executemany(
+        "insert or replace into maintenance (task, last_run) values (?, ?)",
+        last_run_by_task.items()
+    )
+    cursor.close()
+    merged.dbh.commit()
+
+def _select(db, query):
+    cursor = db.dbh.cursor()
+    rows = cursor.execute(query).fetchall()
+    cursor.close()
+    return rows
@@ -1,5 +1,7 @@
 import codecs
+import itertools
 import os
+import re
 import sqlite3
 
 from pkg_resources import resource_stream
@@ -7,6 +9,8 @@ from pkg_resources import resource_stream
 import burton
 from burton import parser
 
+from util import translation_key_id
+
 class SQLite(object):
     """The SQLite class facilitates saving localization data to a SQLite
     database for the purpose of comparing the localization state between
@@ -25,13 +29,131 @@ class SQLite(object):
 
     In the config file, database_path should be set to this SQL file, not to a
     SQLite database file.
+
+    By default, the SQL file is loaded into a temporary SQLite database file
+    next to it, which is removed on disconnect. If in_memory is True, the SQL
+    file is loaded into an in-memory database instead, and nothing but the SQL
+    file itself is ever written to disk.
+
+    Since the database itself is thrown away at the end of every run, each
+    connection is tuned for speed rather than durability using the pragmas in
+    default_pragmas. Individual pragmas can be overridden with the pragmas
+    argument.
+
+    The schema_info table records the version of the schema. SQL files written
+    by older versions of this class are upgraded to schema_version when they
+    are loaded, by running each of the migrations newer than the version they
+    were written with.
+
+    Text is stored as native UTF-8. Version 1 SQL files stored keys,
+    translations and params escaped with unicode_escape, and are unescaped once
+    when they are upgraded.
+
+    Translation keys are numbered with translation_key_id, a hash of the key
+    text, so that the same key has the same number in every database. Version
+    3 and older SQL files numbered keys in the order they were inserted, and
+    are renumbered when they are upgraded.
+
+    The native translations returned by get_native_translations_for_platform
+    and get_all_native_translations are cached for the lifetime of the
+    connection as frozensets, which are shared between callers. The cache is
+    cleared whenever the database is written to.
+
+    prune_if_due removes translation keys which have not been mapped on any
+    platform for a while, archiving them in defunct_translations. The time it
+    last ran is recorded in the maintenance table, so that it only runs once
+    per interval.
     """
 
-    def __init__(self, filename):
+    schema_version = 4
+
+    default_pragmas = {
+        "journal_mode" : "MEMORY",
+        "synchronous"  : "OFF",
+        "cache_size"   : -65536,
+        "temp_store"   : "MEMORY",
+    }
+
+    def _unescape_text_columns(self):
+        def unescape(value):
+            try:
+                return value.encode("ascii").decode("unicode_escape")
+            except UnicodeError:
+                return value
+
+        self.dbh.create_function("burton_unescape", 1, unescape)
+
+        cursor = self.dbh.cursor()
+        for table, column in [
+            ("translation_keys",    "translation_key"),
+            ("native_translations", "translation"),
+            ("replaced_params",     "param_string"),
+        ]:
+            cursor.execute(
+                "update {0} set {1} = burton_unescape({1})".format(
+                    table,
+                    column
+                )
+            )
+
+        cursor.close()
+
+    def _renumber_translation_keys(self):
+        self.dbh.create_function("burton_key_id", 1, translation_key_id)
+
+        cursor = self.dbh.cursor()
+        cursor.execute(
+            """update native_translations
+                set translation_key_no = (
+                    select burton_key_id(translation_key)
+                    from translation_keys
+                    where translation_keys.translation_key_no =
+                        native_translations.translation_key_no
+                )
+            """
+        )
+        cursor.execute(
+            """update translation_keys
+                set translation_key_no = burton_key_id(translation_key)
+            """
+        )
+        cursor.close()
+
+    # Migrations which create tables and indexes name them, and they are
+    # created with the same statements as in sqlite.schema, so that upgraded
+    # databases dump exactly like new ones
+    _migrations = [
+        (
+            1,
+            [
+                "schema_info",
+                "idx_native_translations_platform",
+                "idx_replaced_params_native_translation",
+            ]
+        ),
+        (2, _unescape_text_columns),
+        (3, [ "maintenance" ]),
+        (4, _renumber_translation_keys),
+    ]
+
+    _create_statement_regex = re.compile(
+        "^CREATE\s+(?:UNIQUE\s+)?(?:TABLE|INDEX)\s+(\w+)",
+        re.IGNORECASE
+    )
+
+    _pragma_regex = re.compile("^-?\w+$")
+
+    def __init__(self, filename, in_memory = False, pragmas = None):
         object.__init__(self)
-        self.filename = filename
-        self.dbh      = None
+        self.filename  = filename
+        self.in_memory = in_memory
+        self.pragmas   = SQLite.default_pragmas.copy()
+        self.dbh       = None
         self._temp_filename = filename + ".db"
+        self._query_cache   = { }
+
+        if pragmas is not None:
+            self.pragmas.update(pragmas)
 
     def update_from_vcs(self, vcs, submodule_path = None):
         """Gets the latest version of the SQL file from VCS and opens it for
@@ -45,6 +167,8 @@ class SQLite(object):
         """Opens the database connection, loading the SQL file if present, or a
         schema file if not.
         """
+        self._query_cache.clear()
+
         should_load_schema = False
         if not os.path.exists(self.filename):
             should_load_schema = True
@@ -55,11 +179,29 @@ class SQLite(object):
             self._load_schema()
         else:
             self._load_database()
+            self._upgrade_schema()
 
     def _connect(self):
-        if os.path.exists(self._temp_filename):
-            self._remove_temporary_file()
-        self.dbh = sqlite3.connect(self._temp_filename)
+        if self.in_memory:
+            self.dbh = sqlite3.connect(":memory:")
+        else:
+            if os.path.exists(self._temp_filename):
+                self._remove_temporary_file()
+            self.dbh = sqlite3.connect(self._temp_filename)
+
+        self._apply_pragmas()
+
+    def _apply_pragmas(self):
+        cursor = self.dbh.cursor()
+        for name in sorted(self.pragmas):
+            value = str(self.pragmas[name])
+            if SQLite._pragma_regex.match(name) is None or \
+              SQLite._pragma_regex.match(value) is None:
+                raise ValueError("Invalid SQLite pragma " + name + " = " + value)
+
+            cursor.execute("pragma {0} = {1}".format(name, value))
+
+        cursor.close()
 
     def _schema_file(self):
         return resource_stream(
@@ -76,6 +218,46 @@ class SQLite(object):
         cursor.close()
         self.dbh.commit()
 
+    def _get_create_statements(self):
+        """Returns a dictionary of the name of each table and index in the
+        schema file to the statement which creates it.
+        """
+        fp = self._schema_file()
+        lines = fp.read().decode("utf-8").splitlines(True)
+        fp.close()
+
+        statements = { }
+        statement = u""
+        for line in lines:
+            statement += line
+            if sqlite3.complete_statement(statement):
+                statement = statement.strip()
+                match = SQLite._create_statement_regex.match(statement)
+                if match is not None:
+                    statements[match.group(1)] = statement
+
+                statement = u""
+
+        return statements
+
+    def _create_schema_objects(self, names):
+        """Creates each of the tables and indexes in names which does not
+        already exist, with its statement from the schema file.
+        """
+        statements = self._get_create_statements()
+
+        cursor = self.dbh.cursor()
+        for name in names:
+            exists = cursor.execute(
+                "select count(*) from sqlite_master where name = ?",
+                (name,)
+            ).fetchone()[0]
+
+            if not exists:
+                cursor.execute(statements[name])
+
+        cursor.close()
+
     def _load_database(self):
         cursor = self.dbh.cursor()
         fp = self._open_for_reading(self.filename)
@@ -84,21 +266,192 @@ class SQLite(object):
         cursor.close()
         self.dbh.commit()
 
+    def _get_schema_version(self):
+        cursor = self.dbh.cursor()
+        has_schema_info = cursor.execute(
+            """select count(*)
+            from sqlite_master
+            where type = 'table'
+                and name = 'schema_info'
+            """
+        ).fetchone()[0]
+
+        version = None
+        if has_schema_info:
+            version = cursor.execute(
+                "select max(version) from schema_info"
+            ).fetchone()[0]
+
+        cursor.close()
+        return version or 0
+
+    def _upgrade_schema(self):
+        """Runs every migration newer than the schema version of the loaded SQL
+        file, recording the new version in schema_info.
+        """
+        version = self._get_schema_version()
+        if version >= SQLite.schema_version:
+            return
+
+        cursor = self.dbh.cursor()
+        for migration_version, migration in SQLite._migrations:
+            if migration_version > version:
+                if callable(migration):
+                    migration(self)
+                else:
+                    self._create_schema_objects(migration)
+
+        cursor.execute("delete from schema_info")
+        cursor.execute(
+            "insert into schema_info (version) values (?)",
+            (SQLite.schema_version,)
+        )
+        cursor.close()
+        self.dbh.commit()
+
     def disconnect(self):
         """Saves the contents of the database to a SQL file, closes the database
-        connection, and removes the SQLite database file.
+        connection, and removes the SQLite database file, if any.
+
+        Returns True if the SQL file was written, or False if its contents
+        were unchanged and it was left untouched.
+        """
+        saved = self._save_database()
+        self.close()
+
+        return saved
+
+    def close(self):
+        """Closes the database connection and removes the SQLite database file,
+        if any, without saving the SQL file.
         """
-        self._save_database()
         self.dbh.close()
-        self._remove_temporary_file()
+        self._query_cache.clear()
+
+        if not self.in_memory:
+            self._remove_temporary_file()
+
+    def get_dump_size(self):
+        """Returns the size in bytes of the SQL file which disconnect would
+        save.
+        """
+        return sum(
+            len((u"%s\n" % line).encode("utf-8")) for line in self._iterdump()
+        )
 
     def _save_database(self):
-        output_file = self._open_for_writing(self.filename)
-        for line in self.dbh.iterdump():
-            output_file.write("%s\n" % line)
+        contents = u"".join(u"%s\n" % line for line in self._iterdump())
+
+        if os.path.exists(self.filename):
+            input_file = self._open_for_reading(self.filename)
+            previous_contents = input_file.read()
+            input_file.close()
 
+            if previous_contents == contents.encode("utf-8"):
+                return False
+
+        output_file = self._open_for_writing(self.filename)
+        output_file.write(contents)
         output_file.close()
 
+        return True
+
+    def _iterdump(self):
+        """Produces the same SQL as sqlite3's iterdump, except that tables,
+        indexes and rows are always emitted in the same order. Rows are sorted
+        by the columns of the table's first unique index, or by rowid for tables
+        without one, so that the SQL file only changes where the data does.
+        """
+        cursor = self.dbh.cursor()
+
+        yield "BEGIN TRANSACTION;"
+
+        tables = cursor.execute(
+            """select name, sql
+            from sqlite_master
+            where sql not null
+                and type = 'table'
+            order by name
+            """
+        ).fetchall()
+
+        for table_name, sql in tables:
+            if table_name == "sqlite_sequence":
+                yield 'DELETE FROM "sqlite_sequence";'
+            elif table_name == "sqlite_stat1":
+                yield 'ANALYZE "sqlite_master";'
+            elif table_name.startswith("sqlite_"):
+                continue
+            else:
+                yield "%s;" % sql
+
+            table_identifier = self._quote_identifier(table_name)
+            column_names = [
+                column_info[1] for column_info in cursor.execute(
+                    "pragma table_info({0})".format(table_identifier)
+                ).fetchall()
+            ]
+
+            query = """select 'INSERT INTO {0} VALUES({1})'
+            from {0}
+            order by {2}
+            """.format(
+                table_identifier,
+                ",".join(
+                    "'||quote({0})||'".format(self._quote_identifier(column))
+                    for column in column_names
+                ),
+                ", ".join(
+                    self._quote_identifier(column)
+                    for column in self._get_sort_columns(table_name)
+                ),
+            )
+
+            for row in cursor.execute(query):
+                yield "%s;" % row[0]
+
+        other_objects = cursor.execute(
+            """select sql
+            from sqlite_master
+            where sql not null
+                and type in ('index', 'trigger', 'view')
+            order by name
+            """
+        ).fetchall()
+
+        for sql, in other_objects:
+            yield "%s;" % sql
+
+        cursor.close()
+
+        yield "COMMIT;"
+
+    def _get_sort_columns(self, table_name):
+        cursor = self.dbh.cursor()
+        table_identifier = self._quote_identifier(table_name)
+
+        sort_columns = [ "rowid" ]
+        index_list = cursor.execute(
+            "pragma index_list({0})".format(table_identifier)
+        ).fetchall()
+
+        for index_info in sorted(index_list, key = lambda(info): info[1]):
+            if index_info[2]:
+                sort_columns = [
+                    column_info[2] for column_info in cursor.execute(
+                        "pragma index_info({0})".format(
+                            self._quote_identifier(index_info[1])
+                        )
+                    ).fetchall()
+                ]
+                break
+
+        cursor.close()
+        return sort_columns
+
+    def _quote_identifier(self, identifier):
+        return '"' + identifier.replace('"', '""') + '"'
+
     def _remove_temporary_file(self):
         os.remove(self._temp_filename)
 
@@ -118,12 +471,21 @@ class SQLite(object):
         will delete native-language translations that are not present in the new
         mapping. It will also update the last_updated column on translation_keys
         for any native-language translation it updates or deletes.
+
+        The mapping is loaded into a temporary staging table in bulk, and the
+        changes are then applied with a handful of set-based statements inside a
+        single transaction.
         """
+        self._query_cache.clear()
 
-        platform_no  = self._get_platform_no(platform)
+        platform_no = self._get_platform_no(platform)
 
-        self._insert_new_translation_keys(platform_no, mapping)
-        self._insert_update_or_delete_native_translations(platform_no, mapping)
+        staged_translations = self._stage_string_mapping(mapping)
+        self._insert_new_translation_keys()
+        self._delete_defunct_native_translations(platform_no)
+        self._insert_or_update_native_translations(platform_no)
+        self._update_replaced_params(platform_no, staged_translations)
+        self._update_timestamp_on_translation_keys()
         self.dbh.commit()
 
     def get_all_translation_keys(self):
@@ -135,289 +497,370 @@ class SQLite(object):
             """,
         )
 
-        results = map(
-            lambda(key) : key[0].decode("unicode_escape"), cursor.fetchall()
-        )
+        results = map(lambda(key) : key[0], cursor.fetchall())
         return results
 
     def get_all_native_translations(self):
-        cursor = self.dbh.cursor()
-        cursor.execute(
-            """select distinct
-                translation
-            from native_translations
-            """,
-        )
+        cache_key = ("all_native_translations",)
+        if cache_key not in self._query_cache:
+            cursor = self.dbh.cursor()
+            cursor.execute(
+                """select distinct
+                    translation
+                from native_translations
+                """,
+            )
 
-        results = map(
-            lambda(key) : key[0].decode("unicode_escape"), cursor.fetchall()
-        )
-        return results
+            self._query_cache[cache_key] = frozenset(
+                key[0] for key in cursor.fetchall()
+            )
+            cursor.close()
 
-    def _insert_new_translation_keys(self, platform_no, mapping):
-        remaining_mappings = mapping.copy()
-        cursor = self.dbh.cursor()
+        return self._query_cache[cache_key]
 
-        translation_keys = self.get_all_translation_keys()
+    def _stage_string_mapping(self, mapping):
+        """Loads the mapping into the staged_translations temporary table and
+        returns the staged translations, indexed by their seq column.
 
-        for translation_key in translation_keys:
-            if translation_key in remaining_mappings:
-                del remaining_mappings[translation_key]
+        Rows are staged in sorted key order, which is the order in which native
+        translations and replaced params are inserted, so that they are
+        numbered the same way whatever order the mapping iterates in. Each row
+        is staged with the ID of its translation key, computed with
+        translation_key_id, so no lookup is needed to find or insert the key.
+        """
+        cursor = self.dbh.cursor()
+        cursor.executescript(
+            """create temp table if not exists staged_translations (
+                seq INTEGER PRIMARY KEY,
+                translation_key TEXT UNIQUE NOT NULL,
+                translation TEXT NOT NULL,
+                translation_key_no INTEGER NOT NULL,
+                native_translation_no INTEGER,
+                status INTEGER NOT NULL DEFAULT 0
+            );
+
+            delete from staged_translations;
+            """
+        )
 
-        for mapping_key in remaining_mappings:
-            cursor.execute(
-                """insert into translation_keys (
-                    translation_key,
-                    last_updated
-                ) values (
-                    ?,
-                    {0}
-                )
-                """.format(self._get_current_time()),
-                (mapping_key.encode("unicode_escape"),)
+        staged_translations = [ ]
+        rows = [ ]
+        for translation_key in sorted(mapping):
+            translation = mapping[translation_key]
+            rows.append((
+                len(staged_translations),
+                translation_key,
+                translation,
+                translation_key_id(translation_key),
+            ))
+            staged_translations.append(translation)
+
+        cursor.executemany(
+            """insert into staged_translations (
+                seq,
+                translation_key,
+                translation,
+                translation_key_no
+            ) values (
+                ?,
+                ?,
+                ?,
+                ?
             )
+            """,
+            rows
+        )
 
         cursor.close()
+        return staged_translations
 
-    def _insert_update_or_delete_native_translations(
-        self,
-        platform_no,
-        mapping
-    ):
+    def _insert_new_translation_keys(self):
         cursor = self.dbh.cursor()
         cursor.execute(
-            """select
+            """insert or ignore into translation_keys (
                 translation_key_no,
                 translation_key,
-                translation
-            from translation_keys
-            inner join native_translations
-                using (translation_key_no)
-            where platform_no = ?
-            """,
-            (platform_no,)
-        )
-        results = cursor.fetchall()
-        translations_in_db = { }
-
-        for translation_key_no, translation_key, translation in results:
-            translation_key = translation_key.decode("unicode_escape")
-            translation = translation.decode("unicode_escape")
-            translations_in_db[translation_key] = \
-                (translation_key_no, translation)
-
-        self._delete_defunct_native_translations(
-            platform_no,
-            mapping,
-            translations_in_db
-        )
-        self._insert_or_update_native_translations(
-            platform_no,
-            mapping,
-            translations_in_db
+                last_updated
+            )
+            select
+                translation_key_no,
+                translation_key,
+                {0}
+            from staged_translations
+            order by seq
+            """.format(self._get_current_time())
         )
 
-    def _delete_defunct_native_translations(
-        self,
-        platform_no,
-        mapping,
-        translations_in_db
-    ):
-        translation_keys_to_update = set([])
+        collisions = cursor.execute(
+            """select staged_translations.translation_key
+            from staged_translations
+            inner join translation_keys
+                using (translation_key_no)
+            where translation_keys.translation_key !=
+                staged_translations.translation_key
+            """
+        ).fetchall()
+
+        cursor.close()
 
+        if len(collisions) > 0:
+            raise ValueError(
+                "Translation key ID collision for " + repr(collisions[0][0])
+            )
+
+    def _delete_defunct_native_translations(self, platform_no):
         cursor = self.dbh.cursor()
-        for translation_key in translations_in_db:
-            if translation_key not in mapping:
-                translation_key_no = translations_in_db[translation_key][0]
-                cursor.execute(
-                    """delete from native_translations
-                    where translation_key_no = ?
-                        and platform_no = ?
-                    """,
-                    (
-                        translation_key_no,
-                        platform_no,
+        cursor.execute(
+            """update translation_keys
+                set last_updated = {0}
+            where translation_key_no in (
+                select translation_key_no
+                from native_translations
+                where platform_no = ?
+                    and translation_key_no not in (
+                        select translation_key_no
+                        from staged_translations
                     )
+            )
+            """.format(self._get_current_time()),
+            (platform_no,)
+        )
+
+        cursor.execute(
+            """delete from native_translations
+            where platform_no = ?
+                and translation_key_no not in (
+                    select translation_key_no
+                    from staged_translations
                 )
-                translation_keys_to_update.add(translation_key_no)
+            """,
+            (platform_no,)
+        )
 
         cursor.close()
-        self._update_timestamp_on_translation_keys(translation_keys_to_update)
-
-    def _insert_or_update_native_translations(
-        self,
-        platform_no,
-        mapping,
-        translations_in_db
-    ):
-        translation_keys_to_update = set([])
-
-        for translation_key in mapping:
-            if translation_key in translations_in_db:
-                translation_key_no, translation = \
-                    translations_in_db[translation_key]
-
-                if mapping[translation_key] != translation:
-                    self._update_native_translation(
-                        translation_key_no,
-                        platform_no,
-                        mapping[translation_key]
-                    )
-
-                    translation_keys_to_update.add(translation_key_no)
 
-            else:
-                translation_keys_to_update.add(
-                    self._insert_native_translation(
-                        platform_no,
-                        translation_key,
-                        mapping[translation_key]
-                    )
+    def _insert_or_update_native_translations(self, platform_no):
+        """Marks each staged translation as unchanged (status 0), changed
+        (status 1) or new (status 2), then updates the changed rows and inserts
+        the new rows into native_translations.
+        """
+        cursor = self.dbh.cursor()
+        cursor.execute(
+            """update staged_translations
+                set native_translation_no = (
+                    select native_translation_no
+                    from native_translations
+                    where native_translations.translation_key_no =
+                            staged_translations.translation_key_no
+                        and native_translations.platform_no = ?
                 )
+            """,
+            (platform_no,)
+        )
 
-        self._update_timestamp_on_translation_keys(translation_keys_to_update)
+        cursor.execute(
+            """update staged_translations
+                set status = 1
+            where native_translation_no is not null
+                and translation != (
+                    select translation
+                    from native_translations
+                    where native_translations.native_translation_no =
+                        staged_translations.native_translation_no
+                )
+            """
+        )
 
-    def _insert_native_translation(
-        self,
-        platform_no,
-        translation_key,
-        translation
-    ):
-        filtered_translation, replaced_params = \
-            parser.replace_params(translation)
+        cursor.execute(
+            """update staged_translations
+                set status = 2
+            where native_translation_no is null
+            """
+        )
 
-        cursor = self.dbh.cursor()
-        translation_key_no = cursor.execute(
-            """select translation_key_no
-            from translation_keys
-            where translation_key = ?
-            """,
-            (
-                translation_key.encode("unicode_escape"),
+        cursor.execute(
+            """update native_translations
+                set translation = (
+                    select translation
+                    from staged_translations
+                    where staged_translations.native_translation_no =
+                        native_translations.native_translation_no
+                )
+            where native_translation_no in (
+                select native_translation_no
+                from staged_translations
+                where status = 1
             )
-        ).fetchone()[0]
+            """
+        )
 
         cursor.execute(
             """insert into native_translations (
                 translation_key_no,
                 platform_no,
                 translation
-            ) values (
-                ?,
-                ?,
-                ?
             )
-            """,
-            (
+            select
                 translation_key_no,
-                platform_no,
-                translation.encode("unicode_escape"),
-            )
-        )
-
-        native_translation_no = self._get_native_translation_no(
-            translation_key_no,
-            platform_no
+                ?,
+                translation
+            from staged_translations
+            where status = 2
+            order by seq
+            """,
+            (platform_no,)
         )
 
-        self._update_replaced_params(
-            platform_no,
-            native_translation_no,
-            replaced_params
+        cursor.execute(
+            """update staged_translations
+                set native_translation_no = (
+                    select native_translation_no
+                    from native_translations
+                    where native_translations.translation_key_no =
+                            staged_translations.translation_key_no
+                        and native_translations.platform_no = ?
+                )
+            where status = 2
+            """,
+            (platform_no,)
         )
 
         cursor.close()
-        return translation_key_no
-
-    def _update_native_translation(
-        self,
-        translation_key_no,
-        platform_no,
-        translation
-    ):
-        filtered_translation, replaced_params = \
-            parser.replace_params(translation)
-
-        native_translation_no = self._get_native_translation_no(
-            translation_key_no,
-            platform_no
-        )
 
+    def _update_replaced_params(self, platform_no, staged_translations):
+        """Replaces the params of every changed or new native translation.
+
+        Row-by-row processing used to delete the params of one translation and
+        insert its new params before moving on to the next, so SQLite handed out
+        translation_param_no values based on whatever rows were left at that
+        point. The numbers are computed the same way here, so that the params
+        can be deleted and inserted in bulk while producing identical rows.
+        """
         cursor = self.dbh.cursor()
+        changed_translations = """select native_translation_no
+            from staged_translations
+            where status = 1
+        """
+
+        old_param_nos = { }
         cursor.execute(
-            """update native_translations
-                set translation = ?
-            where native_translation_no = ?
-            """,
-            (
-                translation.encode("unicode_escape"),
+            """select
                 native_translation_no,
-            )
+                translation_param_no
+            from replaced_params
+            where platform_no = ?
+                and native_translation_no in ({0})
+            """.format(changed_translations),
+            (platform_no,)
         )
+        for native_translation_no, translation_param_no in cursor.fetchall():
+            old_param_nos.setdefault(native_translation_no, []).append(
+                translation_param_no
+            )
+
+        untouched_max = cursor.execute(
+            """select max(translation_param_no)
+            from replaced_params
+            where not (
+                platform_no = ?
+                    and native_translation_no in ({0})
+            )
+            """.format(changed_translations),
+            (platform_no,)
+        ).fetchone()[0] or 0
 
         cursor.execute(
             """delete from replaced_params
             where platform_no = ?
-                and native_translation_no = ?
-            """,
-            (
-                platform_no,
-                native_translation_no,
-            ),
+                and native_translation_no in ({0})
+            """.format(changed_translations),
+            (platform_no,)
         )
 
-        self._update_replaced_params(
-            platform_no,
-            native_translation_no,
-            replaced_params
+        pending_old_param_nos = sorted(
+            param_no
+            for param_nos in old_param_nos.values()
+            for param_no in param_nos
         )
+        removed_param_nos = set([])
+        last_param_no = 0
+        rows = [ ]
 
-        cursor.close()
+        cursor.execute(
+            """select
+                seq,
+                native_translation_no,
+                status
+            from staged_translations
+            where status != 0
+            order by seq
+            """
+        )
+        for seq, native_translation_no, status in cursor.fetchall():
+            if status == 1:
+                removed_param_nos.update(
+                    old_param_nos.get(native_translation_no, [])
+                )
 
-    def _update_replaced_params(
-        self,
-        platform_no,
-        native_translation_no,
-        replaced_params
-    ):
-        cursor = self.dbh.cursor()
-        replaced_param_index = 0
-        for replaced_param in replaced_params:
-            cursor.execute(
-                """insert into replaced_params (
-                    platform_no,
-                    native_translation_no,
-                    param_index,
-                    param_string
-                ) values (
-                    ?,
-                    ?,
-                    ?,
-                    ?
-                );
-                """,
-                (
+            filtered_translation, replaced_params = \
+                parser.replace_params(staged_translations[seq])
+
+            replaced_param_index = 0
+            for replaced_param in replaced_params:
+                while pending_old_param_nos and \
+                  pending_old_param_nos[-1] in removed_param_nos:
+                    pending_old_param_nos.pop()
+
+                pending_max = 0
+                if pending_old_param_nos:
+                    pending_max = pending_old_param_nos[-1]
+
+                last_param_no = \
+                    max(untouched_max, pending_max, last_param_no) + 1
+
+                rows.append((
+                    last_param_no,
                     platform_no,
                     native_translation_no,
                     replaced_param_index,
-                    replaced_param.encode("unicode_escape"),
-                )
+                    replaced_param,
+                ))
+
+                replaced_param_index += 1
+
+        cursor.executemany(
+            """insert into replaced_params (
+                translation_param_no,
+                platform_no,
+                native_translation_no,
+                param_index,
+                param_string
+            ) values (
+                ?,
+                ?,
+                ?,
+                ?,
+                ?
             )
+            """,
+            rows
+        )
 
-            replaced_param_index += 1
+        cursor.close()
 
-    def _update_timestamp_on_translation_keys(self, translation_keys_to_update):
+    def _update_timestamp_on_translation_keys(self):
         cursor = self.dbh.cursor()
-        for translation_key_no in translation_keys_to_update:
-            cursor.execute(
-                """update translation_keys
-                    set last_updated = {0}
-                where translation_key_no = ?
-                """.format(self._get_current_time()),
-                (
-                    translation_key_no,
-                )
+        cursor.execute(
+            """update translation_keys
+                set last_updated = {0}
+            where translation_key_no in (
+                select translation_key_no
+                from staged_translations
+                where status != 0
             )
+            """.format(self._get_current_time())
+        )
+        cursor.close()
 
     def _get_platform_no(self, platform):
         cursor = self.dbh.cursor()
@@ -443,34 +886,115 @@ class SQLite(object):
 
         return platform_no
 
-    def _get_native_translation_no(self, translation_key_no, platform_no):
+    def remove_old_unmapped_strings(self, age_days = 90):
+        """Removes translation keys which are not mapped on any platform and
+        have not been updated in age_days days, along with any replaced params
+        left without a native translation. Removed keys are archived in
+        defunct_translations with a null language_no.
+
+        Returns the number of translation keys removed.
+        """
+        self._query_cache.clear()
+
+        old_unmapped_keys = """from translation_keys
+            where translation_key_no not in (
+                select translation_key_no
+                from native_translations
+            )
+                and last_updated < {0}
+        """.format(self._get_translation_key_date_threshold(age_days))
+
         cursor = self.dbh.cursor()
-        native_translation_no = cursor.execute(
-            """select native_translation_no
-            from native_translations
-            where translation_key_no = ?
-                and platform_no = ?
-            """,
-            (
-                translation_key_no,
-                platform_no,
+        cursor.execute(
+            """delete from defunct_translations
+            where language_no is null
+                and native_string in (
+                    select translation_key
+                    {0}
+                )
+            """.format(old_unmapped_keys)
+        )
+
+        cursor.execute(
+            """insert into defunct_translations (
+                language_no,
+                native_string,
+                translation,
+                last_updated
             )
-        ).fetchone()[0]
+            select
+                null,
+                translation_key,
+                translation_key,
+                last_updated
+            {0}
+            """.format(old_unmapped_keys)
+        )
+
+        cursor.execute("delete {0}".format(old_unmapped_keys))
+        num_removed = cursor.rowcount
+
+        cursor.execute(
+            """delete from replaced_params
+            where native_translation_no not in (
+                select native_translation_no
+                from native_translations
+            )
+            """
+        )
 
         cursor.close()
-        return native_translation_no
+        self.dbh.commit()
+
+        return num_removed
+
+    def is_prune_due(self, interval_days):
+        """Returns whether prune_if_due has not run in the last interval_days
+        days.
+        """
+        cursor = self.dbh.cursor()
+        is_due = cursor.execute(
+            """select count(*)
+            from maintenance
+            where task = 'prune'
+                and last_run >= {0}
+            """.format(self._get_date_threshold(interval_days))
+        ).fetchone()[0] == 0
+        cursor.close()
+
+        return is_due
+
+    def prune_if_due(self, interval_days, age_days):
+        """Calls remove_old_unmapped_strings with age_days, unless it was
+        already done in the last interval_days days.
+
+        The database is not vacuumed afterwards, since it is rebuilt from the
+        SQL file on every connect and the SQL file only holds the rows which
+        are left.
+
+        Returns the number of translation keys removed, or None if pruning was
+        not due.
+        """
+        if not self.is_prune_due(interval_days):
+            return None
+
+        num_removed = self.remove_old_unmapped_strings(age_days)
 
-    def remove_old_unmapped_strings(self):
         cursor = self.dbh.cursor()
         cursor.execute(
-            """delete from translation_keys
-            where translation_key_no not in (
-                select translation_key_no
-                from native_translations
+            """insert or replace into maintenance (
+                task,
+                last_run
+            ) values (
+                'prune',
+                {0}
             )
-                and last_updated < {0}
-            """.format(self._get_translation_key_date_threshold())
+            """.format(self._get_current_time())
         )
+        cursor.close()
+        self.dbh.commit()
+
+        return num_removed
 
     def get_platforms(self):
         cursor = self.dbh.cursor()
@@ -497,43 +1021,117 @@ class SQLite(object):
             ( platform_no, )
         )
 
-        results = dict(cursor.fetchall())
+        return_value = dict(cursor.fetchall())
         cursor.close()
 
-        return_value = { }
-        print results
-        for translation_key in results:
-            return_value[translation_key.decode("unicode_escape")] = \
-                results[translation_key].decode("unicode_escape")
-
         return return_value
 
-    def get_native_translations_for_platform(self, platform):
-        return_value = { }
-        platform_no = self._get_platform_no(platform)
+    def iter_translation_key_coverage(self):
+        """Yields each translation key, in sorted order, with a frozenset of the
+        platforms it has a native translation on. Keys which are not mapped on
+        any platform are yielded with an empty frozenset.
 
+        Rows are streamed from the database, so only one key is held in memory
+        at a time.
+        """
         cursor = self.dbh.cursor()
         cursor.execute("""
-            select translation
-            from native_translations
-            where platform_no = ?
-        """,
-            ( platform_no, )
-        )
+            select
+                translation_key,
+                platforms.name
+            from translation_keys
+            left join native_translations
+                using (translation_key_no)
+            left join platforms
+                using (platform_no)
+            order by translation_key, platforms.name
+        """)
+
+        for translation_key, rows in itertools.groupby(
+            cursor,
+            lambda(row) : row[0]
+        ):
+            yield translation_key, frozenset(
+                platform for key, platform in rows if platform is not None
+            )
 
-        results = map(
-            lambda(key) : key[0].decode("unicode_escape"), cursor.fetchall()
-        )
+        cursor.close()
+
+    def iter_native_translation_differences(self):
+        """Yields each translation key, in sorted order, whose native
+        translation is not the same on every platform it is mapped on, with a
+        dictionary mapping each of those platforms to its native translation.
+
+        Translations are compared after their params are replaced, so "%@" on
+        one platform and "{0}" on another are not a difference.
+
+        Rows are streamed from the database, so only one key is held in memory
+        at a time.
+        """
+        cursor = self.dbh.cursor()
+        cursor.execute("""
+            select
+                translation_key,
+                platforms.name,
+                translation
+            from translation_keys
+            inner join native_translations
+                using (translation_key_no)
+            inner join platforms
+                using (platform_no)
+            where translation_key_no in (
+                select translation_key_no
+                from native_translations
+                group by translation_key_no
+                having count(distinct translation) > 1
+            )
+            order by translation_key, platforms.name
+        """)
+
+        for translation_key, rows in itertools.groupby(
+            cursor,
+            lambda(row) : row[0]
+        ):
+            translations = dict(
+                (platform, translation) for key, platform, translation in rows
+            )
+            if len(set(
+                parser.replace_params(translation)[0]
+                for translation in translations.values()
+            )) > 1:
+                yield translation_key, translations
 
         cursor.close()
 
-        return results
+    def get_native_translations_for_platform(self, platform):
+        cache_key = ("native_translations_for_platform", platform)
+        if cache_key not in self._query_cache:
+            platform_no = self._get_platform_no(platform)
+
+            cursor = self.dbh.cursor()
+            cursor.execute("""
+                select translation
+                from native_translations
+                where platform_no = ?
+            """,
+                ( platform_no, )
+            )
+
+            self._query_cache[cache_key] = frozenset(
+                key[0] for key in cursor.fetchall()
+            )
+            cursor.close()
+
+        return self._query_cache[cache_key]
 
     def _get_current_time(self):
         return "datetime('now')"
 
-    def _get_translation_key_date_threshold(self):
-        return "datetime('now', '-90 days')"
+    def _get_translation_key_date_threshold(self, age_days = 90):
+        return self._get_date_threshold(age_days)
+
+    def _get_date_threshold(self, days):
+        return "datetime('now', '-{0} days')".format(int(days))
 
     def _open_for_reading(self, filename):
         return open(filename, "r")
@@ -0,0 +1,419 @@
+import mock
+import os
+import shutil
+import tempfile
+import unittest
+
+from burton import database
+
+class FlatFileTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.temp_dir, "saved")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _read(self, *path):
+        fp = open(os.path.join(self.filename, *path), "rb")
+        contents = fp.read()
+        fp.close()
+        return contents
+
+    def test_write_string_mapping_for_platform(self):
+        db = database.FlatFile(self.filename)
+        db._get_current_time = mock.Mock(return_value = "2010-12-02 02:20:00")
+
+        db.connect()
+        db.write_string_mapping_for_platform(
+            "Mac",
+            {
+                u"SomeString"  : u"Translation for some string",
+                u"OtherString" : u"Translation for\tsome other string",
+            }
+        )
+        self.assertTrue(db.disconnect())
+
+        self.assertEquals(
+            self._read("translation_keys"),
+            "OtherString\t2010-12-02 02:20:00\n" +
+            "SomeString\t2010-12-02 02:20:00\n"
+        )
+        self.assertEquals(
+            self._read("platforms", "Mac"),
+            "OtherString\tTranslation for\\tsome other string\n" +
+            "SomeString\tTranslation for some string\n"
+        )
+
+        db._get_current_time = mock.Mock(return_value = "2010-12-03 02:20:00")
+
+        db.connect()
+        db.write_string_mapping_for_platform(
+            "Mac",
+            { u"SomeString" : u"New translation for some string" }
+        )
+        db.write_string_mapping_for_platform(
+            "Win",
+            { u"Caf\xe9" : u"Caf\xe9\n\u65e5" }
+        )
+        self.assertTrue(db.disconnect())
+
+        self.assertEquals(
+            self._read("translation_keys"),
+            "Caf\xc3\xa9\t2010-12-03 02:20:00\n" +
+            "OtherString\t2010-12-03 02:20:00\n" +
+            "SomeString\t2010-12-03 02:20:00\n"
+        )
+        self.assertEquals(
+            self._read("platforms", "Mac"),
+            "SomeString\tNew translation for some string\n"
+        )
+        self.assertEquals(
+            self._read("platforms", "Win"),
+            "Caf\xc3\xa9\tCaf\xc3\xa9\\n\xe6\x97\xa5\n"
+        )
+
+    def test_disconnect_does_not_rewrite_unchanged_database(self):
+        db = database.FlatFile(self.filename)
+
+        db.connect()
+        db.write_string_mapping_for_platform(
+            "Mac",
+            { u"SomeString" : u"Translation for some string" }
+        )
+        self.assertTrue(db.disconnect())
+
+        db.connect()
+        db._open_for_writing = mock.Mock()
+        db.write_string_mapping_for_platform(
+            "Mac",
+            { u"SomeString" : u"Translation for some string" }
+        )
+        self.assertFalse(db.disconnect())
+        self.assertFalse(db._open_for_writing.called)
+
+    def test_reads_saved_database(self):
+        db = database.FlatFile(self.filename)
+
+        db.connect()
+        db.write_string_mapping_for_platform(
+            "Mac",
+            {
+                u"SomeString"  : u"Mac translation for some string",
+                u"OtherString" : u"Translation for some\\other string",
+            }
+        )
+        db.write_string_mapping_for_platform(
+            "Win",
+            { u"SomeString" : u"Win translation for some string" }
+        )
+        db.disconnect()
+
+        db = database.FlatFile(self.filename)
+        db.connect()
+
+        self.assertEquals(db.get_platforms(), [ "Mac", "Win" ])
+        self.assertEquals(
+            db.get_all_translation_keys(),
+            [ u"OtherString", u"SomeString" ]
+        )
+        self.assertEquals(
+            db.get_string_mapping_for_platform("Mac"),
+            {
+                u"SomeString"  : u"Mac translation for some string",
+                u"OtherString" : u"Translation for some\\other string",
+            }
+        )
+        self.assertEquals(
+            db.get_native_translations_for_platform("Win"),
+            frozenset([ u"Win translation for some string" ])
+        )
+        self.assertEquals(
+            db.get_all_native_translations(),
+            frozenset([
+                u"Mac translation for some string",
+                u"Translation for some\\other string",
+                u"Win translation for some string",
+            ])
+        )
+
+        db.disconnect()
+
+    def test_platform_names_stay_in_platforms_directory(self):
+        platforms = [ u"..", u".", u"../Mac", u"Win\\..\\Mac", u"Mac OS 10.6" ]
+        db = database.FlatFile(self.filename)
+
+        db.connect()
+        for platform in platforms:
+            db.write_string_mapping_for_platform(
+                platform,
+                { u"SomeString" : platform + u" translation" }
+            )
+        db.disconnect()
+
+        self.assertEquals(
+            sorted(os.listdir(self.filename)),
+            [ "platforms", "translation_keys" ]
+        )
+        self.assertEquals(
+            sorted(os.listdir(os.path.join(self.filename, "platforms"))),
+            [ "%2E", "%2E%2E", "..%2FMac", "Mac OS 10.6", "Win%5C..%5CMac" ]
+        )
+
+        db = database.FlatFile(self.filename)
+        db.connect()
+
+        self.assertEquals(db.get_platforms(), sorted(platforms))
+        for platform in platforms:
+            self.assertEquals(
+                db.get_string_mapping_for_platform(platform),
+                { u"SomeString" : platform + u" translation" }
+            )
+
+        self.assertRaises(
+            ValueError,
+            db.write_string_mapping_for_platform,
+            u"",
+            { }
+        )
+
+        db.disconnect()
+
+    def test_remove_old_unmapped_strings(self):
+        db = database.FlatFile(self.filename)
+        db._get_current_time = mock.Mock(return_value = "2010-12-02 02:20:00")
+
+        db.connect()
+        db.write_string_mapping_for_platform(
+            "Mac",
+            {
+                u"SomeString"  : u"Translation for some string",
+                u"OtherString" : u"Translation for some other string",
+            }
+        )
+        db.disconnect()
+
+        db.connect()
+        db.write_string_mapping_for_platform(
+            "Mac",
+            { u"SomeString" : u"Translation for some string" }
+        )
+        db.write_string_mapping_for_platform(
+            "Win",
+            { u"NewString" : u"Translation for a new string" }
+        )
+
+        db._get_translation_key_date_threshold = mock.Mock(
+            return_value = "2010-12-01 00:00:00"
+        )
+        db.remove_old_unmapped_strings()
+        self.assertEquals(
+            db.get_all_translation_keys(),
+            [ u"NewString", u"OtherString", u"SomeString" ]
+        )
+
+        db._get_translation_key_date_threshold = mock.Mock(
+            return_value = "2010-12-03 00:00:00"
+        )
+        self.assertEquals(db.remove_old_unmapped_strings(), 1)
+        self.assertEquals(
+            db.get_all_translation_keys(),
+            [ u"NewString", u"SomeString" ]
+        )
+
+        db.disconnect()
+
+        self.assertEquals(
+            self._read("translation_keys"),
+            "NewString\t2010-12-02 02:20:00\n" +
+            "SomeString\t2010-12-02 02:20:00\n"
+        )
+        self.assertEquals(
+            self._read("defunct_translations"),
+            "OtherString\t2010-12-02 02:20:00\n"
+        )
+
+    def test_prune_if_due(self):
+        db = database.FlatFile(self.filename)
+        db._get_current_time = mock.Mock(return_value = "2010-12-02 02:20:00")
+
+        db.connect()
+        db.write_string_mapping_for_platform(
+            "Mac",
+            {
+                u"SomeString"  : u"Translation for some string",
+                u"OtherString" : u"Translation for some other string",
+            }
+        )
+        db.write_string_mapping_for_platform(
+            "Mac",
+            { u"SomeString" : u"Translation for some string" }
+        )
+
+        self.assertTrue(db.is_prune_due(7))
+        self.assertEquals(db.prune_if_due(7, 30), 1)
+        self.assertEquals(db.get_all_translation_keys(), [ u"SomeString" ])
+        db.disconnect()
+
+        self.assertEquals(
+            self._read("maintenance"),
+            "prune\t2010-12-02 02:20:00\n"
+        )
+
+        db._get_date_threshold = mock.Mock(return_value = "2010-11-25 02:20:00")
+        db.connect()
+        self.assertFalse(db.is_prune_due(7))
+        self.assertEquals(db.prune_if_due(7, 30), None)
+
+        db._get_date_threshold = mock.Mock(return_value = "2010-12-03 02:20:00")
+        self.assertEquals(db.prune_if_due(7, 30), 0)
+        db.disconnect()
+
+    def test_get_dump_size(self):
+        db = database.FlatFile(self.filename)
+
+        db.connect()
+        db.write_string_mapping_for_platform(
+            "Mac",
+            { u"SomeString" : u"Translation for some string" }
+        )
+        db.write_string_mapping_for_platform(
+            "Win",
+            { u"SomeString" : u"Translation for some string" }
+        )
+        db.disconnect()
+
+        db.connect()
+        db.write_string_mapping_for_platform(
+            "Mac",
+            { u"OtherString" : u"Translation for some other string" }
+        )
+        dump_size = db.get_dump_size()
+        db.disconnect()
+
+        size = 0
+        for root, subdirs, files in os.walk(self.filename):
+            for file in files:
+                size += os.path.getsize(os.path.join(root, file))
+
+        self.assertEquals(dump_size, size)
+
+    def test_iter_translation_key_coverage(self):
+        db = database.FlatFile(self.filename)
+
+        db.connect()
+        db.write_string_mapping_for_platform(
+            "Mac",
+            {
+                u"SomeString"  : u"Translation for some string",
+                u"OtherString" : u"Translation for some other string",
+            }
+        )
+        db.write_string_mapping_for_platform(
+            "Win",
+            { u"SomeString" : u"Translation for some string" }
+        )
+        db.disconnect()
+
+        db.connect()
+        db.write_string_mapping_for_platform("Mac", { })
+
+        self.assertEquals(
+            list(db.iter_translation_key_coverage()),
+            [
+                (u"OtherString", frozenset([ ])),
+                (u"SomeString",  frozenset([ u"Win" ])),
+            ]
+        )
+
+        db.disconnect()
+
+    def test_iter_native_translation_differences(self):
+        db = database.FlatFile(self.filename)
+
+        db.connect()
+        db.write_string_mapping_for_platform(
+            "Mac",
+            {
+                u"SomeString"  : u"Translation for some string",
+                u"OtherString" : u"Mac translation for some other string",
+                u"MacString"   : u"Translation for a Mac string",
+            }
+        )
+        db.disconnect()
+
+        db.connect()
+        db.write_string_mapping_for_platform(
+            "Win",
+            {
+                u"SomeString"  : u"Translation for some string",
+                u"OtherString" : u"Win translation for some other string",
+            }
+        )
+
+        self.assertEquals(
+            list(db.iter_native_translation_differences()),
+            [
+                (
+                    u"OtherString",
+                    {
+                        u"Mac" : u"Mac translation for some other string",
+                        u"Win" : u"Win translation for some other string",
+                    }
+                ),
+            ]
+        )
+
+        db.disconnect()
+
+    def test_iter_native_translation_differences_ignores_params(self):
+        db = database.FlatFile(self.filename)
+
+        db.connect()
+        db.write_string_mapping_for_platform(
+            "Mac",
+            {
+                u"FilesString" : u"%@ files",
+                u"SizeString"  : u"%d bytes",
+            }
+        )
+        db.write_string_mapping_for_platform(
+            "Win",
+            {
+                u"FilesString" : u"{0} files",
+                u"SizeString"  : u"{0} kilobytes",
+            }
+        )
+
+        self.assertEquals(
+            list(db.iter_native_translation_differences()),
+            [
+                (
+                    u"SizeString",
+                    {
+                        u"Mac" : u"%d bytes",
+                        u"Win" : u"{0} kilobytes",
+                    }
+                ),
+            ]
+        )
+
+        db.disconnect()
+
+    def test_close_does_not_write_changes(self):
+        db = database.FlatFile(self.filename)
+
+        db.connect()
+        db.write_string_mapping_for_platform(
+            "Mac",
+            { u"SomeString" : u"Translation for some string" }
+        )
+        db.close()
+
+        self.assertFalse(
+            os.path.exists(os.path.join(self.filename, "translation_keys"))
+        )
+        self.assertEquals(
+            os.listdir(os.path.join(self.filename, "platforms")),
+            [ ]
+        )
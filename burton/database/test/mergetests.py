@@ -0,0 +1,197 @@
+import collections
+import mock
+import os
+import shutil
+import tempfile
+import unittest
+
+from burton import database
+
+class MergeTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _path(self, filename):
+        return os.path.join(self.temp_dir, filename)
+
+    def _read(self, filename):
+        fp = open(self._path(filename), "r")
+        contents = fp.read()
+        fp.close()
+        return contents
+
+    def _run(self, input_filename, output_filename, mappings_by_platform):
+        shutil.copy(self._path(input_filename), self._path(output_filename))
+
+        db = database.SQLite(self._path(output_filename), in_memory = True)
+        db.connect()
+        for platform, mapping in mappings_by_platform:
+            db.write_string_mapping_for_platform(platform, mapping)
+        db.disconnect()
+
+    @mock.patch.object(database.SQLite, "_get_current_time")
+    def test_merge(self, time_func):
+        time_func.return_value = "'2010-12-02 02:20:00'"
+
+        db = database.SQLite(self._path("base.sql"), in_memory = True)
+        db.connect()
+        db.write_string_mapping_for_platform(
+            "Mac",
+            {
+                u"SomeString"  : u"Translation for some string %@",
+                u"OtherString" : u"Translation for some other string",
+            }
+        )
+        db.write_string_mapping_for_platform(
+            "Win",
+            { u"SomeString" : u"Translation for some string %s" }
+        )
+        db.disconnect()
+
+        time_func.return_value = "'2010-12-03 02:20:00'"
+
+        mac_mapping = {
+            u"SomeString" : u"New translation for some string %@",
+            u"MacString"  : u"Translation for a Mac string %d",
+        }
+        win_mapping = {
+            u"SomeString" : u"Translation for some string %s",
+            u"WinString"  : u"Translation for a Windows string {0}",
+        }
+
+        self._run("base.sql", "serial.sql", [
+            ("Mac", mac_mapping),
+            ("Win", win_mapping),
+        ])
+        self._run("base.sql", "mac.sql", [ ("Mac", mac_mapping) ])
+        self._run("base.sql", "win.sql", [ ("Win", win_mapping) ])
+
+        database.merge_databases(
+            self._path("base.sql"),
+            [ self._path("mac.sql"), self._path("win.sql") ],
+            self._path("merged.sql")
+        )
+
+        self.assertEquals(self._read("merged.sql"), self._read("serial.sql"))
+
+    @mock.patch.object(database.SQLite, "_get_current_time")
+    def test_merge_matches_serial_run_for_any_mapping_order(self, time_func):
+        time_func.return_value = "'2010-12-02 02:20:00'"
+
+        db = database.SQLite(self._path("base.sql"), in_memory = True)
+        db.connect()
+        db.write_string_mapping_for_platform(
+            "Mac",
+            { u"SomeString" : u"Translation for some string %@" }
+        )
+        db.disconnect()
+
+        time_func.return_value = "'2010-12-03 02:20:00'"
+
+        # The runs pass their mappings in reverse key order, unlike the dicts
+        # the merge reads back from their SQL files
+        mappings = { }
+        for platform, param in [ ("Mac", u"%@"), ("Win", u"{0}") ]:
+            mappings[platform] = collections.OrderedDict(
+                (
+                    u"String" + unicode(index),
+                    u"Translation " + unicode(index) + u" " + param + u" " +
+                        param
+                )
+                for index in reversed(range(20))
+            )
+
+        self._run("base.sql", "serial.sql", [
+            ("Mac", mappings["Mac"]),
+            ("Win", mappings["Win"]),
+        ])
+        self._run("base.sql", "mac.sql", [ ("Mac", mappings["Mac"]) ])
+        self._run("base.sql", "win.sql", [ ("Win", mappings["Win"]) ])
+
+        database.merge_databases(
+            self._path("base.sql"),
+            [ self._path("mac.sql"), self._path("win.sql") ],
+            self._path("merged.sql")
+        )
+
+        self.assertEquals(self._read("merged.sql"), self._read("serial.sql"))
+
+    def test_merge_removes_pruned_keys(self):
+        db = database.SQLite(self._path("base.sql"), in_memory = True)
+        db.connect()
+        db.write_string_mapping_for_platform(
+            "Mac",
+            {
+                u"SomeString"  : u"Translation for some string",
+                u"OtherString" : u"Translation for some other string",
+            }
+        )
+        db.write_string_mapping_for_platform(
+            "Mac",
+            { u"SomeString" : u"Translation for some string" }
+        )
+        db.dbh.execute(
+            "update translation_keys set last_updated = '2010-12-02 02:20:00'"
+        )
+        db.dbh.commit()
+        db.disconnect()
+
+        shutil.copy(self._path("base.sql"), self._path("pruned.sql"))
+        db = database.SQLite(self._path("pruned.sql"), in_memory = True)
+        db.connect()
+        db.prune_if_due(7, 90)
+        db.disconnect()
+
+        database.merge_databases(
+            self._path("base.sql"),
+            [ self._path("pruned.sql") ],
+            self._path("merged.sql")
+        )
+
+        db = database.SQLite(self._path("merged.sql"), in_memory = True)
+        db.connect()
+        self.assertEquals(db.get_all_translation_keys(), [ u"SomeString" ])
+        self.assertEquals(
+            db.dbh.execute(
+                "select native_string from defunct_translations"
+            ).fetchall(),
+            [ (u"OtherString",) ]
+        )
+        db.close()
+
+    def test_merge_raises_on_conflict(self):
+        db = database.SQLite(self._path("base.sql"), in_memory = True)
+        db.connect()
+        db.write_string_mapping_for_platform(
+            "Mac",
+            { u"SomeString" : u"Translation for some string" }
+        )
+        db.disconnect()
+
+        self._run("base.sql", "first.sql", [
+            ("Mac", { u"SomeString" : u"First translation" }),
+        ])
+        self._run("base.sql", "second.sql", [
+            ("Mac", { u"SomeString" : u"Second translation" }),
+        ])
+        self._run("base.sql", "third.sql", [
+            ("Mac", { u"SomeString" : u"First translation" }),
+        ])
+
+        database.merge_databases(
+            self._path("base.sql"),
+            [ self._path("first.sql"), self._path("third.sql") ],
+            self._path("merged.sql")
+        )
+
+        self.assertRaises(
+            database.MergeConflict,
+            database.merge_databases,
+            self._path("base.sql"),
+            [ self._path("first.sql"), self._path("second.sql") ],
+            self._path("conflict.sql")
+        )
+        self.assertFalse(os.path.exists(self._path("conflict.sql")))
@@ -2,11 +2,16 @@ import codecs
 import cStringIO
 import mock
 import os
+import shutil
 import sqlite3
+import tempfile
 import unittest
 
 from burton import database
 
+some_key  = database.translation_key_id(u"SomeString")
+other_key = database.translation_key_id(u"OtherString")
+
 class SQLiteTests(unittest.TestCase):
     def tearDown(self):
         if os.path.exists('some_filename.db'):
@@ -38,18 +43,20 @@ class SQLiteTests(unittest.TestCase):
 
         cursor = db.dbh.cursor()
         self.assertEquals(
-            cursor.execute("select * from translation_keys").fetchall(),
+            cursor.execute(
+                "select * from translation_keys order by translation_key desc"
+            ).fetchall(),
             [
-                (1, u"SomeString", u"2010-12-02 02:20:00"),
-                (2, u"OtherString", u"2010-12-02 02:20:00")
+                (some_key, u"SomeString", u"2010-12-02 02:20:00"),
+                (other_key, u"OtherString", u"2010-12-02 02:20:00")
             ],
         )
 
         self.assertEquals(
             cursor.execute("select * from native_translations").fetchall(),
             [
-                (1, 1, 1, u"Translation for some string"),
-                (2, 2, 1, u"Translation for some other string")
+                (1, other_key, 1, u"Translation for some other string"),
+                (2, some_key, 1, u"Translation for some string")
             ],
         )
 
@@ -66,20 +73,22 @@ class SQLiteTests(unittest.TestCase):
         )
 
         self.assertEquals(
-            cursor.execute("select * from translation_keys").fetchall(),
+            cursor.execute(
+                "select * from translation_keys order by translation_key desc"
+            ).fetchall(),
             [
-                (1, u"SomeString", u"2010-12-02 02:21:00"),
-                (2, u"OtherString", u"2010-12-02 02:21:00")
+                (some_key, u"SomeString", u"2010-12-02 02:21:00"),
+                (other_key, u"OtherString", u"2010-12-02 02:21:00")
             ],
         )
 
         self.assertEquals(
             cursor.execute("select * from native_translations").fetchall(),
             [
-                (1, 1, 1, u"Translation for some string"),
-                (2, 2, 1, u"Translation for some other string"),
-                (3, 1, 2, u"Translation for some string"),
-                (4, 2, 2, u"Translation for some other string")
+                (1, other_key, 1, u"Translation for some other string"),
+                (2, some_key, 1, u"Translation for some string"),
+                (3, other_key, 2, u"Translation for some other string"),
+                (4, some_key, 2, u"Translation for some string")
             ],
         )
 
@@ -95,20 +104,22 @@ class SQLiteTests(unittest.TestCase):
         )
 
         self.assertEquals(
-            cursor.execute("select * from translation_keys").fetchall(),
+            cursor.execute(
+                "select * from translation_keys order by translation_key desc"
+            ).fetchall(),
             [
-                (1, u"SomeString", u"2010-12-02 02:22:00"),
-                (2, u"OtherString", u"2010-12-02 02:21:00")
+                (some_key, u"SomeString", u"2010-12-02 02:22:00"),
+                (other_key, u"OtherString", u"2010-12-02 02:21:00")
             ],
         )
 
         self.assertEquals(
             cursor.execute("select * from native_translations").fetchall(),
             [
-                (1, 1, 1, u"New translation for some string"),
-                (2, 2, 1, u"Translation for some other string"),
-                (3, 1, 2, u"Translation for some string"),
-                (4, 2, 2, u"Translation for some other string")
+                (1, other_key, 1, u"Translation for some other string"),
+                (2, some_key, 1, u"New translation for some string"),
+                (3, other_key, 2, u"Translation for some other string"),
+                (4, some_key, 2, u"Translation for some string")
             ],
         )
 
@@ -123,19 +134,21 @@ class SQLiteTests(unittest.TestCase):
         )
 
         self.assertEquals(
-            cursor.execute("select * from translation_keys").fetchall(),
+            cursor.execute(
+                "select * from translation_keys order by translation_key desc"
+            ).fetchall(),
             [
-                (1, u"SomeString", u"2010-12-02 02:23:00"),
-                (2, u"OtherString", u"2010-12-02 02:23:00")
+                (some_key, u"SomeString", u"2010-12-02 02:23:00"),
+                (other_key, u"OtherString", u"2010-12-02 02:23:00")
             ],
         )
 
         self.assertEquals(
             cursor.execute("select * from native_translations").fetchall(),
             [
-                (1, 1, 1, u"New translation for some string"),
-                (2, 2, 1, u"Translation for some other string"),
-                (3, 1, 2, u"New translation for some string")
+                (1, other_key, 1, u"Translation for some other string"),
+                (2, some_key, 1, u"New translation for some string"),
+                (4, some_key, 2, u"New translation for some string")
             ],
         )
 
@@ -166,16 +179,18 @@ class SQLiteTests(unittest.TestCase):
 
         cursor = db.dbh.cursor()
         self.assertEquals(
-            cursor.execute("select * from translation_keys").fetchall(),
+            cursor.execute(
+                "select * from translation_keys order by translation_key desc"
+            ).fetchall(),
             [
-                (1, u"SomeString", u"2010-12-02 02:20:00"),
+                (some_key, u"SomeString", u"2010-12-02 02:20:00"),
             ],
         )
 
         self.assertEquals(
             cursor.execute("select * from native_translations").fetchall(),
             [
-                (1, 1, 1, "%03d of %03.3lld for {0} %@"),
+                (1, some_key, 1, "%03d of %03.3lld for {0} %@"),
             ],
         )
 
@@ -199,7 +214,7 @@ class SQLiteTests(unittest.TestCase):
         self.assertEquals(
             cursor.execute("select * from native_translations").fetchall(),
             [
-                (1, 1, 1, "%03d of %03.3lld"),
+                (1, some_key, 1, "%03d of %03.3lld"),
             ],
         )
 
@@ -213,6 +228,58 @@ class SQLiteTests(unittest.TestCase):
 
         db.disconnect()
 
+    def test_write_string_mapping_for_platform_numbers_params_in_order(self):
+        db = database.SQLite("some_filename")
+
+        def _connect(*args, **kwargs):
+            db.dbh = sqlite3.connect(":memory:")
+
+        def _disconnect(*args, **kwargs):
+            db.dbh.close()
+
+        db._connect = mock.Mock(side_effect = _connect)
+        db.disconnect = mock.Mock(side_effect = _disconnect)
+
+        db.connect()
+        db.write_string_mapping_for_platform(
+            "Mac",
+            {
+                u"OtherString" : u"%d of %s",
+                u"SomeString"  : u"%d",
+            }
+        )
+
+        cursor = db.dbh.cursor()
+        self.assertEquals(
+            cursor.execute("select * from replaced_params").fetchall(),
+            [
+                (1, 1, 1, 0, u"%d"),
+                (2, 1, 1, 1, u"%s"),
+                (3, 1, 2, 0, u"%d"),
+            ],
+        )
+
+        db.write_string_mapping_for_platform(
+            "Mac",
+            {
+                u"OtherString" : u"%d of %s of %@",
+                u"SomeString"  : u"{0} and {1}",
+            }
+        )
+
+        self.assertEquals(
+            cursor.execute("select * from replaced_params").fetchall(),
+            [
+                (4, 1, 1, 0, u"%d"),
+                (5, 1, 1, 1, u"%s"),
+                (6, 1, 1, 2, u"%@"),
+                (7, 1, 2, 0, u"{0}"),
+                (8, 1, 2, 1, u"{1}"),
+            ],
+        )
+
+        db.disconnect()
+
     @mock.patch.object(os.path, "abspath")
     def test_update_from_vcs(self, mock_function):
         mock_function.return_value = "some_full_path"
@@ -263,6 +330,8 @@ class SQLiteTests(unittest.TestCase):
         db._connect = mock.Mock(side_effect = _connect)
         db.disconnect = mock.Mock(side_effect = _disconnect)
 
+        db._upgrade_schema = mock.Mock()
+
         orig_load_database = db._load_database
         db._load_database = mock.Mock(side_effect = orig_load_database)
 
@@ -288,6 +357,214 @@ class SQLiteTests(unittest.TestCase):
 
         db.disconnect()
 
+    @mock.patch.object(os.path, "exists")
+    def test_connect_upgrades_existing_database(self, mock_function):
+        mock_function.return_value = True
+        db = database.SQLite("some_filename", in_memory = True)
+
+        db._open_for_reading = mock.Mock(
+            return_value = cStringIO.StringIO(
+                """CREATE TABLE translation_keys (
+                    translation_key_no INTEGER PRIMARY KEY,
+                    translation_key TEXT UNIQUE NOT NULL,
+                    last_updated INTEGER NOT NULL
+                );
+
+                CREATE TABLE native_translations (
+                    native_translation_no INTEGER PRIMARY KEY,
+                    translation_key_no INTEGER NOT NULL,
+                    platform_no INTEGER NOT NULL,
+                    translation TEXT NOT NULL
+                );
+
+                CREATE TABLE replaced_params (
+                    translation_param_no INTEGER PRIMARY KEY,
+                    platform_no INTEGER NOT NULL,
+                    native_translation_no INTEGER NOT NULL,
+                    param_index INTEGER NOT NULL,
+                    param_string TEXT NOT NULL
+                );
+                """
+            )
+        )
+
+        db.connect()
+
+        cursor = db.dbh.cursor()
+        self.assertEquals(
+            cursor.execute(
+                """select name
+                from sqlite_master
+                where type = 'index'
+                    and sql not null
+                order by name
+                """
+            ).fetchall(),
+            [
+                (u"idx_native_translations_platform",),
+                (u"idx_replaced_params_native_translation",),
+            ]
+        )
+
+        self.assertEquals(
+            cursor.execute("select version from schema_info").fetchall(),
+            [ (database.SQLite.schema_version,) ]
+        )
+        cursor.close()
+
+        db.dbh.close()
+
+    @mock.patch.object(os.path, "exists")
+    def test_connect_unescapes_version_1_database(self, mock_function):
+        mock_function.return_value = True
+        db = database.SQLite("some_filename", in_memory = True)
+
+        db._open_for_reading = mock.Mock(
+            return_value = cStringIO.StringIO(
+                """CREATE TABLE translation_keys (
+                    translation_key_no INTEGER PRIMARY KEY,
+                    translation_key TEXT UNIQUE NOT NULL,
+                    last_updated INTEGER NOT NULL
+                );
+                INSERT INTO "translation_keys" VALUES(1,'Caf\\xe9 %@',0);
+
+                CREATE TABLE native_translations (
+                    native_translation_no INTEGER PRIMARY KEY,
+                    translation_key_no INTEGER NOT NULL,
+                    platform_no INTEGER NOT NULL,
+                    translation TEXT NOT NULL
+                );
+                INSERT INTO "native_translations"
+                    VALUES(1,1,1,'Caf\\xe9 %@\\n\\u65e5');
+
+                CREATE TABLE replaced_params (
+                    translation_param_no INTEGER PRIMARY KEY,
+                    platform_no INTEGER NOT NULL,
+                    native_translation_no INTEGER NOT NULL,
+                    param_index INTEGER NOT NULL,
+                    param_string TEXT NOT NULL
+                );
+                INSERT INTO "replaced_params" VALUES(1,1,1,0,'%@');
+
+                CREATE TABLE schema_info (
+                    version INTEGER NOT NULL
+                );
+                INSERT INTO "schema_info" VALUES(1);
+                """
+            )
+        )
+
+        db.connect()
+
+        self.assertEquals(db.get_all_translation_keys(), [ u"Caf\xe9 %@" ])
+        self.assertEquals(
+            db.get_all_native_translations(),
+            frozenset([ u"Caf\xe9 %@\n\u65e5" ])
+        )
+
+        cursor = db.dbh.cursor()
+        self.assertEquals(
+            cursor.execute("select param_string from replaced_params").fetchall(),
+            [ (u"%@",) ]
+        )
+        cursor.close()
+
+        db.dbh.close()
+
+    @mock.patch.object(os.path, "exists")
+    def test_connect_renumbers_translation_keys(self, mock_function):
+        mock_function.return_value = True
+        db = database.SQLite("some_filename", in_memory = True)
+
+        db._open_for_reading = mock.Mock(
+            return_value = cStringIO.StringIO(
+                """CREATE TABLE translation_keys (
+                    translation_key_no INTEGER PRIMARY KEY,
+                    translation_key TEXT UNIQUE NOT NULL,
+                    last_updated INTEGER NOT NULL
+                );
+                INSERT INTO "translation_keys" VALUES(1,'SomeString',0);
+                INSERT INTO "translation_keys" VALUES(2,'OtherString',0);
+
+                CREATE TABLE native_translations (
+                    native_translation_no INTEGER PRIMARY KEY,
+                    translation_key_no INTEGER NOT NULL,
+                    platform_no INTEGER NOT NULL,
+                    translation TEXT NOT NULL
+                );
+                INSERT INTO "native_translations" VALUES(1,2,1,'Other');
+                INSERT INTO "native_translations" VALUES(2,1,1,'Some');
+
+                CREATE TABLE replaced_params (
+                    translation_param_no INTEGER PRIMARY KEY,
+                    platform_no INTEGER NOT NULL,
+                    native_translation_no INTEGER NOT NULL,
+                    param_index INTEGER NOT NULL,
+                    param_string TEXT NOT NULL
+                );
+
+                CREATE TABLE schema_info (
+                    version INTEGER NOT NULL
+                );
+                INSERT INTO "schema_info" VALUES(3);
+                """
+            )
+        )
+
+        db.connect()
+
+        cursor = db.dbh.cursor()
+        self.assertEquals(
+            cursor.execute(
+                """select translation_key_no, translation_key
+                from translation_keys
+                order by translation_key"""
+            ).fetchall(),
+            [ (other_key, u"OtherString"), (some_key, u"SomeString") ]
+        )
+        self.assertEquals(
+            cursor.execute(
+                """select native_translation_no, translation_key_no
+                from native_translations
+                order by native_translation_no"""
+            ).fetchall(),
+            [ (1, other_key), (2, some_key) ]
+        )
+        cursor.close()
+
+        db.dbh.close()
+
+    def test_connect_applies_pragmas(self):
+        db = database.SQLite(
+            "some_filename",
+            in_memory = True,
+            pragmas = { "cache_size" : 1234 }
+        )
+
+        db._connect()
+
+        cursor = db.dbh.cursor()
+        self.assertEquals(
+            cursor.execute("pragma cache_size").fetchone()[0],
+            1234
+        )
+        self.assertEquals(
+            cursor.execute("pragma synchronous").fetchone()[0],
+            0
+        )
+        cursor.close()
+
+        db.dbh.close()
+
+    def test_connect_rejects_invalid_pragmas(self):
+        db = database.SQLite(
+            "some_filename",
+            in_memory = True,
+            pragmas = { "cache_size" : "1; drop table platforms" }
+        )
+
+        self.assertRaises(ValueError, db._connect)
+
     def test_disconnect_saves_existing_database(self):
         db = database.SQLite("some_filename")
 
@@ -325,6 +602,164 @@ class SQLiteTests(unittest.TestCase):
             """.replace("    ", "")
         )
 
+    def test_disconnect_saves_rows_in_key_order(self):
+        db = database.SQLite("some_filename", in_memory = True)
+
+        def _connect(*args, **kwargs):
+            db.dbh = sqlite3.connect(":memory:")
+
+        lines = []
+        def _write(line):
+            lines.append(line)
+
+        db.connect = mock.Mock(side_effect = _connect)
+
+        output_file = mock.Mock()
+        output_file.write = mock.Mock(side_effect = _write)
+        db._open_for_writing = mock.Mock(return_value = output_file)
+
+        db.connect()
+        cursor = db.dbh.cursor()
+        cursor.execute(
+            "create table test_table " +
+            "(test_no INTEGER PRIMARY KEY, test_column TEXT UNIQUE NOT NULL);"
+        )
+        cursor.execute("insert into test_table (test_column) values('b');")
+        cursor.execute("insert into test_table (test_column) values('c');")
+        cursor.execute("insert into test_table (test_column) values('a');")
+
+        db.disconnect()
+
+        self.assertEquals(
+            "".join(lines),
+            """BEGIN TRANSACTION;
+            CREATE TABLE test_table (test_no INTEGER PRIMARY KEY, test_column TEXT UNIQUE NOT NULL);
+            INSERT INTO "test_table" VALUES(3,'a');
+            INSERT INTO "test_table" VALUES(1,'b');
+            INSERT INTO "test_table" VALUES(2,'c');
+            COMMIT;
+            """.replace("            ", "")
+        )
+
+    def test_disconnect_does_not_rewrite_unchanged_database(self):
+        temp_dir = tempfile.mkdtemp()
+        filename = os.path.join(temp_dir, "saved.sql")
+
+        try:
+            db = database.SQLite(filename, in_memory = True)
+            db.connect()
+            db.write_string_mapping_for_platform(
+                "Mac",
+                { u"SomeString" : u"Translation for some string" }
+            )
+            self.assertTrue(db.disconnect())
+
+            db.connect()
+            db._open_for_writing = mock.Mock()
+            self.assertFalse(db.disconnect())
+            self.assertFalse(db._open_for_writing.called)
+
+            db.connect()
+            db.write_string_mapping_for_platform(
+                "Mac",
+                { u"SomeString" : u"New translation for some string" }
+            )
+            self.assertTrue(db.disconnect())
+            self.assertTrue(db._open_for_writing.called)
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_upgraded_database_dumps_like_new_database(self):
+        temp_dir = tempfile.mkdtemp()
+        filename = os.path.join(temp_dir, "saved.sql")
+
+        try:
+            db = database.SQLite(filename, in_memory = True)
+            db.connect()
+            db.write_string_mapping_for_platform(
+                "Mac",
+                { u"SomeString" : u"Translation for %@" }
+            )
+            new_dump = list(db._iterdump())
+
+            # Remove everything added since version 0, as if the SQL file had
+            # been written before it existed
+            cursor = db.dbh.cursor()
+            cursor.executescript(
+                """drop index idx_native_translations_platform;
+                drop index idx_replaced_params_native_translation;
+                drop table maintenance;
+                drop table schema_info;
+                """
+            )
+            cursor.close()
+            self.assertTrue(db.disconnect())
+
+            db.connect()
+            self.assertEquals(list(db._iterdump()), new_dump)
+            self.assertTrue(db.disconnect())
+
+            fp = codecs.open(filename, "r", "utf-8")
+            self.assertEquals(fp.read(), u"\n".join(new_dump) + u"\n")
+            fp.close()
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_get_dump_size(self):
+        temp_dir = tempfile.mkdtemp()
+        filename = os.path.join(temp_dir, "saved.sql")
+
+        try:
+            db = database.SQLite(filename, in_memory = True)
+            db.connect()
+            db.write_string_mapping_for_platform(
+                "Mac",
+                { u"SomeString" : u"Translation f\xfcr %@" }
+            )
+
+            dump_size = db.get_dump_size()
+            self.assertTrue(db.disconnect())
+            self.assertEquals(os.path.getsize(filename), dump_size)
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_translation_key_id(self):
+        self.assertEquals(
+            database.translation_key_id(u"SomeString"),
+            8307848358692455887
+        )
+        self.assertEquals(
+            database.translation_key_id("SomeString"),
+            database.translation_key_id(u"SomeString")
+        )
+        self.assertEquals(
+            database.translation_key_id(u"Caf\xe9"),
+            9035355965982454406
+        )
+
+    @mock.patch.object(database.sqlite, "translation_key_id")
+    def test_write_string_mapping_for_platform_detects_collisions(
+        self,
+        translation_key_id_func
+    ):
+        translation_key_id_func.return_value = 1
+        db = database.SQLite("some_filename", in_memory = True)
+
+        db.connect()
+        db.write_string_mapping_for_platform(
+            "Mac",
+            { u"SomeString" : u"Translation for some string" }
+        )
+
+        self.assertRaises(
+            ValueError,
+            db.write_string_mapping_for_platform,
+            "Mac",
+            { u"OtherString" : u"Translation for some other string" }
+        )
+
+        db.close()
+
     def test_remove_old_unmapped_strings(self):
         db = database.SQLite("some_filename")
 
@@ -350,29 +785,31 @@ class SQLiteTests(unittest.TestCase):
         self.assertEquals(
             cursor.execute("""
                 select translation_key_no, translation_key
-                from translation_keys"""
+                from translation_keys
+                order by translation_key"""
             ).fetchall(),
             [
-                (2, u"OtherString"),
-                (1, u"SomeString")
+                (other_key, u"OtherString"),
+                (some_key, u"SomeString")
             ],
         )
 
         cursor.execute("""
             delete from native_translations
-            where translation_key_no = 1
-        """)
+            where translation_key_no = ?
+        """, (some_key,))
 
         db.remove_old_unmapped_strings()
 
         self.assertEquals(
             cursor.execute("""
                 select translation_key_no, translation_key
-                from translation_keys"""
+                from translation_keys
+                order by translation_key"""
             ).fetchall(),
             [
-                (2, u"OtherString"),
-                (1, u"SomeString")
+                (other_key, u"OtherString"),
+                (some_key, u"SomeString")
             ],
         )
 
@@ -386,11 +823,12 @@ class SQLiteTests(unittest.TestCase):
         self.assertEquals(
             cursor.execute("""
                 select translation_key_no, translation_key
-                from translation_keys"""
+                from translation_keys
+                order by translation_key"""
             ).fetchall(),
             [
-                (2, u"OtherString"),
-                (1, u"SomeString")
+                (other_key, u"OtherString"),
+                (some_key, u"SomeString")
             ],
         )
 
@@ -399,20 +837,78 @@ class SQLiteTests(unittest.TestCase):
             set last_updated = datetime('now', '-91 days')
         """)
 
-        db.remove_old_unmapped_strings()
+        self.assertEquals(db.remove_old_unmapped_strings(), 1)
 
         self.assertEquals(
             cursor.execute("""
                 select translation_key_no, translation_key
-                from translation_keys"""
+                from translation_keys
+                order by translation_key"""
+            ).fetchall(),
+            [
+                (other_key, u"OtherString")
+            ],
+        )
+
+        self.assertEquals(
+            cursor.execute("""
+                select language_no, native_string, translation
+                from defunct_translations"""
             ).fetchall(),
             [
-                (2, u"OtherString")
+                (None, u"SomeString", u"SomeString")
             ],
         )
 
         db.disconnect()
 
+    def test_prune_if_due(self):
+        db = database.SQLite("some_filename", in_memory = True)
+
+        def _disconnect(*args, **kwargs):
+            db.dbh.close()
+
+        db.disconnect = mock.Mock(side_effect = _disconnect)
+
+        db.connect()
+        db.write_string_mapping_for_platform(
+            "Mac",
+            {
+                u"SomeString" : u"Translation for some string %d",
+                u"OtherString" : u"Translation for some other string",
+            }
+        )
+
+        cursor = db.dbh.cursor()
+        cursor.execute("""
+            delete from native_translations
+            where translation_key_no = ?
+        """, (some_key,))
+        cursor.execute("""
+            update translation_keys
+            set last_updated = datetime('now', '-31 days')
+        """)
+
+        self.assertTrue(db.is_prune_due(7))
+        self.assertEquals(db.prune_if_due(7, 30), 1)
+        self.assertFalse(db.is_prune_due(7))
+        self.assertEquals(db.get_all_translation_keys(), [ u"OtherString" ])
+        self.assertEquals(
+            cursor.execute("select count(*) from replaced_params").fetchone(),
+            (0,)
+        )
+
+        self.assertEquals(db.prune_if_due(7, 30), None)
+
+        cursor.execute("""
+            update maintenance
+            set last_run = datetime('now', '-8 days')
+        """)
+        self.assertEquals(db.prune_if_due(7, 30), 0)
+
+        cursor.close()
+        db.disconnect()
+
     def test_get_platforms(self):
         db = database.SQLite("some_filename")
 
@@ -544,10 +1040,10 @@ class SQLiteTests(unittest.TestCase):
 
         self.assertEquals(
             db.get_all_native_translations(),
-            [
+            frozenset([
                 u"Mac translation for some string",
                 u"Mac translation for some other string"
-            ],
+            ]),
         )
 
         db.disconnect()
@@ -575,7 +1071,163 @@ class SQLiteTests(unittest.TestCase):
 
         self.assertEquals(
             db.get_native_translations_for_platform("Mac"),
-            [ "%03d of %03.3lld for {0} %@" ]
+            frozenset([ "%03d of %03.3lld for {0} %@" ])
+        )
+
+        db.disconnect()
+
+    def test_iter_translation_key_coverage(self):
+        db = database.SQLite("some_filename", in_memory = True)
+
+        def _disconnect(*args, **kwargs):
+            db.dbh.close()
+
+        db.disconnect = mock.Mock(side_effect = _disconnect)
+
+        db.connect()
+        db.write_string_mapping_for_platform(
+            "Mac",
+            {
+                u"SomeString"  : u"Translation for some string",
+                u"OtherString" : u"Translation for some other string",
+            }
+        )
+        db.write_string_mapping_for_platform(
+            "Win",
+            { u"SomeString" : u"Translation for some string" }
+        )
+        db.write_string_mapping_for_platform("Mac", { })
+
+        self.assertEquals(
+            list(db.iter_translation_key_coverage()),
+            [
+                (u"OtherString", frozenset([ ])),
+                (u"SomeString",  frozenset([ u"Win" ])),
+            ]
+        )
+
+        db.disconnect()
+
+    def test_iter_native_translation_differences(self):
+        db = database.SQLite("some_filename", in_memory = True)
+
+        def _disconnect(*args, **kwargs):
+            db.dbh.close()
+
+        db.disconnect = mock.Mock(side_effect = _disconnect)
+
+        db.connect()
+        db.write_string_mapping_for_platform(
+            "Mac",
+            {
+                u"SomeString"  : u"Translation for some string",
+                u"OtherString" : u"Mac translation for some other string",
+                u"MacString"   : u"Translation for a Mac string",
+            }
+        )
+        db.write_string_mapping_for_platform(
+            "Win",
+            {
+                u"SomeString"  : u"Translation for some string",
+                u"OtherString" : u"Win translation for some other string",
+            }
+        )
+
+        self.assertEquals(
+            list(db.iter_native_translation_differences()),
+            [
+                (
+                    u"OtherString",
+                    {
+                        u"Mac" : u"Mac translation for some other string",
+                        u"Win" : u"Win translation for some other string",
+                    }
+                ),
+            ]
+        )
+
+        db.disconnect()
+
+    def test_iter_native_translation_differences_ignores_params(self):
+        db = database.SQLite("some_filename", in_memory = True)
+
+        def _disconnect(*args, **kwargs):
+            db.dbh.close()
+
+        db.disconnect = mock.Mock(side_effect = _disconnect)
+
+        db.connect()
+        db.write_string_mapping_for_platform(
+            "Mac",
+            {
+                u"FilesString" : u"%@ files",
+                u"SizeString"  : u"%d bytes",
+            }
+        )
+        db.write_string_mapping_for_platform(
+            "Win",
+            {
+                u"FilesString" : u"{0} files",
+                u"SizeString"  : u"{0} kilobytes",
+            }
+        )
+
+        self.assertEquals(
+            list(db.iter_native_translation_differences()),
+            [
+                (
+                    u"SizeString",
+                    {
+                        u"Mac" : u"%d bytes",
+                        u"Win" : u"{0} kilobytes",
+                    }
+                ),
+            ]
+        )
+
+        db.disconnect()
+
+    def test_native_translations_are_cached_until_written(self):
+        db = database.SQLite("some_filename", in_memory = True)
+
+        def _connect(*args, **kwargs):
+            db.dbh = sqlite3.connect(":memory:")
+
+        def _disconnect(*args, **kwargs):
+            db.dbh.close()
+
+        db._connect = mock.Mock(side_effect = _connect)
+        db.disconnect = mock.Mock(side_effect = _disconnect)
+
+        db.connect()
+        db.write_string_mapping_for_platform(
+            "Mac",
+            { u"SomeString" : u"Translation for some string" }
+        )
+
+        native_translations = db.get_native_translations_for_platform("Mac")
+        all_native_translations = db.get_all_native_translations()
+
+        self.assertTrue(
+            db.get_native_translations_for_platform("Mac") is \
+                native_translations
+        )
+        self.assertTrue(
+            db.get_all_native_translations() is all_native_translations
+        )
+
+        db.write_string_mapping_for_platform(
+            "Mac",
+            { u"SomeString" : u"New translation for some string" }
+        )
+
+        self.assertEquals(
+            db.get_native_translations_for_platform("Mac"),
+            frozenset([ u"New translation for some string" ])
+        )
+        self.assertEquals(
+            db.get_all_native_translations(),
+            frozenset([ u"New translation for some string" ])
         )
 
         db.disconnect()
@@ -594,6 +1246,26 @@ class SQLiteTests(unittest.TestCase):
 
         open_func.assert_called_with("filename", "w", "utf-8")
 
+    def test_in_memory_database_does_not_create_temp_file(self):
+        db = database.SQLite("some_filename", in_memory = True)
+
+        output_file = mock.Mock()
+        db._open_for_writing = mock.Mock(return_value = output_file)
+
+        db.connect()
+        self.assertFalse(os.path.exists("some_filename.db"))
+
+        db.write_string_mapping_for_platform(
+            "Mac",
+            { u"SomeString" : u"Translation for some string" }
+        )
+
+        db.disconnect()
+
+        self.assertFalse(os.path.exists("some_filename.db"))
+        db._open_for_writing.assert_called_with("some_filename")
+        self.assertTrue(output_file.write.called)
+
     @mock.patch.object(os.path, "exists")
     def test_deletes_existing_temp_file_on_connect(self, exists_func):
         exists_func.return_value = True
@@ -601,6 +1273,7 @@ class SQLiteTests(unittest.TestCase):
         db = database.SQLite("some_filename")
         db._remove_temporary_file = mock.Mock()
         db._load_database         = mock.Mock()
+        db._upgrade_schema        = mock.Mock()
 
         db.connect()
 
@@ -0,0 +1,15 @@
+import hashlib
+import struct
+
+def translation_key_id(translation_key):
+    """Returns the ID of a translation key, which is the first 8 bytes of the
+    SHA-1 hash of the key's UTF-8 encoding, read as a signed 64-bit integer.
+    The ID only depends on the text of the key, so every database agrees on it.
+    """
+    if not isinstance(translation_key, unicode):
+        translation_key = translation_key.decode("utf-8")
+
+    return struct.unpack(
+        ">q",
+        hashlib.sha1(translation_key.encode("utf-8")).digest()[:8]
+    )[0]
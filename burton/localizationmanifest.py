@@ -0,0 +1,152 @@
+import hashlib
+import json
+import logging
+import os
+import sys
+
+import burton
+
+from outputfile import hash_file, write_if_changed
+
+class LocalizationManifest(object):
+    """The LocalizationManifest class records, for each resource file and
+    language, a hash of everything that went into its localized output and a
+    hash of each file that was written, so that outputs whose inputs have not
+    changed since the last run are not written again.
+
+    The inputs of an output are described by get_inputs_hash(), which is
+    passed the source file, the settings it was localized with and the subset
+    of translations its parser reads. An output is only current if its inputs
+    hash matches and its files are still as they were written, so outputs that
+    were deleted, edited or reverted are always written again. Filenames are
+    recorded relative to root_path, so that the manifest can be shared between
+    checkouts.
+    """
+
+    version = 1
+
+    def __init__(self, filename, root_path):
+        object.__init__(self)
+        self.filename  = filename
+        self.root_path = root_path
+        self._entries  = { }
+        self._changed  = False
+
+        if os.path.exists(filename):
+            self._load()
+
+    def get_key(self, input_filename, language):
+        """Returns the key which the output of input_filename in language is
+        recorded by.
+        """
+        return self.get_relative_path(input_filename) + u"\n" + language
+
+    def get_inputs_hash(self, source_hash, settings, mapping, translation_keys):
+        """Returns a hash of the inputs of a localized output. source_hash is
+        the hash of the source file, settings is a list of the other values
+        which affect the output, such as its language and output directory, and
+        translation_keys are the keys of mapping which are read, or None to
+        use all of them.
+        """
+        if translation_keys is None:
+            translation_keys = mapping.keys()
+
+        translations = [
+            (key, key in mapping, mapping.get(key))
+            for key in sorted(translation_keys)
+        ]
+
+        return hashlib.sha1(json.dumps(
+            [ LocalizationManifest.version, source_hash, settings, translations ]
+        )).hexdigest()
+
+    def is_current(self, key, inputs_hash):
+        """Returns whether the output recorded for key was produced from inputs
+        with the given hash, and its files have not changed since.
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry["inputs"] != inputs_hash:
+            return False
+
+        for filename, file_hash in entry["outputs"].items():
+            if hash_file(os.path.join(self.root_path, filename)) != file_hash:
+                return False
+
+        return True
+
+    def create_entry(self, inputs_hash, output_filenames):
+        """Returns an entry to record for an output produced from inputs with
+        the given hash, or None if any of output_filenames is not a file and
+        so cannot be checked later.
+        """
+        outputs = { }
+        for filename in output_filenames:
+            file_hash = None
+            if filename is not None:
+                file_hash = hash_file(filename)
+
+            if file_hash is None:
+                return None
+
+            outputs[self.get_relative_path(filename)] = file_hash
+
+        return { "inputs" : inputs_hash, "outputs" : outputs }
+
+    def set(self, key, entry):
+        if entry is None:
+            if key in self._entries:
+                del self._entries[key]
+                self._changed = True
+
+        elif self._entries.get(key) != entry:
+            self._entries[key] = entry
+            self._changed = True
+
+    def save(self):
+        """Writes the manifest to its file if it has changed."""
+        if not self._changed:
+            return
+
+        write_if_changed(
+            self.filename,
+            json.dumps(
+                {
+                    "version" : LocalizationManifest.version,
+                    "entries" : self._entries,
+                },
+                indent = 1,
+                sort_keys = True
+            )
+        )
+
+        self._changed = False
+
+    def get_relative_path(self, filename):
+        """Returns filename relative to root_path, as it is recorded."""
+        filename = os.path.relpath(
+            os.path.abspath(filename),
+            os.path.abspath(self.root_path)
+        )
+
+        if not isinstance(filename, unicode):
+            filename = filename.decode(sys.getfilesystemencoding() or "utf-8")
+
+        return filename.replace(os.sep, "/")
+
+    def _load(self):
+        fp = open(self.filename, "r")
+        try:
+            manifest = json.load(fp)
+
+        except ValueError:
+            logger = logging.getLogger(burton.logger_name)
+            logger.warning(
+                "Unable to read localization manifest " + self.filename
+            )
+            return
+
+        finally:
+            fp.close()
+
+        if manifest.get("version") == LocalizationManifest.version:
+            self._entries = manifest["entries"]
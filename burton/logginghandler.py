@@ -8,3 +8,26 @@ class BurtonLoggingHandler(logging.Handler):
     def emit(self, record):
         if record.levelno > self.max_level:
             self.max_level = record.levelno
+
+class BufferingLoggingHandler(logging.Handler):
+    """Keeps the records it handles in a list instead of emitting them, so that
+    a worker process can return its log records to the parent process, which
+    passes them to its own handlers in order. Records are reduced to their
+    formatted message, so that they can be pickled.
+    """
+
+    def __init__(self, *args, **kwargs):
+        logging.Handler.__init__(self, *args, **kwargs)
+        self.records = [ ]
+
+    def emit(self, record):
+        record.msg  = record.getMessage()
+        record.args = None
+
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(
+                record.exc_info
+            )
+            record.exc_info = None
+
+        self.records.append(record)
@@ -0,0 +1,112 @@
+import hashlib
+import os
+import tempfile
+
+class OutputFile(object):
+    """The OutputFile class is a file-like object which buffers everything
+    written to it, and when it is closed, only replaces the file at filename
+    if its contents have changed. Files which are written with the same
+    contents keep their modification times, so that they do not trigger
+    rebuilds, and do not need to be added to VCS again.
+
+    If encoding is given, text written to the file is encoded with it, as by
+    codecs.open(). Otherwise, if binary is False, line endings are translated
+    as they are for files opened in text mode.
+    """
+
+    def __init__(self, filename, encoding = None, binary = False):
+        object.__init__(self)
+        self.name     = filename
+        self.encoding = encoding
+        self.binary   = binary or encoding is not None
+        self.changed  = None
+        self.closed   = False
+        self._parts   = [ ]
+
+    def write(self, data):
+        self._parts.append(data)
+
+    def writelines(self, lines):
+        self._parts.extend(lines)
+
+    def close(self):
+        """Writes the buffered contents to the file if they have changed, and
+        sets changed to whether the file was created or replaced.
+        """
+        if self.closed:
+            return
+
+        contents = "".join(self._parts)
+        if self.encoding is not None and len(contents) > 0:
+            contents = contents.encode(self.encoding)
+
+        if not self.binary and os.linesep != "\n":
+            contents = contents.replace("\n", os.linesep)
+
+        self.changed = write_if_changed(self.name, contents)
+        self.closed  = True
+        self._parts  = [ ]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+
+def write_if_changed(filename, contents):
+    """Writes contents to filename, unless the file already has exactly those
+    contents. The file is written to a temporary file which is then renamed, so
+    that it is never left partly written. Returns whether the file was written.
+    """
+    if os.path.isfile(filename) and \
+      os.path.getsize(filename) == len(contents) and \
+      hash_file(filename) == hashlib.sha1(contents).hexdigest():
+        return False
+
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, temp_filename = tempfile.mkstemp(dir = directory)
+    fp = os.fdopen(fd, "wb")
+    try:
+        fp.write(contents)
+        fp.close()
+
+        if os.path.exists(filename):
+            # Keep the permissions of the file being replaced, rather than the
+            # private ones tempfile creates files with
+            os.chmod(temp_filename, os.stat(filename).st_mode & 0o7777)
+
+            if os.name == "nt":
+                os.remove(filename)
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(temp_filename, 0o666 & ~umask)
+
+        os.rename(temp_filename, filename)
+
+    except Exception:
+        fp.close()
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+
+        raise
+
+    return True
+
+def hash_file(filename):
+    """Returns a hash of the contents of filename, or None if it is not a
+    file.
+    """
+    if not os.path.isfile(filename):
+        return None
+
+    file_hash = hashlib.sha1()
+    fp = open(filename, "rb")
+    try:
+        for block in iter(lambda : fp.read(65536), ""):
+            file_hash.update(block)
+    finally:
+        fp.close()
+
+    return file_hash.hexdigest()
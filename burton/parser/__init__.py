@@ -4,9 +4,11 @@ from lproj import LPROJ
 from macsource import MacSource
 from nib import NIB
 from pasteboardxml import PasteboardXML
+from projectfile import ProjectFileEdits
 from properties import Properties
 from rc import RC
 from resx import RESX
 from strings import Strings
 from stringsdict import StringsDict
+from template import ResourceTemplate, TemplateCache
 from util import *
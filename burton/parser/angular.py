@@ -7,11 +7,20 @@ import types
 import unicodedata
 
 import burton
+
 from base import Base
+from burton.outputfile import OutputFile
+from template import ResourceTemplate
 from util import detect_encoding
 
 class Angular(Base):
     REGEX_PATTERN = re.compile("'\[([^\]]+)\]'\s*:\s*'(.+)'")
+    VALUE_PATTERN = re.compile(r": '[^\[].+[^\]]'")
+    EMPTY_PATTERN = re.compile("^$")
+
+    TRANSLATIONS_LINE  = "$translateProvider.translations('%s', strings);"
+    VALUE_SLOT         = "value"
+    LANGUAGE_CODE_SLOT = "language_code"
 
     def __init__(self):
         Base.__init__(self)
@@ -63,60 +72,126 @@ class Angular(Base):
 
         file.close()
 
-    def translate(
+    def translate_languages(
         self,
         input_filename,
-        output_directory,
-        mapping,
-        language,
-        language_code,
+        translations,
         should_use_vcs,
         vcs_class,
         proj_file
     ):
         logger = logging.getLogger(burton.logger_name)
-        logger.debug("Localizing " + input_filename + " into " + language)
 
-        output_filename = os.path.join(
-            output_directory,
-            input_filename.replace("english", language.lower()),
-        )
+        template = None
+        output_filenames = [ ]
+        for output_directory, mapping, language, language_code in translations:
+            logger.debug("Localizing " + input_filename + " into " + language)
+
+            output_filename = os.path.join(
+                output_directory,
+                input_filename.replace("english", language.lower()),
+            )
+
+            if not os.path.exists(output_filename):
+                logger.error("Created new file " + output_filename)
+
+            output_file = self._open_file_for_writing(output_filename)
 
-        created_file = False
+            if template is None:
+                template = self._load_template(input_filename)
 
-        if not os.path.exists(output_filename):
-            created_file = True
-            logger.error("Created new file " + output_filename)
+            output_file.write(template.render(
+                mapping,
+                lambda data, translation : self._render_slot(
+                    data,
+                    translation,
+                    language_code
+                )
+            ))
+
+            output_file.close()
+
+            if should_use_vcs and output_file.changed:
+                vcs_class.add_file(output_filename)
 
-        output_file = self._open_file_for_writing(output_filename)
+            output_filenames.append(None)
 
+        return output_filenames
+
+    def _load_template(self, input_filename):
         input_file, encoding = self._open_file_for_reading(input_filename)
         contents = unicode(input_file.read())
         input_file.close()
 
+        return self._get_template(
+            contents,
+            lambda : self._compile_template(contents)
+        )
+
+    def _compile_template(self, contents):
+        """Compiles the contents of a strings file into a template. Each line
+        with a translation is a slot holding the line with its key encoded,
+        split where its value goes, and each line which registers the
+        translations is a slot split where its language code goes.
+        """
+        template = ResourceTemplate()
+
         for line in re.split("\r|\n", contents):
             results = Angular.REGEX_PATTERN.search(line)
             if results is not None:
                 key = results.group(1).decode('unicode-escape')
                 value = results.group(2).decode('unicode-escape')
-                if value in mapping:
-                    value = mapping[value]
 
-                if key is not None and value is not None:
-                    line = re.sub(r"'\[[^\]]+\]'", "'[" + self._encode(key) + "]'", line)
-                    line = re.sub(r": '[^\[].+[^\]]'", ": '" + self._encode(value) + "'", line)
-            else:
-                line = line.replace(
-                    "$translateProvider.translations('en', strings);",
-                    "$translateProvider.translations('" + language_code + "', strings);"
+                keyed_line = re.sub(
+                    r"'\[[^\]]+\]'",
+                    "'[" + self._encode(key) + "]'",
+                    line
+                )
+                data = (
+                    Angular.VALUE_SLOT,
+                    Angular.VALUE_PATTERN.split(keyed_line),
+                    line
+                )
+
+                template.add_slot(
+                    [ (value, value) ],
+                    data,
+                    self._render_slot(data, value, None)
+                )
+
+            elif Angular.TRANSLATIONS_LINE % "en" in line:
+                template.add_slot(
+                    [ ],
+                    (
+                        Angular.LANGUAGE_CODE_SLOT,
+                        line.split(Angular.TRANSLATIONS_LINE % "en"),
+                        line
+                    ),
+                    None
                 )
 
-            output_file.write(line + "\n")
+            else:
+                template.add_literal(line + "\n")
+
+        return template
 
-        output_file.close()
+    def _render_slot(self, data, translation, language_code):
+        kind, parts, line = data
+        if kind == Angular.LANGUAGE_CODE_SLOT:
+            return (Angular.TRANSLATIONS_LINE % language_code).join(parts) + \
+                "\n"
+
+        if translation is None:
+            return line + "\n"
+
+        # The value is expanded as a re.sub() replacement, as it was when each
+        # line was translated with re.sub()
+        value = Angular.EMPTY_PATTERN.sub(
+            ": '" + self._encode(translation) + "'",
+            ""
+        )
 
-        if should_use_vcs:
-            vcs_class.add_file(output_filename)
+        return value.join(parts) + "\n"
 
     def _open_file_for_reading(self, filename):
         encoding = detect_encoding(open(filename, "r"))
@@ -129,7 +204,7 @@ class Angular(Base):
         return codecs.open(filename, "r", encoding), encoding
 
     def _open_file_for_writing(self, filename):
-        return open(filename, "w")
+        return OutputFile(filename)
 
     def _encode(self, str):
         return str.encode("unicode-escape").replace("'", "\\'")
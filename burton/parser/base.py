@@ -1,11 +1,14 @@
 import logging
 
 import burton
+from template import TemplateCache
 from util import filter_string, replace_params
 
 class Base(object):
     def __init__(self):
         object.__init__(self)
+        self.template_cache  = TemplateCache()
+        self.proj_file_edits = None
 
     def extract_strings_from_files(self, filenames, strings_to_ignore = []):
         logger           = logging.getLogger(burton.logger_name)
@@ -54,5 +57,97 @@ class Base(object):
 
         return reference_mapping
 
+    def translate(
+        self,
+        input_filename,
+        output_directory,
+        mapping,
+        language,
+        language_code,
+        should_use_vcs,
+        vcs_class,
+        proj_file
+    ):
+        """Writes a copy of input_filename to output_directory, with its
+        strings translated into language using mapping, and returns the name of
+        the file or directory written.
+
+        This calls translate_languages for the single language.
+        """
+        return self.translate_languages(
+            input_filename,
+            [ (output_directory, mapping, language, language_code) ],
+            should_use_vcs,
+            vcs_class,
+            proj_file
+        )[0]
+
+    def translate_languages(
+        self,
+        input_filename,
+        translations,
+        should_use_vcs,
+        vcs_class,
+        proj_file
+    ):
+        """Translates input_filename into several languages, and returns a list
+        of what translate() would have returned for each of them. translations
+        is a list of tuples of the output_directory, mapping, language and
+        language_code arguments to translate().
+
+        Parsers which translate files override this method, reading and
+        parsing input_filename only once and writing the output for every
+        language from the parsed file.
+        """
+        raise NotImplementedError(
+            self.__class__.__name__ + " does not translate resource files"
+        )
+
+    def add_proj_file_edits(self, input_filename, translations, proj_file):
+        """Adds the output files of input_filename for translations to
+        proj_file_edits, as translate_languages would, without writing them.
+        This is used for outputs which are current and are not translated
+        again, so that they are added back to proj_file if they were removed
+        from it.
+
+        The default implementation does nothing. Parsers which add their output
+        files to project files override it.
+        """
+        pass
+
+    def get_translation_keys(self, input_filename):
+        """Returns the keys in a mapping which are read when input_filename is
+        translated, or None if they are not known, in which case any of them
+        may be read.
+        """
+        template = self._load_template(input_filename)
+        if template is None:
+            return None
+
+        translation_keys = set([])
+        for lookups, data, default in template.slots:
+            for key, translation_key in lookups:
+                translation_keys.add(key)
+                translation_keys.add(translation_key)
+
+        return frozenset(translation_keys)
+
+    def _load_template(self, input_filename):
+        """Returns the ResourceTemplate that input_filename is translated with,
+        or None if it is not translated with a template. Parsers which render
+        templates override this method.
+        """
+        return None
+
+    def _get_template(self, contents, compile_func):
+        """Returns the ResourceTemplate for a file with the given contents from
+        template_cache, calling compile_func to compile it if needed.
+        """
+        return self.template_cache.get(
+            contents,
+            self.__class__.__name__,
+            compile_func
+        )
+
     def _filter_filenames(self, filenames):
         return filenames
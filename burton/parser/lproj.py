@@ -1,50 +1,53 @@
 import cStringIO
-import codecs
 import logging
 import os
 
 import burton
+
 from base import Base
+from burton.outputfile import OutputFile
 from strings import Strings
 from stringsdict import StringsDict
 from util import replace_params, restore_platform_specific_params
 
 class LPROJ(Base):
-    def translate(
+    def __init__(self):
+        Base.__init__(self)
+        self._strings_parser     = None
+        self._stringsdict_parser = None
+
+    def translate_languages(
         self,
         input_filename,
-        output_directory,
-        mapping,
-        language,
-        language_code,
+        translations,
         should_use_vcs,
         vcs_class,
         proj_file
     ):
         logger = logging.getLogger(burton.logger_name)
-        logger.debug("Localizing " + input_filename + " into " + language)
 
-        output_directory = os.path.join(
-            output_directory,
-            language_code + ".lproj"
-        )
+        lproj_translations = [ ]
+        for output_directory, mapping, language, language_code in translations:
+            logger.debug("Localizing " + input_filename + " into " + language)
+
+            output_directory = os.path.join(
+                output_directory,
+                language_code + ".lproj"
+            )
 
-        created_file = False
+            if not os.path.exists(output_directory):
+                os.mkdir(output_directory)
+                logger.error("Created new file " + output_directory)
 
-        if not os.path.exists(output_directory):
-            os.mkdir(output_directory)
-            created_file = True
-            logger.error("Created new file " + output_directory)
+            lproj_translations.append(
+                (output_directory, mapping, language, language_code)
+            )
 
         for filename in os.listdir(input_filename):
             if filename.endswith(".stringsdict"):
-                stringsdict_parser = self._create_stringsdict_parser()
-                stringsdict_parser.translate(
+                self._get_stringsdict_parser().translate_languages(
                     os.path.join(input_filename, filename),
-                    output_directory,
-                    mapping,
-                    language,
-                    language_code,
+                    lproj_translations,
                     should_use_vcs,
                     vcs_class,
                     proj_file
@@ -52,44 +55,96 @@ class LPROJ(Base):
 
 
             if filename.endswith(".strings"):
-                strings_parser = self._create_strings_parser()
+                strings_parser = self._get_strings_parser()
                 input_mapping = \
                   strings_parser.extract_mapping_from_filename(
                       os.path.join(input_filename, filename),
                       False
                   ).string_mapping_dict
 
-                output_filename = os.path.join(
-                    output_directory,
-                    os.path.basename(filename)
-                )
+                lookup = self._create_lookup(input_mapping)
+
+                for output_directory, mapping, language, language_code in \
+                  lproj_translations:
+                    output_filename = os.path.join(
+                        output_directory,
+                        os.path.basename(filename)
+                    )
+
+                    output_file_mapping = self._translate_mapping(
+                        input_mapping,
+                        lookup,
+                        mapping
+                    )
+
+                    file = self._open_file(output_filename)
+                    strings_parser.write_mapping(file, output_file_mapping)
+
+                    file.close()
+
+                    if should_use_vcs and file.changed:
+                        vcs_class.add_file(output_filename)
+
+        return [
+            output_directory for output_directory, mapping, language,
+            language_code in lproj_translations
+        ]
+
+    def _create_lookup(self, input_mapping):
+        """Returns a dictionary of each value in input_mapping, with its params
+        replaced, to a list of its params and the keys which have it, so that
+        the values of a strings file are only normalized once for all
+        languages.
+        """
+        keys_by_value = { }
+        for key in input_mapping:
+            if input_mapping[key] is not None:
+                keys_by_value.setdefault(input_mapping[key], [ ]).append(key)
+
+        lookup = { }
+        for value, keys in keys_by_value.iteritems():
+            input_key, params = replace_params(value)
+            lookup.setdefault(input_key, [ ]).append((params, keys))
+
+        return lookup
+
+    def _translate_mapping(self, input_mapping, lookup, mapping):
+        """Returns input_mapping with the values which have a translation in
+        mapping translated, using a lookup from _create_lookup().
+        """
+        output_file_mapping = dict(
+            (key, value) for key, value in input_mapping.iteritems()
+            if value is not None
+        )
+
+        for input_key, values in lookup.iteritems():
+            if input_key in mapping:
+                for params, keys in values:
+                    output_value = restore_platform_specific_params(
+                        mapping[input_key],
+                        params
+                    )
 
-                output_file_mapping = { }
+                    for key in keys:
+                        output_file_mapping[key] = output_value
 
-                for key in input_mapping:
-                    if input_mapping[key] is not None:
-                        input_key, params = replace_params(input_mapping[key])
-                        if input_key in mapping:
-                            output_value = restore_platform_specific_params(
-                                mapping[input_key],
-                                params
-                            )
-                            output_file_mapping[key] = output_value
-                        else:
-                            output_file_mapping[key] = input_mapping[key]
+        return output_file_mapping
 
-                file = self._open_file(output_filename)
-                strings_parser.write_mapping(file, output_file_mapping)
+    def _get_strings_parser(self):
+        if self._strings_parser is None:
+            self._strings_parser = self._create_strings_parser()
 
-                file.close()
+        return self._strings_parser
 
-                if should_use_vcs:
-                    vcs_class.add_file(output_filename)
+    def _get_stringsdict_parser(self):
+        if self._stringsdict_parser is None:
+            self._stringsdict_parser = self._create_stringsdict_parser()
+            self._stringsdict_parser.template_cache = self.template_cache
 
-        return output_directory
+        return self._stringsdict_parser
 
     def _open_file(self, filename):
-        return codecs.open(filename, "w", "utf-8")
+        return OutputFile(filename, "utf-8")
 
     def _create_strings_parser(self):
         return Strings()
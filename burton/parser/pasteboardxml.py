@@ -2,9 +2,13 @@ import logging
 import lxml.etree
 import os
 import re
+import StringIO
 
 import burton
+
 from base import Base
+from burton.outputfile import OutputFile
+from template import compile_xml_template, render_xml_slot
 from util import filter_string
 
 class PasteboardXML(Base):
@@ -49,58 +53,50 @@ class PasteboardXML(Base):
 
         return string_mapping
 
-    def translate(
+    def translate_languages(
         self,
         input_filename,
-        output_directory,
-        mapping,
-        language,
-        language_code,
+        translations,
         should_use_vcs,
         vcs_class,
         proj_file
     ):
         logger = logging.getLogger(burton.logger_name)
-        logger.debug("Localizing " + input_filename + " into " + language)
-
-        output_filename = None
-        if not os.path.exists(output_directory):
-            os.mkdir(output_directory)
 
-        if input_filename.endswith("-en.xml"):
-            output_filename = re.sub(
-                u"-en\.xml$",
-                u"-" + language_code + u".xml",
-                input_filename
-            )
+        template = None
+        output_filenames = [ ]
+        for output_directory, mapping, language, language_code in translations:
+            logger.debug("Localizing " + input_filename + " into " + language)
 
-            output_filename = os.path.join(output_directory, output_filename)
+            output_filename = None
+            if not os.path.exists(output_directory):
+                os.mkdir(output_directory)
 
-            if not os.path.exists(output_filename):
-                logger.error("Create new file " + output_filename)
+            if input_filename.endswith("-en.xml"):
+                output_filename = re.sub(
+                    u"-en\.xml$",
+                    u"-" + language_code + u".xml",
+                    input_filename
+                )
 
-            tree = lxml.etree.fromstring(self._read_file(input_filename))
+                output_filename = os.path.join(output_directory, output_filename)
 
-            def _rewrite_mapping(key, value, node):
-                if value in mapping:
-                    node.text = mapping[filter_string(value)]
+                if not os.path.exists(output_filename):
+                    logger.error("Create new file " + output_filename)
 
-            self._parse(tree, _rewrite_mapping)
+                if template is None:
+                    template = self._load_template(input_filename)
 
-            file = self._open_file_for_writing(output_filename)
-            lxml.etree.ElementTree(element = tree).write(
-                file,
-                xml_declaration = False,
-                pretty_print = True,
-                encoding = "utf-8"
-            )
+                file = self._open_file_for_writing(output_filename)
+                file.write(template.render(mapping, render_xml_slot))
+                file.close()
 
-            file.close()
+                if should_use_vcs and file.changed:
+                    vcs_class.add_file(output_filename)
 
-            if should_use_vcs:
-                vcs_class.add_file(output_filename)
+            output_filenames.append(output_filename)
 
-        return output_filename
+        return output_filenames
 
     def _parse(self, tree, func):
         element = tree.find(PasteboardXML.title_tag)
@@ -120,6 +116,39 @@ class PasteboardXML(Base):
                 if name != None:
                     func(name.text, name.text, name)
 
+    def _load_template(self, input_filename):
+        if not input_filename.endswith("-en.xml"):
+            return None
+
+        contents = self._read_file(input_filename)
+        return self._get_template(
+            contents,
+            lambda : self._compile_template(contents)
+        )
+
+    def _compile_template(self, contents):
+        tree = lxml.etree.fromstring(contents)
+        slots = [ ]
+
+        def _add_slot(key, value, node):
+            if value is not None:
+                slots.append((node, [ (value, filter_string(value)) ]))
+
+        self._parse(tree, _add_slot)
+
+        return compile_xml_template(tree, slots, self._serialize)
+
+    def _serialize(self, tree):
+        file = StringIO.StringIO()
+        lxml.etree.ElementTree(element = tree).write(
+            file,
+            xml_declaration = False,
+            pretty_print = True,
+            encoding = "utf-8"
+        )
+
+        return file.getvalue()
+
     def _read_file(self, filename):
         fp = open(filename, "r")
         return_value = fp.read()
@@ -127,4 +156,4 @@ class PasteboardXML(Base):
         return return_value
 
     def _open_file_for_writing(self, filename):
-        return open(filename, "w")
+        return OutputFile(filename)
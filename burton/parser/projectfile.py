@@ -0,0 +1,163 @@
+import collections
+import logging
+import lxml.etree
+import os
+
+import burton
+from burton.outputfile import OutputFile
+
+class ProjectFileEdits(object):
+    """The ProjectFileEdits class collects the localized resource files which
+    need to be added to Visual Studio project files, so that each project file
+    is loaded, modified and saved once, rather than once for every resource
+    file and language.
+
+    Call add() for each localized resource file as it is written, and save()
+    once they have all been written. Edits collected in other processes can be
+    combined with extend().
+    """
+
+    namespace = "{http://schemas.microsoft.com/developer/msbuild/2003}"
+
+    def __init__(self):
+        object.__init__(self)
+        self._edits = collections.OrderedDict()
+
+    def add(self, proj_file, input_filename, output_filename):
+        """Records that output_filename, which was localized from
+        input_filename, should be added to proj_file if it is not already in
+        it.
+        """
+        if proj_file is None or proj_file.lower() == "none":
+            return
+
+        # compute our relative path of output_filename
+        proj_base_path = os.path.dirname(os.path.abspath(proj_file)).replace('/', '\\')
+        resx_relative_path = os.path.abspath(output_filename)
+        resx_relative_path = resx_relative_path.replace('/', '\\')
+        resx_relative_path = resx_relative_path.replace(proj_base_path, '')[1:]
+
+        # calculate our filenames for the include infile name and our dependent file name
+        source_file_name = os.path.basename(input_filename)
+        out_file_name = os.path.basename(output_filename)
+
+        resx_relative_base_path = "\\".join(resx_relative_path.split('\\')[0:-1])
+        localized_element_path = resx_relative_base_path + '\\' + out_file_name
+        localized_element_path = localized_element_path.lstrip('/').lstrip('\\')
+        dep_upon_element_path = source_file_name.lstrip('/').lstrip('\\')
+
+        # determine if our dependent upon file is a compile or an embedded resource
+        element_type = 'Compile'
+        if source_file_name.endswith('.resx'):
+            element_type = 'EmbeddedResource'
+
+        self._edits.setdefault(proj_file, [ ]).append((
+            input_filename,
+            output_filename,
+            resx_relative_path,
+            localized_element_path,
+            (
+                element_type,
+                resx_relative_base_path + '\\' + dep_upon_element_path
+            ),
+        ))
+
+    def extend(self, other):
+        for proj_file, edits in other._edits.items():
+            self._edits.setdefault(proj_file, [ ]).extend(edits)
+
+    def save(self, should_use_vcs, vcs_class):
+        """Applies the collected edits to each project file, writing and
+        adding to VCS only the project files which changed.
+        """
+        for proj_file, edits in self._edits.items():
+            proj_file_tree = self._update_proj_file(proj_file, edits)
+            if proj_file_tree is None:
+                continue
+
+            # write changed file
+            newContents = lxml.etree.tostring(
+                proj_file_tree,
+                xml_declaration = True,
+                pretty_print = True
+            )
+            proj_file_h = self._open_file_for_writing(proj_file)
+            proj_file_h.write(newContents)
+            proj_file_h.close()
+
+            # add to vcs if we need to
+            if should_use_vcs and proj_file_h.changed:
+                vcs_class.add_file(proj_file)
+
+        self._edits.clear()
+
+    def _update_proj_file(self, proj_file, edits):
+        """Adds the localized resource files in edits to proj_file, returning
+        its modified tree, or None if they were all already in it.
+        """
+        ns = ProjectFileEdits.namespace
+
+        # load as xml
+        proj_file_h = self._open_file_for_reading(proj_file)
+        parser = lxml.etree.XMLParser(remove_blank_text = True)
+        proj_file_tree = lxml.etree.parse(proj_file_h, parser)
+        proj_file_h.close()
+
+        # index the files in the project by their element type and path,
+        # keeping the first of each as XPath would find it
+        index = { }
+        for element in proj_file_tree.iter(
+            ns + "EmbeddedResource",
+            ns + "Compile"
+        ):
+            key = (element.tag[len(ns):], element.get("Include"))
+            index.setdefault(key, element)
+
+        logger   = logging.getLogger(burton.logger_name)
+        modified = False
+        for input_filename, output_filename, resx_relative_path, \
+          localized_element_path, dep_upon_key in edits:
+            # see if file already exists in project
+            if ("EmbeddedResource", resx_relative_path) in index:
+                continue
+
+            # add after our dependent upon file
+            dep_upon_source = index.get(dep_upon_key)
+
+            # if we don't match anything something went wrong
+            if dep_upon_source is None:
+                logger.warning(
+                    "Could not find " + input_filename + " in project file. " +
+                        "Not adding " + output_filename + " to project"
+                )
+                continue
+
+            # add to project, in a section which looks like:
+            #   <EmbeddedResource Include="MainView\Wizard\UpdatesPage.it-IT.resx">
+            #   <DependentUpon>UpdatesPage.cs</DependentUpon>
+            #   </EmbeddedResource>
+            resource_elem = lxml.etree.Element(
+                ns + 'EmbeddedResource',
+                Include = localized_element_path
+            )
+            dep_upon_elem = lxml.etree.Element(ns + 'DependentUpon')
+            dep_upon_elem.text = dep_upon_source[0].text
+            resource_elem.append(dep_upon_elem)
+
+            dep_upon_source.addnext(resource_elem)
+            index.setdefault(
+                ("EmbeddedResource", localized_element_path),
+                resource_elem
+            )
+            modified = True
+
+        if not modified:
+            return None
+
+        return proj_file_tree
+
+    def _open_file_for_reading(self, filename):
+        return open(filename, "r")
+
+    def _open_file_for_writing(self, filename):
+        return OutputFile(filename)
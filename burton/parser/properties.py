@@ -5,7 +5,9 @@ import re
 import types
 
 import burton
+
 from base import Base
+from burton.outputfile import OutputFile
 
 class Properties(Base):
     def __init__(self):
@@ -70,55 +72,59 @@ class Properties(Base):
 
         file.close()
 
-    def translate(
+    def translate_languages(
         self,
         input_filename,
-        output_directory,
-        mapping,
-        language,
-        language_code,
+        translations,
         should_use_vcs,
         vcs_class,
         proj_file
     ):
         logger = logging.getLogger(burton.logger_name)
-        logger.debug("Localizing " + input_filename + " into " + language)
-
-        output_directory = os.path.join(output_directory, language_code)
-        if not os.path.exists(output_directory):
-            os.mkdir(output_directory)
-            logger.error("Created new directory " + output_directory)
-
-        output_filename = None
-        if input_filename.endswith(".properties"):
-            input_mapping = \
-              self.extract_string_mapping_from_files(
-                [ input_filename ]
-              ).string_mapping_dict
-
-            output_filename = os.path.join(
-                output_directory,
-                os.path.basename(input_filename)
-            )
-
-            output_file_mapping = { }
-
-            for key in input_mapping:
-                if input_mapping[key] is not None and \
-                  input_mapping[key] in mapping:
-                    output_file_mapping[key] = mapping[input_mapping[key]]
-                else:
-                    output_file_mapping[key] = input_mapping[key]
 
-            file = self._open_file_for_writing(output_filename)
-            self.write_mapping(file, output_file_mapping)
+        input_mapping = None
+        output_filenames = [ ]
+        for output_directory, mapping, language, language_code in translations:
+            logger.debug("Localizing " + input_filename + " into " + language)
+
+            output_directory = os.path.join(output_directory, language_code)
+            if not os.path.exists(output_directory):
+                os.mkdir(output_directory)
+                logger.error("Created new directory " + output_directory)
+
+            output_filename = None
+            if input_filename.endswith(".properties"):
+                if input_mapping is None:
+                    input_mapping = \
+                      self.extract_string_mapping_from_files(
+                        [ input_filename ]
+                      ).string_mapping_dict
+
+                output_filename = os.path.join(
+                    output_directory,
+                    os.path.basename(input_filename)
+                )
+
+                output_file_mapping = { }
+
+                for key in input_mapping:
+                    if input_mapping[key] is not None and \
+                      input_mapping[key] in mapping:
+                        output_file_mapping[key] = mapping[input_mapping[key]]
+                    else:
+                        output_file_mapping[key] = input_mapping[key]
+
+                file = self._open_file_for_writing(output_filename)
+                self.write_mapping(file, output_file_mapping)
+
+                file.close()
 
-            file.close()
+                if should_use_vcs and file.changed:
+                    vcs_class.add_file(output_filename)
 
-            if should_use_vcs:
-                vcs_class.add_file(output_filename)
+            output_filenames.append(output_filename)
 
-        return output_filename
+        return output_filenames
 
     def write_mapping(self, file, mapping):
         for key in mapping:
@@ -130,4 +136,4 @@ class Properties(Base):
         return codecs.open(filename, "r", "utf-8")
 
     def _open_file_for_writing(self, filename):
-        return codecs.open(filename, "w", "utf-8")
+        return OutputFile(filename, "utf-8")
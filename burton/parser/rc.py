@@ -1,11 +1,13 @@
-import codecs
 import logging
 import os
 import re
 import types
 
 import burton
+
 from base import Base
+from burton.outputfile import OutputFile
+from template import ResourceTemplate
 from util import detect_encoding
 
 class RC(Base):
@@ -61,14 +63,17 @@ class RC(Base):
 
     def _parse(self, filename, func):
         file, encoding = self._open_file(filename)
+        self._parse_contents(file.read(), encoding, func)
+        file.close()
 
+    def _parse_contents(self, contents, encoding, func):
         in_string_table = False
         begin_level     = 0
         incomplete_line = None
 
         # We can't use codecs or readlines() due to a bug in Python's handling
         # of UTF-16 files on Windows
-        lines = file.read().decode(encoding).replace("\r\n", "\n").split("\n")
+        lines = contents.decode(encoding).replace("\r\n", "\n").split("\n")
         for line in lines:
             orig_line = line
             line = line.lstrip()
@@ -120,72 +125,101 @@ class RC(Base):
 
             func(key, value, orig_line)
 
-        file.close()
-
-    def translate(
+    def translate_languages(
         self,
         input_filename,
-        output_directory,
-        mapping,
-        language,
-        language_code,
+        translations,
         should_use_vcs,
         vcs_class,
         proj_file
     ):
         parts = os.path.basename(input_filename).split(".")
         if len(parts) > 2:
-            return input_filename
+            return [ input_filename ] * len(translations)
 
         logger = logging.getLogger(burton.logger_name)
-        logger.debug("Localizing " + input_filename + " into " + language)
 
-        output_filename = None
+        template = None
+        output_filenames = [ ]
+        for output_directory, mapping, language, language_code in translations:
+            logger.debug("Localizing " + input_filename + " into " + language)
+
+            output_filename = None
+
+            if not os.path.exists(output_directory):
+                os.mkdir(output_directory)
+
+            if input_filename.endswith(".rc"):
+                if template is None:
+                    template = self._load_template(input_filename)
 
-        if not os.path.exists(output_directory):
-            os.mkdir(output_directory)
+                output_filename = os.path.splitext(
+                    os.path.basename(input_filename)
+                )[0]
+                output_filename = os.path.join(
+                    output_directory,
+                    output_filename + "." + language_code + ".rc"
+                )
 
-        if input_filename.endswith(".rc"):
-            input_keys = self.extract_strings_from_filename(
-                input_filename
-            )
+                if not os.path.exists(output_filename):
+                    logger.error("Created new file " + output_filename)
 
-            output_filename = os.path.splitext(
-                os.path.basename(input_filename)
-            )[0]
-            output_filename = os.path.join(
-                output_directory,
-                output_filename + "." + language_code + ".rc"
-            )
+                output_file = self._open_file_for_writing(output_filename)
+                output_file.write(template.render(mapping, self._render_slot))
+                output_file.close()
 
-            created_file = False
+                if should_use_vcs and output_file.changed:
+                    vcs_class.add_file(output_filename)
 
-            if not os.path.exists(output_filename):
-                created_file = True
-                logger.error("Created new file " + output_filename)
+            output_filenames.append(output_filename)
 
-            output_file = self._open_file_for_writing(output_filename)
+        return output_filenames
 
-            def _print_line(key, value, line):
-                if value is not None and value in mapping and \
-                  mapping[value] is not None:
-                    line = line.replace('""', '"')
-                    translation = mapping[value].replace('"', '\\"')
-                    line = line.replace(
-                        '"' + value + '"',
-                        '"' + translation + '"'
-                    )
+    def _load_template(self, input_filename):
+        parts = os.path.basename(input_filename).split(".")
+        if len(parts) > 2 or not input_filename.endswith(".rc"):
+            return None
+
+        file, encoding = self._open_file(input_filename)
+        contents = file.read()
+        file.close()
+
+        return self._get_template(
+            contents,
+            lambda : self._compile_template(contents, encoding)
+        )
+
+    def _compile_template(self, contents, encoding):
+        """Compiles the contents of an RC file into a template, in which each
+        line with a value is a slot holding the parts of the line around the
+        quoted value, and the line as it is written when it is not translated.
+        """
+        template = ResourceTemplate()
+
+        def _add_line(key, value, line):
+            default = self._encode(line.rstrip()) + "\r\n"
+            if value is None:
+                template.add_literal(default)
+            else:
+                template.add_slot(
+                    [ (value, value) ],
+                    (line.replace('""', '"').split('"' + value + '"'), default),
+                    default
+                )
 
-                output_file.write(self._encode(line.rstrip()) + "\r\n")
+        self._parse_contents(contents, encoding, _add_line)
 
-            self._parse(input_filename, _print_line)
+        return template
 
-            output_file.close()
+    def _render_slot(self, data, translation):
+        parts, default = data
+        if translation is None:
+            return default
 
-            if should_use_vcs:
-                vcs_class.add_file(output_filename)
+        translation = translation.replace('"', '\\"')
+        line = ('"' + translation + '"').join(parts)
 
-        return output_filename
+        return self._encode(line.rstrip()) + "\r\n"
 
     def _parse_string(self, str):
         return_value = ""
@@ -225,4 +259,4 @@ class RC(Base):
         return open(filename, "r"), encoding
 
     def _open_file_for_writing(self, filename):
-        return codecs.open(filename, "w", "utf_16")
+        return OutputFile(filename, "utf_16")
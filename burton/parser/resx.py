@@ -1,9 +1,14 @@
 import logging
 import lxml.etree
 import os
+import StringIO
 
 import burton
+
 from base import Base
+from burton.outputfile import OutputFile
+from projectfile import ProjectFileEdits
+from template import compile_xml_template, render_xml_slot
 from util import filter_string
 
 class RESX(Base):
@@ -73,150 +78,135 @@ class RESX(Base):
 
                     func(key, value, node)
 
-    def translate(
+    def translate_languages(
         self,
         input_filename,
-        output_directory,
-        mapping,
-        language,
-        language_code,
+        translations,
         should_use_vcs,
         vcs_class,
         proj_file
     ):
         parts = os.path.basename(input_filename).split(".")
         if len(parts) > 2:
-            return input_filename
+            return [ input_filename ] * len(translations)
 
         logger = logging.getLogger(burton.logger_name)
-        logger.debug("Localizing " + input_filename + " into " + language)
 
-        output_filename = None
-        if not os.path.exists(output_directory):
-            os.mkdir(output_directory)
+        proj_file_edits = self.proj_file_edits
+        if proj_file_edits is None:
+            proj_file_edits = ProjectFileEdits()
 
-        if input_filename.endswith(".resx"):
-            input_keys = self.extract_strings_from_filename(
-                input_filename
-            )
+        template = None
+        output_filenames = [ ]
+        for output_directory, mapping, language, language_code in translations:
+            logger.debug("Localizing " + input_filename + " into " + language)
+
+            if not os.path.exists(output_directory):
+                os.mkdir(output_directory)
 
-            output_filename = os.path.splitext(
-                os.path.basename(input_filename)
-            )[0]
-            output_filename = os.path.join(
+            output_filename = self._get_output_filename(
+                input_filename,
                 output_directory,
-                output_filename + "." + language_code + ".resx"
+                language_code
             )
 
-            created_file = False
+            if output_filename is not None:
+                if not os.path.exists(output_filename):
+                    logger.error("Created new file " + output_filename)
 
-            if not os.path.exists(output_filename):
-                created_file = True
-                logger.error("Created new file " + output_filename)
+                if template is None:
+                    template = self._load_template(input_filename)
 
+                file = self._open_file_for_writing(output_filename)
+                file.write(template.render(mapping, render_xml_slot))
+                file.close()
 
-            tree = lxml.etree.fromstring(self._read_file(input_filename))
+                proj_file_edits.add(proj_file, input_filename, output_filename)
 
-            def _rewrite_mapping(key, value, node):
-                if value in mapping:
-                    node.find(RESX.value_tag).text =  mapping[value]
+                if should_use_vcs and file.changed:
+                    vcs_class.add_file(output_filename)
 
-                elif filter_string(value) in mapping:
-                    node.find(RESX.value_tag).text = \
-                        mapping[filter_string(value)]
+            output_filenames.append(output_filename)
 
+        # Edits shared with other resource files are saved once they have all
+        # been translated
+        if self.proj_file_edits is None:
+            proj_file_edits.save(should_use_vcs, vcs_class)
 
-            self._parse(tree, input_filename, _rewrite_mapping)
+        return output_filenames
 
-            file = self._open_file_for_writing(output_filename)
-            lxml.etree.ElementTree(element = tree).write(
-                file,
-                xml_declaration = True,
-                pretty_print = True,
-                encoding = "utf-8"
+    def add_proj_file_edits(self, input_filename, translations, proj_file):
+        if self.proj_file_edits is None:
+            return
+
+        for output_directory, mapping, language, language_code in translations:
+            output_filename = self._get_output_filename(
+                input_filename,
+                output_directory,
+                language_code
             )
 
-            file.close()
-
-            if(proj_file.lower() != "none"):
-                # namespace for xpath queries
-                ns = '{http://schemas.microsoft.com/developer/msbuild/2003}'
-
-                # add this file to given project
-                # open file
-                proj_file_h = self._open_file_for_appending(proj_file)
-                # load as xml
-                parser = lxml.etree.XMLParser(remove_blank_text=True)
-                proj_file_tree = lxml.etree.parse(proj_file_h, parser)
-                proj_file_h.close()
-
-                # compute our relative path of output_filename
-                proj_base_path = os.path.dirname(os.path.abspath(proj_file)).replace('/', '\\')
-                resx_relative_path = os.path.abspath(output_filename)
-                resx_relative_path = resx_relative_path.replace('/', '\\')
-                resx_relative_path = resx_relative_path.replace(proj_base_path, '')[1:]
-
-                # see if file already exists in project
-                # file name starts with a '/' at this point so skip that
-                xpath = './/' + ns + 'EmbeddedResource[@Include="' + resx_relative_path + '"]'
-                exists_in_proj = proj_file_tree.findall(xpath)
-
-                if(len(exists_in_proj) == 0):
-                    # add to project if needed
-                    # modify proj file
-                    # a section looks like:
-                    #   <EmbeddedResource Include="MainView\Wizard\UpdatesPage.it-IT.resx">
-                    #   <DependentUpon>UpdatesPage.cs</DependentUpon>
-                    #   </EmbeddedResource>
-
-                    # calculate our filenames for the include infile name and our dependent file name
-                    dependent_upon = os.path.basename(file.name).split('.')
-                    source_file_name = os.path.basename(input_filename);
-                    out_file_name = os.path.basename(output_filename)
-
-                    resx_relative_base_path = "\\".join(resx_relative_path.split('\\')[0:-1])
-                    localized_element_path = resx_relative_base_path + '\\' + out_file_name
-                    localized_element_path = localized_element_path.lstrip('/').lstrip('\\')
-                    dep_upon_element_path =  source_file_name
-                    dep_upon_element_path = dep_upon_element_path.lstrip('/').lstrip('\\')
-
-                    # add after our dependent upon file
-                    # determine if our dependent upon file is a compile or an embedded resource
-                    element_type = 'Compile'
-                    if(source_file_name.endswith('.resx')):
-                        element_type = 'EmbeddedResource'
-
-                    # generate our xpath
-                    xpath = ".//" + ns + element_type + '[@Include="' + resx_relative_base_path + '\\' + dep_upon_element_path + '"]'
-
-                    # find any matching
-                    dep_upon_source = proj_file_tree.findall(xpath)
-                    # if we don't match anything something went wrong
-                    if (len(dep_upon_source) < 1):
-                        print "Could not find " + input_filename + " in project file. Not adding " + output_filename + " to project"
-                    else:
-                        # create our new element
-                        resource_elem = lxml.etree.Element('EmbeddedResource', Include=localized_element_path)
-                        dep_upon_elem = lxml.etree.Element('DependentUpon')
-                        dep_upon_elem.text = dep_upon_source[0][0].text
-                        resource_elem.append(dep_upon_elem)
-
-                        dep_upon_source[0].addnext(resource_elem)
-
-                        # write changed file
-                        newContents = lxml.etree.tostring(proj_file_tree, xml_declaration=True, pretty_print=True)
-                        proj_file_h = self._open_file_for_writing(proj_file)
-                        proj_file_h.write(newContents)
-                        proj_file_h.close()
-
-                        # add to vcs if we need to
-                        if (should_use_vcs):
-                            vcs_class.add_file(proj_file)
-
-            if should_use_vcs:
-                vcs_class.add_file(output_filename)
-
-        return output_filename
+            if output_filename is not None:
+                self.proj_file_edits.add(
+                    proj_file,
+                    input_filename,
+                    output_filename
+                )
+
+    def _get_output_filename(
+        self,
+        input_filename,
+        output_directory,
+        language_code
+    ):
+        """Returns the name of the localized copy of input_filename for
+        language_code, or None if input_filename is not localized.
+        """
+        parts = os.path.basename(input_filename).split(".")
+        if len(parts) > 2 or not input_filename.endswith(".resx"):
+            return None
+
+        return os.path.join(
+            output_directory,
+            os.path.splitext(os.path.basename(input_filename))[0] + "." +
+                language_code + ".resx"
+        )
+
+    def _load_template(self, input_filename):
+        parts = os.path.basename(input_filename).split(".")
+        if len(parts) > 2 or not input_filename.endswith(".resx"):
+            return None
+
+        contents = self._read_file(input_filename)
+        return self._get_template(
+            contents,
+            lambda : self._compile_template(contents)
+        )
+
+    def _compile_template(self, contents):
+        tree = lxml.etree.fromstring(contents)
+        slots = [ ]
+
+        def _add_slot(key, value, node):
+            slots.append((
+                node.find(RESX.value_tag),
+                [ (value, value), (filter_string(value), filter_string(value)) ]
+            ))
+
+        self._parse(tree, "", _add_slot)
+
+        return compile_xml_template(tree, slots, self._serialize)
+
+    def _serialize(self, tree):
+        file = StringIO.StringIO()
+        lxml.etree.ElementTree(element = tree).write(
+            file,
+            xml_declaration = True,
+            pretty_print = True,
+            encoding = "utf-8"
+        )
+
+        return file.getvalue()
 
     def _find_dollarsign_this(self, tree):
         for node in tree.findall(RESX.data_tag):
@@ -235,7 +225,4 @@ class RESX(Base):
         return return_value
 
     def _open_file_for_writing(self, filename):
-        return open(filename, "w")
-
-    def _open_file_for_appending(self, filename):
-        return open(filename, 'ra')
+        return OutputFile(filename)
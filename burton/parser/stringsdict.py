@@ -1,9 +1,13 @@
 import logging
 import lxml.etree
 import os
+import StringIO
 
 import burton
+
 from base import Base
+from burton.outputfile import OutputFile
+from template import compile_xml_template, render_xml_slot
 from util import filter_string
 
 class StringsDict(Base):
@@ -51,67 +55,85 @@ class StringsDict(Base):
                                     func(unicode(entry.text), category, entry)
                                 valid_key = False
 
-    def translate(
+    def translate_languages(
         self,
         input_filename,
-        output_directory,
-        mapping,
-        language,
-        language_code,
+        translations,
         should_use_vcs,
         vcs_class,
         proj_file
     ):
         parts = os.path.basename(input_filename).split(".")
         if len(parts) > 2:
-            return input_filename
+            return [ input_filename ] * len(translations)
 
         logger = logging.getLogger(burton.logger_name)
-        logger.debug("Localizing " + input_filename + " into " + language)
 
-        output_filename = None
-        if not os.path.exists(output_directory):
-            os.mkdir(output_directory)
+        template = None
+        output_filenames = [ ]
+        for output_directory, mapping, language, language_code in translations:
+            logger.debug("Localizing " + input_filename + " into " + language)
+
+            output_filename = None
+            if not os.path.exists(output_directory):
+                os.mkdir(output_directory)
 
-        if input_filename.endswith(".stringsdict"):
-            input_keys = self.extract_strings_from_filename(
-                input_filename
-            )
+            if input_filename.endswith(".stringsdict"):
+                output_filename = os.path.join(
+                    output_directory,
+                    os.path.basename(input_filename)
+                )
 
-            output_filename = os.path.join(
-                output_directory,
-                os.path.basename(input_filename)
-            )
+                if not os.path.exists(output_filename):
+                    logger.error("Created new file " + output_filename)
 
-            created_file = False
+                if template is None:
+                    template = self._load_template(input_filename)
 
-            if not os.path.exists(output_filename):
-                created_file = True
-                logger.error("Created new file " + output_filename)
+                file = self._open_file_for_writing(output_filename)
+                file.write(template.render(mapping, render_xml_slot))
+                file.close()
 
-            tree = lxml.etree.fromstring(self._read_file(input_filename))
+                if should_use_vcs and file.changed:
+                    vcs_class.add_file(output_filename)
 
-            def _rewrite_mapping(value, category, node):
-                if value in mapping:
-                    node.text = mapping[value]
+            output_filenames.append(output_filename)
 
-            self._parse(tree, _rewrite_mapping)
+        return output_filenames
 
-            file = self._open_file_for_writing(output_filename)
-            file.write("<?xml version=\"1.0\" encoding=\"UTF-8\"?>\n")
-            lxml.etree.ElementTree(element = tree).write(
-                file,
-                xml_declaration = False,
-                pretty_print = True,
-                encoding = "utf-8"
-            )
+    def _load_template(self, input_filename):
+        parts = os.path.basename(input_filename).split(".")
+        if len(parts) > 2 or not input_filename.endswith(".stringsdict"):
+            return None
+
+        contents = self._read_file(input_filename)
+        return self._get_template(
+            contents,
+            lambda : self._compile_template(contents)
+        )
 
-            file.close()
+    def _compile_template(self, contents):
+        tree = lxml.etree.fromstring(contents)
+        slots = [ ]
 
-            if should_use_vcs:
-                vcs_class.add_file(output_filename)
+        def _add_slot(value, category, node):
+            slots.append((node, [ (value, value) ]))
+
+        self._parse(tree, _add_slot)
+
+        return compile_xml_template(tree, slots, self._serialize)
+
+    def _serialize(self, tree):
+        file = StringIO.StringIO()
+        file.write("<?xml version=\"1.0\" encoding=\"UTF-8\"?>\n")
+        lxml.etree.ElementTree(element = tree).write(
+            file,
+            xml_declaration = False,
+            pretty_print = True,
+            encoding = "utf-8"
+        )
 
-        return output_filename
+        return file.getvalue()
 
     def _read_file(self, filename):
         fp = open(filename, "r")
@@ -120,4 +142,4 @@ class StringsDict(Base):
         return return_value
 
     def _open_file_for_writing(self, filename):
-        return open(filename, "w")
+        return OutputFile(filename)
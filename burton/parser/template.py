@@ -0,0 +1,201 @@
+import cPickle
+import hashlib
+import os
+import re
+
+from burton.outputfile import write_if_changed
+
+class ResourceTemplate(object):
+    """The ResourceTemplate class holds a compiled resource file, split into
+    the literal text which is the same in every language and slots for the
+    strings which are translated. Rendering a template for a language joins
+    the literal text with the text of each slot, without parsing or
+    serializing the resource file again.
+
+    Each slot has a list of lookups, which are pairs of the key to look for in
+    the mapping of translations and the key of the translation to use if it
+    is found, the data its parser needs to render a translation into the slot,
+    and the default text to use if none of its keys are in the mapping. A slot
+    with no lookups is always rendered, with a translation of None, for text
+    which depends on the language but not on a translation, such as a language
+    code.
+    """
+
+    def __init__(self):
+        object.__init__(self)
+        self.literals = [ "" ]
+        self.slots    = [ ]
+
+    def add_literal(self, text):
+        self.literals[-1] += text
+
+    def add_slot(self, lookups, data, default):
+        self.slots.append((tuple(lookups), data, default))
+        self.literals.append(self.literals[-1][:0])
+
+    def render(self, mapping, render_slot):
+        """Returns the text of the template with its slots translated using
+        mapping. render_slot is called with the data of a slot and its
+        translation, which may be None, and returns the text of the slot.
+        """
+        parts = [ self.literals[0] ]
+        for index, (lookups, data, default) in enumerate(self.slots):
+            text = default
+            if not lookups:
+                text = render_slot(data, None)
+
+            for key, translation_key in lookups:
+                if key in mapping:
+                    text = render_slot(data, mapping[translation_key])
+                    break
+
+            parts.append(text)
+            parts.append(self.literals[index + 1])
+
+        return parts[0][:0].join(parts)
+
+class TemplateCache(object):
+    """The TemplateCache class compiles resource files into templates, and
+    keeps them so that each file is only compiled once. If it has a directory,
+    templates are also saved there by a hash of the file they were compiled
+    from, and loaded from there instead of being compiled again until the file
+    changes.
+    """
+
+    version = "1"
+
+    def __init__(self, directory = None):
+        object.__init__(self)
+        self.directory  = directory
+        self._templates = { }
+
+    def get(self, contents, kind, compile_func):
+        """Returns the template for a file with the given contents, calling
+        compile_func to compile it if it is not kept or saved. kind identifies
+        the parser and format the template is compiled for.
+        """
+        if isinstance(contents, unicode):
+            contents = contents.encode("utf-8")
+
+        template_hash = hashlib.sha1(
+            TemplateCache.version + "\0" + kind + "\0" + contents
+        ).hexdigest()
+
+        if template_hash not in self._templates:
+            self._templates[template_hash] = self._load(
+                template_hash,
+                compile_func
+            )
+
+        return self._templates[template_hash]
+
+    def _load(self, template_hash, compile_func):
+        if self.directory is None:
+            return compile_func()
+
+        template_filename = os.path.join(
+            self.directory,
+            template_hash + ".template"
+        )
+
+        if os.path.exists(template_filename):
+            fp = open(template_filename, "rb")
+            try:
+                return cPickle.load(fp)
+            except Exception:
+                pass
+            finally:
+                fp.close()
+
+        template = compile_func()
+        self._save(template_filename, template)
+
+        return template
+
+    def _save(self, template_filename, template):
+        try:
+            os.makedirs(self.directory)
+        except OSError:
+            if not os.path.isdir(self.directory):
+                raise
+
+        write_if_changed(
+            template_filename,
+            cPickle.dumps(template, cPickle.HIGHEST_PROTOCOL)
+        )
+
+_invalid_xml_characters = re.compile(u"[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+def compile_xml_template(tree, slots, serialize):
+    """Compiles a parsed XML resource file into a template. slots is a list of
+    the nodes in tree whose text is translated, each with its lookups, and
+    serialize is called with tree to return the file as it is written, encoded
+    as UTF-8. The text of each node is replaced with a marker while it is
+    serialized, so that the literal text of the template is exactly what
+    serialize writes.
+    """
+    output = serialize(tree)
+    marker = 0xe000
+    while unichr(marker).encode("utf-8") in output:
+        marker += 1
+
+    texts = [ ]
+    for index, (node, lookups) in enumerate(slots):
+        texts.append(node.text)
+        node.text = unichr(marker) + unicode(index) + unichr(marker)
+
+    try:
+        output = serialize(tree)
+    finally:
+        for index, (node, lookups) in enumerate(slots):
+            node.text = texts[index]
+
+    template = ResourceTemplate()
+    marker_pattern = re.compile(
+        re.escape(unichr(marker).encode("utf-8")) + "([0-9]+)" +
+            re.escape(unichr(marker).encode("utf-8"))
+    )
+
+    matches = list(marker_pattern.finditer(output))
+    if len(matches) != len(slots):
+        raise ValueError("Unable to find every slot in the serialized file")
+
+    position = 0
+    for match in matches:
+        start = output.rfind("<", 0, match.start())
+        end   = output.find(">", match.end()) + 1
+        data  = (output[start:match.start()], output[match.end():end])
+
+        template.add_literal(output[position:start])
+        template.add_slot(
+            slots[int(match.group(1))][1],
+            data,
+            render_xml_slot(data, texts[int(match.group(1))])
+        )
+        position = end
+
+    template.add_literal(output[position:])
+
+    return template
+
+def render_xml_slot(data, translation):
+    """Renders translation as the text of the node in a slot of a template
+    compiled by compile_xml_template, escaped the same way as lxml.
+    """
+    start_tag, end_tag = data
+    if translation is None:
+        return start_tag[:-1] + "/>"
+
+    translation = unicode(translation)
+    if _invalid_xml_characters.search(translation):
+        raise ValueError(
+            "All strings must be XML compatible: Unicode or ASCII, no NULL " +
+                "bytes or control characters"
+        )
+
+    translation = translation.replace(u"&", u"&amp;").\
+        replace(u"<", u"&lt;").\
+        replace(u">", u"&gt;").\
+        replace(u"\r", u"&#13;")
+
+    return start_tag + translation.encode("utf-8") + end_tag
@@ -70,3 +70,57 @@ class BaseTests(unittest.TestCase):
                 u"SomeOtherKey" : u"Translation for the other string",
             }
         )
+
+    def test_translate(self):
+        translator = burton.parser.Base()
+        translator.translate_languages = mock.Mock(
+            return_value = [ "Resources/it-IT" ]
+        )
+        vcs_class = mock.Mock()
+
+        self.assertEquals(
+            translator.translate(
+                "file1",
+                "Resources",
+                { },
+                "Italian",
+                "it-IT",
+                True,
+                vcs_class,
+                None
+            ),
+            "Resources/it-IT"
+        )
+
+        translator.translate_languages.assert_called_with(
+            "file1",
+            [ ("Resources", { }, "Italian", "it-IT") ],
+            True,
+            vcs_class,
+            None
+        )
+
+    def test_translate_languages_is_not_implemented(self):
+        for translator in [
+            burton.parser.Base(),
+            burton.parser.Strings(),
+            burton.parser.NIB(),
+            burton.parser.MacSource(),
+        ]:
+            with self.assertRaises(NotImplementedError) as context:
+                translator.translate(
+                    "file1",
+                    "Resources",
+                    { },
+                    "Italian",
+                    "it-IT",
+                    False,
+                    mock.Mock(),
+                    None
+                )
+
+            self.assertEquals(
+                str(context.exception),
+                translator.__class__.__name__ +
+                    " does not translate resource files"
+            )
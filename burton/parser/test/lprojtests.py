@@ -1,9 +1,9 @@
-import codecs
 import mock
 import os
 import unittest
 
 from burton import parser
+from burton.outputfile import OutputFile
 from burton import stringmapping
 import teststringio
 
@@ -27,7 +27,7 @@ class LPROJTests(unittest.TestCase):
         lproj_parser._create_stringsdict_parser = mock.Mock(
             return_value = fake_stringsdict_parser
         )
-        fake_stringsdict_parser.translate = mock.Mock()
+        fake_stringsdict_parser.translate_languages = mock.Mock()
 
         string_mapping = stringmapping.StringMapping()
         string_mapping.add_mapping(
@@ -76,12 +76,16 @@ class LPROJTests(unittest.TestCase):
 InfoPlistVar = "Untranslated string";\n"""
         )
 
-        fake_stringsdict_parser.translate.assert_called_with(
+        fake_stringsdict_parser.translate_languages.assert_called_with(
             os.path.join("en.lproj", "Localizable.stringsdict"),
-            os.path.join("Resources", "it.lproj"),
-            translation_dict,
-            "Italian",
-            "it",
+            [
+                (
+                    os.path.join("Resources", "it.lproj"),
+                    translation_dict,
+                    "Italian",
+                    "it",
+                )
+            ],
             True,
             vcs_class,
             None
@@ -91,11 +95,87 @@ InfoPlistVar = "Untranslated string";\n"""
             os.path.join("Resources", "it.lproj", "Localizable.strings")
         )
 
-    @mock.patch.object(codecs, "open")
-    def test_open_file(self, open_func):
+    @mock.patch.object(os, "listdir")
+    @mock.patch.object(os, "mkdir")
+    def test_translate_languages(self, mkdir_func, listdir_func):
+        listdir_func.return_value = [
+            "Localizable.strings",
+            "InfoPlist.strings",
+            "Localizable.stringsdict",
+            "Plurals.stringsdict",
+        ]
+        lproj_parser = parser.LPROJ()
+        output_files = { }
+        fake_strings_parser = parser.Strings()
+        fake_stringsdict_parser = parser.StringsDict()
+        fake_stringsdict_parser.translate_languages = mock.Mock()
+        vcs_class = mock.Mock()
+
+        def _open_file(filename):
+            output_files[filename] = teststringio.TestStringIO()
+            return output_files[filename]
+
+        lproj_parser._open_file = mock.Mock(side_effect = _open_file)
+        lproj_parser._create_strings_parser = mock.Mock(
+            return_value = fake_strings_parser
+        )
+        lproj_parser._create_stringsdict_parser = mock.Mock(
+            return_value = fake_stringsdict_parser
+        )
+
+        string_mapping = stringmapping.StringMapping()
+        string_mapping.add_mapping('"Files"', u"%d files")
+        string_mapping.add_mapping('"OtherFiles"', u"%d files")
+        string_mapping.add_mapping('"Names"', u"%@ files")
+        fake_strings_parser.extract_mapping_from_filename = mock.Mock(
+            return_value = string_mapping
+        )
+
+        lproj_parser.translate_languages(
+            "en.lproj",
+            [
+                ("Resources", { u"{0} files" : u"{0} fichiers" }, "French", "fr"),
+                ("Resources", { }, "German", "de"),
+            ],
+            True,
+            vcs_class,
+            None
+        )
+
+        self.assertEquals(lproj_parser._create_strings_parser.call_count, 1)
+        self.assertEquals(lproj_parser._create_stringsdict_parser.call_count, 1)
+        self.assertEquals(
+            fake_stringsdict_parser.translate_languages.call_count,
+            2
+        )
+        self.assertTrue(
+            fake_stringsdict_parser.template_cache is
+                lproj_parser.template_cache
+        )
+
+        self.assertEquals(
+            output_files[
+                os.path.join("Resources", "fr.lproj", "InfoPlist.strings")
+            ].getvalue(),
+            """"Files" = "%d fichiers";
+"Names" = "%@ fichiers";
+"OtherFiles" = "%d fichiers";\n"""
+        )
+        self.assertEquals(
+            output_files[
+                os.path.join("Resources", "de.lproj", "Localizable.strings")
+            ].getvalue(),
+            """"Files" = "%d files";
+"Names" = "%@ files";
+"OtherFiles" = "%d files";\n"""
+        )
+
+    def test_open_file(self):
         lproj_parser = parser.LPROJ()
-        lproj_parser._open_file("filename")
-        open_func.assert_called_with("filename", "w", "utf-8")
+        file = lproj_parser._open_file("filename")
+        self.assertTrue(isinstance(file, OutputFile))
+        self.assertEquals(file.name, "filename")
+        self.assertEquals(file.encoding, "utf-8")
 
     def test_create_strings_parser(self):
         lproj_parser = parser.LPROJ()
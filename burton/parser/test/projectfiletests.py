@@ -0,0 +1,129 @@
+import mock
+import os
+import shutil
+import tempfile
+import testfixtures
+import unittest
+
+from burton import parser
+
+class ProjectFileEditsTests(unittest.TestCase):
+    test_csproj = """<?xml version='1.0' encoding='ASCII'?>
+<Project xmlns="http://schemas.microsoft.com/developer/msbuild/2003">
+  <ItemGroup>
+    <Compile Include="Forms\\Main.cs"/>
+    <EmbeddedResource Include="Forms\\Main.resx">
+      <DependentUpon>Main.cs</DependentUpon>
+    </EmbeddedResource>
+    <EmbeddedResource Include="Forms\\Main.fr-FR.resx">
+      <DependentUpon>Main.cs</DependentUpon>
+    </EmbeddedResource>
+    <EmbeddedResource Include="Forms\\Sub\\Dialog.resx">
+      <DependentUpon>Dialog.cs</DependentUpon>
+    </EmbeddedResource>
+  </ItemGroup>
+</Project>
+"""
+
+    expected_csproj = """<?xml version='1.0' encoding='ASCII'?>
+<Project xmlns="http://schemas.microsoft.com/developer/msbuild/2003">
+  <ItemGroup>
+    <Compile Include="Forms\\Main.cs"/>
+    <EmbeddedResource Include="Forms\\Main.resx">
+      <DependentUpon>Main.cs</DependentUpon>
+    </EmbeddedResource>
+    <EmbeddedResource Include="Forms\\Main.de-DE.resx">
+      <DependentUpon>Main.cs</DependentUpon>
+    </EmbeddedResource>
+    <EmbeddedResource Include="Forms\\Main.fr-FR.resx">
+      <DependentUpon>Main.cs</DependentUpon>
+    </EmbeddedResource>
+    <EmbeddedResource Include="Forms\\Sub\\Dialog.resx">
+      <DependentUpon>Dialog.cs</DependentUpon>
+    </EmbeddedResource>
+    <EmbeddedResource Include="Forms\\Sub\\Dialog.de-DE.resx">
+      <DependentUpon>Dialog.cs</DependentUpon>
+    </EmbeddedResource>
+    <EmbeddedResource Include="Forms\\Sub\\Dialog.fr-FR.resx">
+      <DependentUpon>Dialog.cs</DependentUpon>
+    </EmbeddedResource>
+  </ItemGroup>
+</Project>
+"""
+
+    def setUp(self):
+        self.temp_dir  = tempfile.mkdtemp()
+        self.proj_file = os.path.join(self.temp_dir, "Proj.csproj")
+
+        fp = open(self.proj_file, "w")
+        fp.write(ProjectFileEditsTests.test_csproj)
+        fp.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _add_localized_files(self, proj_file_edits):
+        for input_filename in [
+            os.path.join(self.temp_dir, "Forms", "Main.resx"),
+            os.path.join(self.temp_dir, "Forms", "Sub", "Dialog.resx"),
+            os.path.join(self.temp_dir, "Forms", "Missing.resx"),
+        ]:
+            for language_code in [ "fr-FR", "de-DE" ]:
+                proj_file_edits.add(
+                    self.proj_file,
+                    input_filename,
+                    input_filename[:-len(".resx")] + "." + language_code +
+                        ".resx"
+                )
+
+    def test_save(self):
+        vcs_class = mock.Mock()
+        proj_file_edits = parser.ProjectFileEdits()
+        proj_file_edits._open_file_for_reading = mock.Mock(
+            side_effect = lambda filename : open(filename, "r")
+        )
+
+        self._add_localized_files(proj_file_edits)
+        proj_file_edits.add("None", "Other.resx", "Other.fr-FR.resx")
+
+        captured_log = testfixtures.LogCapture()
+        proj_file_edits.save(True, vcs_class)
+
+        missing_filename = os.path.join(self.temp_dir, "Forms", "Missing")
+        captured_log.check(*[
+            (
+                "extensis.burton",
+                "WARNING",
+                "Could not find " + missing_filename + ".resx in project " +
+                    "file. Not adding " + missing_filename + "." +
+                    language_code + ".resx to project"
+            )
+            for language_code in [ "fr-FR", "de-DE" ]
+        ])
+        captured_log.uninstall()
+
+        fp = open(self.proj_file, "r")
+        self.assertEquals(fp.read(), ProjectFileEditsTests.expected_csproj)
+        fp.close()
+
+        self.assertEquals(proj_file_edits._open_file_for_reading.call_count, 1)
+        vcs_class.add_file.assert_called_once_with(self.proj_file)
+
+        self._add_localized_files(proj_file_edits)
+        proj_file_edits.save(True, vcs_class)
+        self.assertEquals(vcs_class.add_file.call_count, 1)
+
+    def test_extend(self):
+        vcs_class = mock.Mock()
+        proj_file_edits = parser.ProjectFileEdits()
+        other_proj_file_edits = parser.ProjectFileEdits()
+        self._add_localized_files(other_proj_file_edits)
+
+        proj_file_edits.extend(other_proj_file_edits)
+        proj_file_edits.save(False, vcs_class)
+
+        fp = open(self.proj_file, "r")
+        self.assertEquals(fp.read(), ProjectFileEditsTests.expected_csproj)
+        fp.close()
+
+        self.assertFalse(vcs_class.add_file.called)
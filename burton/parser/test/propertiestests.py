@@ -1,4 +1,3 @@
-import codecs
 import mock
 import os
 from burton import stringmapping
@@ -6,6 +5,7 @@ import types
 import unittest
 
 from burton import parser
+from burton.outputfile import OutputFile
 import teststringio
 
 class PropertiesTests(unittest.TestCase):
@@ -29,10 +29,11 @@ CouldNotOpenFont Could not open font "{0}".
             PropertiesTests.sample_file
         )
 
-    @mock.patch.object(codecs, "open")
-    def test_open_file_for_writing(self, open_func):
-        parser.Properties()._open_file_for_writing("test_filename")
-        open_func.assert_called_with("test_filename", "w", "utf-8")
+    def test_open_file_for_writing(self):
+        file = parser.Properties()._open_file_for_writing("test_filename")
+        self.assertTrue(isinstance(file, OutputFile))
+        self.assertEquals(file.name, "test_filename")
+        self.assertEquals(file.encoding, "utf-8")
 
     def test_extract_strings_from_filename(self):
         extractor = parser.Properties()
@@ -1,10 +1,10 @@
-import codecs
 import mock
 import os
 import types
 import unittest
 
 from burton import parser
+from burton.outputfile import OutputFile
 import teststringio
 
 class RCTests(unittest.TestCase):
@@ -234,9 +234,75 @@ END\r\n\r
             os.path.join("Resources", "Sample.it-IT.rc")
         )
 
-    @mock.patch.object(codecs, "open")
-    def test_open_file_for_writing(self, open_func):
+    @mock.patch.object(os, "mkdir")
+    def test_translate_languages(self, mkdir_func):
+        rc_parser = parser.RC()
+        vcs_class = mock.Mock()
+        output_files = {
+            os.path.join("Resources", "Sample.it-IT.rc") :
+                teststringio.TestStringIO(),
+            os.path.join("Resources", "Sample.fr-FR.rc") :
+                teststringio.TestStringIO(),
+        }
+
+        def _get_input_file(self):
+            test_input_file = teststringio.TestStringIO(None, RCTests.sample_rc)
+            return test_input_file, "utf-8"
+
+        rc_parser._open_file_for_writing = mock.Mock(
+            side_effect = lambda filename : output_files[filename]
+        )
+        rc_parser._open_file = mock.Mock(side_effect = _get_input_file)
+
+        output_filenames = rc_parser.translate_languages(
+            "Sample.rc",
+            [
+                (
+                    "Resources",
+                    {
+                        u"Translation for \"some\" string" :
+                            u"Traduzione di Bablefish per \"questa\" stringa",
+                        u"Translation\\nfor the other string" :
+                            u"Translation\\nfor the other string",
+                    },
+                    "Italian",
+                    "it-IT",
+                ),
+                ("Resources", { }, "French", "fr-FR"),
+            ],
+            True,
+            vcs_class,
+            None
+        )
+
+        self.assertEquals(rc_parser._open_file.call_count, 1)
+        self.assertEquals(
+            output_filenames,
+            [
+                os.path.join("Resources", "Sample.it-IT.rc"),
+                os.path.join("Resources", "Sample.fr-FR.rc"),
+            ]
+        )
+
+        self.assertEquals(
+            output_files[output_filenames[0]].getvalue(),
+            RCTests.sample_translated_rc
+        )
+        untranslated_rc = output_files[output_filenames[1]].getvalue()
+        self.assertFalse(u"Traduzione" in untranslated_rc)
+        self.assertEquals(
+            len(untranslated_rc.split(u"\r\n")),
+            len(RCTests.sample_translated_rc.split(u"\r\n"))
+        )
+
+        vcs_class.add_file.assert_called_with(
+            os.path.join("Resources", "Sample.fr-FR.rc")
+        )
+
+    def test_open_file_for_writing(self):
         rc_parser = parser.RC()
-        rc_parser._open_file_for_writing("filename")
+        file = rc_parser._open_file_for_writing("filename")
 
-        open_func.assert_called_with("filename", "w", "utf_16")
+        self.assertTrue(isinstance(file, OutputFile))
+        self.assertEquals(file.name, "filename")
+        self.assertEquals(file.encoding, "utf_16")
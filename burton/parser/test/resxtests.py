@@ -4,6 +4,7 @@ import types
 import unittest
 
 from burton import parser
+from burton.outputfile import OutputFile
 import teststringio
 
 class RESXTests(unittest.TestCase):
@@ -341,7 +342,14 @@ class RESXTests(unittest.TestCase):
             return files[arg]
         resx_parser._open_file_for_writing.side_effect = side_effect
 
-        resx_parser._open_file_for_appending = mock.Mock(return_value = csproj_file)
+        proj_file_edits = parser.ProjectFileEdits()
+        proj_file_edits._open_file_for_reading = mock.Mock(
+            return_value = csproj_file
+        )
+        proj_file_edits._open_file_for_writing = mock.Mock(
+            side_effect = side_effect
+        )
+        resx_parser.proj_file_edits = proj_file_edits
 
         output_filename = resx_parser.translate(
             "Sample.resx",
@@ -360,6 +368,8 @@ class RESXTests(unittest.TestCase):
             vcs_class,
             "Resources/test/Proj.csproj"
         )
+        proj_file_edits.save(True, vcs_class)
+
         self.assertEquals(
             csproj_file.getvalue(),
             RESXTests.expected_csproj
@@ -384,7 +394,14 @@ class RESXTests(unittest.TestCase):
             return files[arg]
         resx_parser._open_file_for_writing.side_effect = side_effect
 
-        resx_parser._open_file_for_appending = mock.Mock(return_value = csproj_file)
+        proj_file_edits = parser.ProjectFileEdits()
+        proj_file_edits._open_file_for_reading = mock.Mock(
+            return_value = csproj_file
+        )
+        proj_file_edits._open_file_for_writing = mock.Mock(
+            side_effect = side_effect
+        )
+        resx_parser.proj_file_edits = proj_file_edits
 
         output_filename = resx_parser.translate(
             "Sample2.resx",
@@ -403,15 +420,18 @@ class RESXTests(unittest.TestCase):
             vcs_class,
             "Resources/test/Proj.csproj"
         )
+        proj_file_edits.save(True, vcs_class)
+
         self.assertEquals(
             csproj_file.getvalue(),
             RESXTests.test_csproj
         )
 
 
-    @mock.patch("__builtin__.open")
-    def test_open_file_for_writing(self, open_func):
+    def test_open_file_for_writing(self):
         extractor = parser.RESX()
-        extractor._open_file_for_writing("filename")
+        file = extractor._open_file_for_writing("filename")
 
-        open_func.assert_called_with("filename", "w")
+        self.assertTrue(isinstance(file, OutputFile))
+        self.assertEquals(file.name, "filename")
+        self.assertEquals(file.encoding, None)
@@ -0,0 +1,165 @@
+import lxml.etree
+import mock
+import os
+import shutil
+import tempfile
+import unittest
+
+from burton import parser
+from burton.parser.template import compile_xml_template, render_xml_slot
+
+class ResourceTemplateTests(unittest.TestCase):
+    def test_render(self):
+        template = parser.ResourceTemplate()
+        template.add_literal("<strings>")
+        template.add_literal("\n")
+        template.add_slot(
+            [ (u"Key", u"Key"), (u"Other key", u"Other key") ],
+            "first",
+            "<default/>"
+        )
+        template.add_literal("\n")
+        template.add_slot([ (u"Missing", u"Missing") ], "second", "<default/>")
+        template.add_slot([ ], "language", None)
+        template.add_literal("</strings>")
+
+        def _render_slot(data, translation):
+            return "<" + data + ">" + str(translation) + "</" + data + ">"
+
+        self.assertEquals(
+            template.render(
+                { u"Other key" : u"Other translation" },
+                _render_slot
+            ),
+            "<strings>\n<first>Other translation</first>\n<default/>" +
+                "<language>None</language></strings>"
+        )
+
+        self.assertEquals(
+            template.render(
+                { u"Key" : None, u"Missing" : u"Translation" },
+                _render_slot
+            ),
+            "<strings>\n<first>None</first>\n<second>Translation</second>" +
+                "<language>None</language></strings>"
+        )
+
+    def test_compile_xml_template(self):
+        tree = lxml.etree.fromstring(
+            """<strings><string id="1">One</string><string>Two</string>""" +
+            """<string>Three</string><string/></strings>"""
+        )
+        nodes = list(tree)
+        slots = [ (node, [ (node.text, node.text) ]) for node in nodes[:3] ]
+        slots.append((nodes[3], [ (u"Four", u"Four") ]))
+
+        def _serialize(tree):
+            return lxml.etree.tostring(
+                tree,
+                encoding = "utf-8",
+                xml_declaration = False
+            )
+
+        template = compile_xml_template(tree, slots, _serialize)
+        self.assertEquals(template.literals[0], "<strings>")
+        self.assertEquals(len(template.slots), 4)
+        self.assertEquals([ node.text for node in nodes ], [
+            "One", "Two", "Three", None
+        ])
+
+        mapping = {
+            u"One"  : u"Un & <un> \xe9",
+            u"Two"  : None,
+            u"Four" : u"Quatre\r\n",
+        }
+
+        self.assertEquals(
+            template.render(mapping, render_xml_slot),
+            "<strings><string id=\"1\">Un &amp; &lt;un&gt; \xc3\xa9</string>" +
+                "<string/><string>Three</string>" +
+                "<string>Quatre&#13;\n</string></strings>"
+        )
+
+        nodes[0].text = mapping[u"One"]
+        nodes[1].text = mapping[u"Two"]
+        nodes[3].text = mapping[u"Four"]
+        self.assertEquals(
+            template.render(mapping, render_xml_slot),
+            _serialize(tree)
+        )
+
+        self.assertRaises(
+            ValueError,
+            compile_xml_template,
+            tree,
+            slots,
+            lxml.etree.tostring
+        )
+
+        self.assertRaises(
+            ValueError,
+            template.render,
+            { u"One" : u"\x01" },
+            render_xml_slot
+        )
+
+class TemplateCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_get_without_directory(self):
+        template_cache = parser.TemplateCache()
+        compile_func = mock.Mock(side_effect = parser.ResourceTemplate)
+
+        template = template_cache.get("contents", "RC", compile_func)
+        self.assertTrue(
+            template_cache.get("contents", "RC", compile_func) is template
+        )
+        self.assertEquals(compile_func.call_count, 1)
+
+        template_cache.get("other contents", "RC", compile_func)
+        self.assertEquals(compile_func.call_count, 2)
+
+    def test_get(self):
+        directory = os.path.join(self.temp_dir, "templates")
+        template_cache = parser.TemplateCache(directory)
+
+        def _compile():
+            template = parser.ResourceTemplate()
+            template.add_literal(u"Compiled")
+            return template
+
+        compile_func = mock.Mock(side_effect = _compile)
+
+        template = template_cache.get("contents", "RC", compile_func)
+        self.assertEquals(template.literals, [ u"Compiled" ])
+        self.assertEquals(len(os.listdir(directory)), 1)
+
+        template = parser.TemplateCache(directory).get(
+            "contents",
+            "RC",
+            compile_func
+        )
+        self.assertEquals(template.literals, [ u"Compiled" ])
+        self.assertEquals(compile_func.call_count, 1)
+
+        template_cache.get(u"other contents \xe9", "RC", compile_func)
+        template_cache.get("contents", "RESX", compile_func)
+        self.assertEquals(compile_func.call_count, 3)
+        self.assertEquals(len(os.listdir(directory)), 3)
+
+        for filename in os.listdir(directory):
+            fp = open(os.path.join(directory, filename), "wb")
+            fp.write("corrupt")
+            fp.close()
+
+        template = parser.TemplateCache(directory).get(
+            "contents",
+            "RC",
+            compile_func
+        )
+        self.assertEquals(template.literals, [ u"Compiled" ])
+        self.assertEquals(compile_func.call_count, 4)
@@ -2,6 +2,8 @@ import StringIO
 import os
 
 class TestStringIO(StringIO.StringIO):
+    changed = True
+
     def __init__(self, filename = None, buffer = None):
         print("cwd: " + os.getcwd())
         #print('file: ' + filename)
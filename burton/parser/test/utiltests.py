@@ -30,6 +30,11 @@ class UtilTests(unittest.TestCase):
             )
         )
 
+        self.assertEquals(
+            burton.parser.replace_params("No params here"),
+            ( u"No params here", [ ] )
+        )
+
         self.assertEquals(
             burton.parser.replace_params("{0}% complete"),
             (
@@ -60,6 +60,9 @@ def replace_params(raw_string):
     Because of this, it is possible that the replaced string will be identical
     to the original string
     """
+    if "%" not in raw_string and "{" not in raw_string:
+        return unicode(raw_string), []
+
     printf_flags         = "-+#1234567890"
     printf_width         = "1234567890*"
     printf_precision_sep = "."
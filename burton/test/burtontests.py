@@ -1,13 +1,16 @@
 import codecs
 import collections
 import copy
+import cStringIO
 import logging
 import mock
 import os
 import testfixtures
 import unittest
 import re
+import shutil
 import sys
+import tempfile
 
 import burton
 
@@ -373,8 +376,19 @@ class BurtonTests(unittest.TestCase):
 
         captured_log = testfixtures.LogCapture()
 
+        config_dict = {
+            burton.Config.files_by_language : { "English" : "en.xlf" },
+            burton.Config.xlf_repo_path     : "xlf_repo",
+            burton.Config.language_codes    : { "English" : "en" },
+            burton.Config.native_language   : "English",
+        }
+
+        conf = mock.Mock()
+        conf.get.side_effect = lambda key : config_dict.get(key, None)
+        filename = os.path.join(os.path.abspath("xlf_repo"), "en.xlf")
+
         burton.update_translation_file(
-            mock.Mock(),
+            conf,
             [ "String1", "String%d", "String3" ],
             [ "String1", "String%d", "String3" ],
             "English",
@@ -394,13 +408,14 @@ class BurtonTests(unittest.TestCase):
             (
                 burton.logger_name,
                 "INFO",
-                "The following unused, untranslated strings were removed from test filename"
+                "The following unused, untranslated strings were removed from " +
+                    filename
             ),
             (burton.logger_name, "INFO", "\tMissing key\n"),
             (
                 burton.logger_name,
                 "WARNING",
-                "There are untranslated strings in test filename"
+                "There are untranslated strings in " + filename
             ),
         )
 
@@ -433,8 +448,19 @@ class BurtonTests(unittest.TestCase):
 
         captured_log = testfixtures.LogCapture()
 
+        config_dict = {
+            burton.Config.files_by_language : { "English" : "en.xlf" },
+            burton.Config.xlf_repo_path     : "xlf_repo",
+            burton.Config.language_codes    : { "English" : "en" },
+            burton.Config.native_language   : "English",
+        }
+
+        conf = mock.Mock()
+        conf.get.side_effect = lambda key : config_dict.get(key, None)
+        filename = os.path.join(os.path.abspath("xlf_repo"), "en.xlf")
+
         burton.update_translation_file(
-            mock.Mock(),
+            conf,
             [ " ", "String1" ],
             [ " ", "String1" ],
             "English",
@@ -444,6 +470,251 @@ class BurtonTests(unittest.TestCase):
         captured_log.check()
         captured_log.uninstall()
 
+    @mock.patch("__builtin__.open")
+    @mock.patch.object(burton, "_open_translation_file_for_language")
+    def test_update_translation_file_reuses_cached_file(
+        self,
+        read_func,
+        write_func
+    ):
+        translation_file = burton.translation.Base(
+            "English",
+            "en",
+            "en-us",
+            "Test Company",
+            "Test Product",
+            "foo@eample.com"
+        )
+        translation_file.add_translation("String1", "Translation for String1")
+
+        read_func.return_value = translation_file, "test filename"
+
+        config_dict = {
+            burton.Config.use_vcs           : True,
+            burton.Config.files_by_language : { "English" : "en.xlf" },
+            burton.Config.xlf_repo_path     : "xlf_repo",
+            burton.Config.language_codes    : { "English" : "en" },
+            burton.Config.native_language   : "English",
+        }
+
+        conf = mock.Mock()
+        conf.get.side_effect = lambda key : config_dict.get(key, None)
+        vcs_class = mock.Mock()
+        translation_files = burton.TranslationFileCache()
+
+        burton.update_translation_file(
+            conf,
+            [ "String1" ],
+            [ "String1", "String2" ],
+            "English",
+            vcs_class,
+            translation_files
+        )
+
+        burton.update_translation_file(
+            conf,
+            [ "String2" ],
+            [ "String1", "String2" ],
+            "English",
+            vcs_class,
+            translation_files
+        )
+
+        read_func.assert_called_once_with(conf, "English", vcs_class)
+        self.assertEquals(
+            vcs_class.add_file.call_args_list,
+            [ mock.call("en.xlf", os.path.abspath("xlf_repo")) ] * 2
+        )
+        self.assertEquals(
+            translation_file._translation_dict,
+            {
+                "String1" : "Translation for String1",
+                "String2" : None,
+            }
+        )
+
+    def test_update_translation_file_uses_settings_of_each_platform(self):
+        xlf_repo_path = tempfile.mkdtemp()
+
+        try:
+            translation_files = burton.TranslationFileCache()
+            filename = os.path.join(xlf_repo_path, "fr.xlf")
+
+            for company_name in [ "First Company", "Second Company" ]:
+                conf = burton.Config()
+                for key, value in {
+                    burton.Config.xlf_repo_path            : xlf_repo_path,
+                    burton.Config.files_by_language        :
+                        { "French" : "fr.xlf" },
+                    burton.Config.translation_files_class  :
+                        "burton.translation.XLF",
+                    burton.Config.language_codes           : {
+                        "English" : "en",
+                        "French"  : "fr",
+                    },
+                    burton.Config.native_language          : "English",
+                    burton.Config.company_name             : company_name,
+                    burton.Config.product_name             : "Test Product",
+                    burton.Config.contact_email            : "foo@example.com",
+                    burton.Config.use_vcs                  : False,
+                    burton.Config.abort_if_no_translations : False,
+                }.items():
+                    conf.set(key, value)
+
+                captured_log = testfixtures.LogCapture()
+                burton.update_translation_file(
+                    conf,
+                    [ "String1" ],
+                    [ "String1" ],
+                    "French",
+                    mock.Mock(),
+                    translation_files
+                )
+                captured_log.uninstall()
+
+                fp = open(filename, "r")
+                self.assertTrue(
+                    'company-name="' + company_name + '"' in fp.read()
+                )
+                fp.close()
+
+        finally:
+            shutil.rmtree(xlf_repo_path)
+
+    def test_index_translation_keys(self):
+        index = burton.index_translation_keys(
+            [ "String1", "String%d", "String{0}" ]
+        )
+
+        self.assertEquals(index, frozenset([ "String1", "String{0}" ]))
+        self.assertTrue(burton.index_translation_keys(index) is index)
+
+    @mock.patch.object(burton, "update_translation_file")
+    def test_update_translation_files(self, update_func):
+        conf = mock.Mock()
+        conf.get.side_effect = lambda key : {
+            burton.Config.output_languages : [ "French", "German" ],
+            burton.Config.worker_processes : 1,
+        }[key]
+
+        vcs_class = burton.vcs.NoOp()
+        translation_files = burton.TranslationFileCache()
+
+        burton.update_translation_files(
+            conf,
+            [ "String1" ],
+            [ "String1", "String2" ],
+            vcs_class,
+            translation_files
+        )
+
+        self.assertEquals(
+            update_func.call_args_list,
+            [
+                mock.call(
+                    conf,
+                    frozenset([ "String1" ]),
+                    frozenset([ "String1", "String2" ]),
+                    language,
+                    vcs_class,
+                    translation_files
+                ) for language in [ "French", "German" ]
+            ]
+        )
+
+    def test_update_translation_files_in_worker_processes(self):
+        xlf_repo_path = tempfile.mkdtemp()
+
+        try:
+            conf = burton.Config()
+            for key, value in {
+                burton.Config.output_languages         : [ "French", "German" ],
+                burton.Config.worker_processes         : 2,
+                burton.Config.xlf_repo_path            : xlf_repo_path,
+                burton.Config.files_by_language        : {
+                    "French" : "fr.xlf",
+                    "German" : "de.xlf",
+                },
+                burton.Config.translation_files_class  :
+                    "burton.translation.XLF",
+                burton.Config.language_codes           : {
+                    "English" : "en",
+                    "French"  : "fr",
+                    "German"  : "de",
+                },
+                burton.Config.native_language          : "English",
+                burton.Config.company_name             : "Test Company",
+                burton.Config.product_name             : "Test Product",
+                burton.Config.contact_email            : "foo@example.com",
+                burton.Config.use_vcs                  : True,
+                burton.Config.abort_if_no_translations : False,
+                burton.Config.logging_level            : "info",
+            }.items():
+                conf.set(key, value)
+
+            filenames = [
+                os.path.join(xlf_repo_path, "fr.xlf"),
+                os.path.join(xlf_repo_path, "de.xlf"),
+            ]
+
+            vcs_class = mock.Mock()
+            translation_files = burton.TranslationFileCache()
+            captured_log = testfixtures.LogCapture()
+
+            burton.update_translation_files(
+                conf,
+                [ "String1" ],
+                [ "String1" ],
+                vcs_class,
+                translation_files
+            )
+
+            captured_log.check(
+                (
+                    burton.logger_name,
+                    "WARNING",
+                    "There are untranslated strings in " + filenames[0]
+                ),
+                (
+                    burton.logger_name,
+                    "WARNING",
+                    "There are untranslated strings in " + filenames[1]
+                ),
+            )
+            captured_log.uninstall()
+
+            self.assertEquals(
+                vcs_class.add_file.call_args_list,
+                [
+                    mock.call("fr.xlf", xlf_repo_path),
+                    mock.call("de.xlf", xlf_repo_path),
+                ]
+            )
+
+            for language, filename in zip([ "French", "German" ], filenames):
+                translation_file = translation_files.lookup(
+                    filename,
+                    burton._get_translation_file_settings(conf, language)
+                )
+                self.assertEquals(
+                    translation_file.translation_dict,
+                    { "String1" : None }
+                )
+
+            conf.set(burton.Config.abort_if_no_translations, True)
+            self.assertRaises(
+                Exception,
+                burton.update_translation_files,
+                conf,
+                [ "String1" ],
+                [ "String1" ],
+                vcs_class,
+                translation_files
+            )
+
+        finally:
+            shutil.rmtree(xlf_repo_path)
+
     @mock.patch.object(os, "listdir")
     @mock.patch.object(burton, "_get_localized_resource_instance")
     @mock.patch.object(burton, "_open_translation_file_for_language")
@@ -465,9 +736,14 @@ class BurtonTests(unittest.TestCase):
             burton.Config.extensions_to_localize  : [ "rc" ],
             burton.Config.localization_output_dir : "None",
             burton.Config.language_codes          : { "English" : "en-us" },
+            burton.Config.native_language         : "English",
             burton.Config.use_vcs                 : False,
             burton.Config.root_path               : ".",
             burton.Config.recursive_localization  : False,
+            burton.Config.files_by_language       : { "English" : "en.xlf" },
+            burton.Config.xlf_repo_path           : "xlf_repo",
+            burton.Config.worker_processes        : 1,
+            burton.Config.localization_manifest_path : "None",
         }
 
         def _config_get(key):
@@ -490,18 +766,24 @@ class BurtonTests(unittest.TestCase):
             vcs_class
         )
 
-        return_instance.translate.assert_called_with(
+        translation_dict = {
+            "String1"      : "Translation for String1",
+            "String%d"     : "Printf-formatted string %d",
+            "String{0}"    : "Printf-formatted string {0}",
+            "String{0}{1}" : "Curly-formatted string {0}{1}",
+            "String4"      : u"\u2264String4\u2265"
+        }
+
+        return_instance.translate_languages.assert_called_with(
             os.path.join(".", "test_path", "test_filename.rc"),
-            os.path.join(".", "test_path"),
-            {
-                "String1"      : "Translation for String1",
-                "String%d"     : "Printf-formatted string %d",
-                "String{0}"    : "Printf-formatted string {0}",
-                "String{0}{1}" : "Curly-formatted string {0}{1}",
-                "String4"      : u"\u2264String4\u2265"
-            },
-            "English",
-            "en-us",
+            [
+                (
+                    os.path.join(".", "test_path"),
+                    translation_dict,
+                    "English",
+                    "en-us",
+                ),
+            ],
             False,
             vcs_class,
             None
@@ -514,31 +796,408 @@ class BurtonTests(unittest.TestCase):
             vcs_class
         )
 
-        return_instance.translate.assert_called_with(
+        return_instance.translate_languages.assert_called_with(
             os.path.join(".", "test_path", "test_filename.rc"),
-            os.path.join(".", "foo"),
-            {
-                "String1"      : "Translation for String1",
-                "String%d"     : "Printf-formatted string %d",
-                "String{0}"    : "Printf-formatted string {0}",
-                "String{0}{1}" : "Curly-formatted string {0}{1}",
-                "String4"      : u"\u2264String4\u2265"
-            },
-            "English",
-            "en-us",
+            [
+                (
+                    os.path.join(".", "foo"),
+                    translation_dict,
+                    "English",
+                    "en-us",
+                ),
+            ],
             False,
             vcs_class,
             None
         )
 
+    def test_create_localized_resources_in_worker_processes(self):
+        root_path = tempfile.mkdtemp()
+
+        try:
+            os.mkdir(os.path.join(root_path, "res"))
+            for name in [ "First", "Second" ]:
+                fp = open(os.path.join(root_path, "res", name + ".rc"), "w")
+                fp.write(
+                    "STRINGTABLE\nBEGIN\n    IDS_STRING \"" + name + "\"\nEND\n"
+                )
+                fp.close()
+
+            conf = burton.Config()
+            for key, value in {
+                burton.Config.root_path               : root_path,
+                burton.Config.output_languages        : [ "French", "German" ],
+                burton.Config.worker_processes        : 2,
+                burton.Config.paths_to_localize       : [ "res" ],
+                burton.Config.recursive_localization  : False,
+                burton.Config.disallowed_paths        : [ ],
+                burton.Config.extensions_to_localize  : [ ".rc" ],
+                burton.Config.parsers_by_extension    :
+                    { ".rc" : "burton.parser.RC" },
+                burton.Config.template_cache_path     : "None",
+                burton.Config.localization_manifest_path : "None",
+                burton.Config.localization_output_dir : "None",
+                burton.Config.project_path            : "None",
+                burton.Config.use_vcs                 : True,
+                burton.Config.xlf_repo_path           : root_path,
+                burton.Config.files_by_language       : {
+                    "French" : "fr.xlf",
+                    "German" : "de.xlf",
+                },
+                burton.Config.language_codes          : {
+                    "English" : "en-US",
+                    "French"  : "fr-FR",
+                    "German"  : "de-DE",
+                },
+                burton.Config.native_language         : "English",
+                burton.Config.translation_files_class :
+                    "burton.translation.XLF",
+                burton.Config.company_name            : "Test Company",
+                burton.Config.product_name            : "Test Product",
+                burton.Config.contact_email           : "foo@example.com",
+            }.items():
+                conf.set(key, value)
+
+            translation_files = burton.TranslationFileCache()
+            for language, filename, translation in [
+                ( "French", "fr.xlf", u"Premier" ),
+                ( "German", "de.xlf", u"Erste" ),
+            ]:
+                translation_file = mock.Mock()
+                translation_file.translation_dict = {
+                    u"First"  : translation,
+                    u"Second" : None,
+                }
+                translation_files.add(
+                    os.path.join(root_path, filename),
+                    translation_file,
+                    burton._get_translation_file_settings(conf, language)
+                )
+
+            vcs_class = mock.Mock()
+            captured_log = testfixtures.LogCapture()
+            orig_path = os.getcwd()
+
+            burton.create_localized_resources(
+                conf,
+                [ u"First", u"Second" ],
+                vcs_class,
+                translation_files
+            )
+
+            self.assertEquals(os.getcwd(), orig_path)
+
+            filenames = [
+                os.path.join(root_path, "res", "First.fr-FR.rc"),
+                os.path.join(root_path, "res", "First.de-DE.rc"),
+                os.path.join(root_path, "res", "Second.fr-FR.rc"),
+                os.path.join(root_path, "res", "Second.de-DE.rc"),
+            ]
+
+            self.assertEquals(
+                [
+                    record.getMessage() for record in captured_log.records
+                    if record.levelname == "ERROR"
+                ],
+                [ "Created new file " + filename for filename in filenames ]
+            )
+            captured_log.uninstall()
+
+            self.assertEquals(
+                vcs_class.add_file.call_args_list,
+                [ mock.call(filename, None) for filename in filenames ]
+            )
+
+            for filename, translation in zip(
+                filenames,
+                [ u"Premier", u"Erste", u"\u2264Second\u2265" ] + \
+                    [ u"\u2264Second\u2265" ]
+            ):
+                fp = codecs.open(filename, "r", "utf_16")
+                self.assertTrue(u'"' + translation + u'"' in fp.read())
+                fp.close()
+
+        finally:
+            shutil.rmtree(root_path)
+
+    def test_create_localized_resources_skips_unchanged_outputs(self):
+        root_path = tempfile.mkdtemp()
+
+        try:
+            os.mkdir(os.path.join(root_path, "res"))
+            for name in [ "First", "Second" ]:
+                fp = open(os.path.join(root_path, "res", name + ".rc"), "w")
+                fp.write(
+                    "STRINGTABLE\nBEGIN\n    IDS_STRING \"" + name + "\"\nEND\n"
+                )
+                fp.close()
+
+            conf = burton.Config()
+            for key, value in {
+                burton.Config.root_path               : root_path,
+                burton.Config.output_languages        : [ "French", "German" ],
+                burton.Config.worker_processes        : 1,
+                burton.Config.paths_to_localize       : [ "res" ],
+                burton.Config.recursive_localization  : False,
+                burton.Config.disallowed_paths        :
+                    [ re.compile("\\.[a-z]{2}-[A-Z]{2}\\.rc$") ],
+                burton.Config.extensions_to_localize  : [ ".rc" ],
+                burton.Config.parsers_by_extension    :
+                    { ".rc" : "burton.parser.RC" },
+                burton.Config.template_cache_path     : "None",
+                burton.Config.localization_manifest_path : "manifest.json",
+                burton.Config.localization_output_dir : "None",
+                burton.Config.project_path            : "None",
+                burton.Config.use_vcs                 : True,
+                burton.Config.xlf_repo_path           : root_path,
+                burton.Config.files_by_language       : {
+                    "French" : "fr.xlf",
+                    "German" : "de.xlf",
+                },
+                burton.Config.language_codes          : {
+                    "English" : "en-US",
+                    "French"  : "fr-FR",
+                    "German"  : "de-DE",
+                },
+                burton.Config.native_language         : "English",
+                burton.Config.translation_files_class :
+                    "burton.translation.XLF",
+                burton.Config.company_name            : "Test Company",
+                burton.Config.product_name            : "Test Product",
+                burton.Config.contact_email           : "foo@example.com",
+            }.items():
+                conf.set(key, value)
+
+            translation_files = burton.TranslationFileCache()
+            translation_dicts = { }
+            for language, filename, translation in [
+                ( "French", "fr.xlf", u"Premier" ),
+                ( "German", "de.xlf", u"Erste" ),
+            ]:
+                translation_file = mock.Mock()
+                translation_file.translation_dict = {
+                    u"First"  : translation,
+                    u"Second" : None,
+                    u"Unused" : None,
+                }
+                translation_files.add(
+                    os.path.join(root_path, filename),
+                    translation_file,
+                    burton._get_translation_file_settings(conf, language)
+                )
+                translation_dicts[filename] = translation_file.translation_dict
+
+            def _localize():
+                vcs_class = mock.Mock()
+                captured_log = testfixtures.LogCapture()
+
+                burton.create_localized_resources(
+                    conf,
+                    [ u"First", u"Second", u"Unused" ],
+                    vcs_class,
+                    translation_files
+                )
+
+                messages = [
+                    record.getMessage() for record in captured_log.records
+                    if record.levelname == "INFO" and
+                        record.getMessage().startswith("Skipped ")
+                ]
+                captured_log.uninstall()
+
+                return (
+                    [ call[0][0] for call in vcs_class.add_file.call_args_list ],
+                    messages
+                )
+
+            filenames = [
+                os.path.join(root_path, "res", "First.fr-FR.rc"),
+                os.path.join(root_path, "res", "First.de-DE.rc"),
+                os.path.join(root_path, "res", "Second.fr-FR.rc"),
+                os.path.join(root_path, "res", "Second.de-DE.rc"),
+            ]
+
+            self.assertEquals(
+                _localize(),
+                (
+                    filenames,
+                    [ "Skipped 0 localized resources which had not changed" ]
+                )
+            )
+            self.assertTrue(
+                os.path.exists(os.path.join(root_path, "manifest.json"))
+            )
+
+            self.assertEquals(
+                _localize(),
+                (
+                    [ ],
+                    [ "Skipped 4 localized resources which had not changed" ]
+                )
+            )
+
+            translation_dicts["fr.xlf"][u"Unused"] = u"Inutilis\xe9"
+            translation_dicts["fr.xlf"][u"First"] = u"Premi\xe8re"
+            os.remove(filenames[3])
+
+            self.assertEquals(
+                _localize(),
+                (
+                    [ filenames[0], filenames[3] ],
+                    [ "Skipped 2 localized resources which had not changed" ]
+                )
+            )
+
+            fp = codecs.open(filenames[0], "r", "utf_16")
+            self.assertTrue(u'"Premi\xe8re"' in fp.read())
+            fp.close()
+
+        finally:
+            shutil.rmtree(root_path)
+
+    def test_create_localized_resources_restores_project_file_entries(self):
+        root_path = tempfile.mkdtemp()
+
+        try:
+            os.mkdir(os.path.join(root_path, "Forms"))
+            fp = open(os.path.join(root_path, "Forms", "Main.resx"), "w")
+            fp.write(
+                '<?xml version="1.0" encoding="utf-8"?>\n<root>\n' +
+                    '  <data name="label.Text" xml:space="preserve">\n' +
+                    '    <value>First</value>\n  </data>\n</root>\n'
+            )
+            fp.close()
+
+            proj_file = os.path.join(root_path, "Proj.csproj")
+            original_csproj = """<?xml version='1.0' encoding='ASCII'?>
+<Project xmlns="http://schemas.microsoft.com/developer/msbuild/2003">
+  <ItemGroup>
+    <Compile Include="Forms\\Main.cs"/>
+    <EmbeddedResource Include="Forms\\Main.resx">
+      <DependentUpon>Main.cs</DependentUpon>
+    </EmbeddedResource>
+  </ItemGroup>
+</Project>
+"""
+            fp = open(proj_file, "w")
+            fp.write(original_csproj)
+            fp.close()
+
+            conf = burton.Config()
+            for key, value in {
+                burton.Config.root_path               : root_path,
+                burton.Config.output_languages        : [ "French" ],
+                burton.Config.worker_processes        : 1,
+                burton.Config.paths_to_localize       : [ "Forms" ],
+                burton.Config.recursive_localization  : False,
+                burton.Config.disallowed_paths        :
+                    [ re.compile("\\.[a-z]{2}-[A-Z]{2}\\.resx$") ],
+                burton.Config.extensions_to_localize  : [ ".resx" ],
+                burton.Config.parsers_by_extension    :
+                    { ".resx" : "burton.parser.RESX" },
+                burton.Config.template_cache_path     : "None",
+                burton.Config.localization_manifest_path : "manifest.json",
+                burton.Config.localization_output_dir : "None",
+                burton.Config.project_path            : proj_file,
+                burton.Config.use_vcs                 : False,
+                burton.Config.xlf_repo_path           : root_path,
+                burton.Config.files_by_language       : { "French" : "fr.xlf" },
+                burton.Config.language_codes          : {
+                    "English" : "en-US",
+                    "French"  : "fr-FR",
+                },
+                burton.Config.native_language         : "English",
+                burton.Config.translation_files_class :
+                    "burton.translation.XLF",
+                burton.Config.company_name            : "Test Company",
+                burton.Config.product_name            : "Test Product",
+                burton.Config.contact_email           : "foo@example.com",
+            }.items():
+                conf.set(key, value)
+
+            translation_files = burton.TranslationFileCache()
+            translation_file = mock.Mock()
+            translation_file.translation_dict = { u"First" : u"Premier" }
+            translation_files.add(
+                os.path.join(root_path, "fr.xlf"),
+                translation_file,
+                burton._get_translation_file_settings(conf, "French")
+            )
+
+            def _localize():
+                captured_log = testfixtures.LogCapture()
+
+                burton.create_localized_resources(
+                    conf,
+                    [ u"First" ],
+                    mock.Mock(),
+                    translation_files
+                )
+
+                messages = [
+                    record.getMessage() for record in captured_log.records
+                    if record.levelname == "INFO" and
+                        record.getMessage().startswith("Skipped ")
+                ]
+                captured_log.uninstall()
+
+                fp = open(proj_file, "r")
+                contents = fp.read()
+                fp.close()
+
+                return contents, messages
+
+            contents, messages = _localize()
+            self.assertTrue('Include="Forms\\Main.fr-FR.resx"' in contents)
+            self.assertEquals(
+                messages,
+                [ "Skipped 0 localized resources which had not changed" ]
+            )
+
+            fp = open(proj_file, "w")
+            fp.write(original_csproj)
+            fp.close()
+
+            self.assertEquals(
+                _localize(),
+                (
+                    contents,
+                    [ "Skipped 1 localized resources which had not changed" ]
+                )
+            )
+
+        finally:
+            shutil.rmtree(root_path)
+
     def test_get_localized_resource_instance(self):
+        config_dict = {
+            burton.Config.parsers_by_extension :
+                { "rc": "burton.test.burtontests.TestRCParser" },
+            burton.Config.root_path           : "root",
+            burton.Config.template_cache_path : "None",
+        }
+
         conf = mock.Mock()
-        conf.get.return_value = { "rc": "burton.test.burtontests.TestRCParser" }
+        conf.get.side_effect = lambda key : config_dict[key]
+
         self.assertEquals(
             type(burton._get_localized_resource_instance(conf, "rc")),
             type(TestRCParser())
         )
 
+        config_dict[burton.Config.parsers_by_extension] = \
+            { "rc": "burton.parser.RC" }
+
+        localized_resource = burton._get_localized_resource_instance(conf, "rc")
+        self.assertEquals(localized_resource.template_cache.directory, None)
+
+        config_dict[burton.Config.template_cache_path] = "templates"
+        localized_resource = burton._get_localized_resource_instance(conf, "rc")
+        self.assertEquals(
+            localized_resource.template_cache.directory,
+            os.path.join("root", "templates")
+        )
+
     @mock.patch("__builtin__.open")
     @mock.patch.object(os.path, "exists")
     def test_open_translation_file_for_language(self, exists_func, open_func):
@@ -670,7 +1329,10 @@ class BurtonTests(unittest.TestCase):
             burton.Config.output_languages   : [ "French" ],
             burton.Config.logging_level      : "info",
             burton.Config.source_path        : "foo",
-            burton.Config.xlf_repo_path      : xlf_repo_path
+            burton.Config.xlf_repo_path      : xlf_repo_path,
+            burton.Config.database_prune_interval : 7,
+            burton.Config.database_prune_age      : 90,
+            burton.Config.worker_processes        : 1,
         }
 
         isdir_func.return_value = True
@@ -722,6 +1384,11 @@ class BurtonTests(unittest.TestCase):
             extract_mapping_func.return_value = mapping
 
             mock_db = mock.Mock()
+            mock_db.filename = test_db_name
+            mock_db.prune_if_due.return_value = 2
+            mock_db.is_prune_due.return_value = True
+            mock_db.get_dump_size.side_effect = lambda : \
+                1000 - 100 * mock_db.prune_if_due.call_count
             mock_db.get_all_native_translations.return_value = [ "Mapping1" ]
             mock_db.get_native_translations_for_platform.return_value = [
                 "Mapping1"
@@ -729,8 +1396,19 @@ class BurtonTests(unittest.TestCase):
             create_db_instance_func.return_value = mock_db
 
             conf._platform_queue = collections.deque([platform_string])
+            captured_log = testfixtures.LogCapture()
             burton.run()
 
+            self.assertTrue(
+                (
+                    burton.logger_name,
+                    "INFO",
+                    "Pruned 2 unused translation keys, which shrank the " +
+                        "database by 100 bytes, from 1000 to 900 bytes"
+                ) in captured_log.actual()
+            )
+            captured_log.uninstall()
+
             self.assertTrue(create_db_instance_func.called)
 
             self.assertTrue(mock_db.connect.called)
@@ -755,20 +1433,29 @@ class BurtonTests(unittest.TestCase):
 
             update_translation_file_func.assert_called_with(
                 conf,
-                [ "Mapping1" ],
-                [ "Mapping1" ],
+                frozenset([ "Mapping1" ]),
+                frozenset([ "Mapping1" ]),
                 "French",
-                vcs_class
+                vcs_class,
+                mock.ANY
+            )
+
+            translation_files = update_translation_file_func.call_args[0][5]
+            self.assertTrue(
+                isinstance(translation_files, burton.TranslationFileCache)
             )
 
             create_localized_resources_func.assert_called_with(
                 conf,
                 [ "Mapping1" ],
-                vcs_class
+                vcs_class,
+                translation_files
             )
 
             update_base_localizations_func.assert_called_with(conf, vcs_class)
 
+            mock_db.is_prune_due.assert_called_with(7)
+            mock_db.prune_if_due.assert_called_with(7, 90)
             self.assertTrue(mock_db.disconnect.called)
 
             self.assertFalse(vcs_class.commit_changes.called)
@@ -789,7 +1476,12 @@ class BurtonTests(unittest.TestCase):
             self.assertTrue(vcs_class.commit_changes.called)
             self.assertTrue(vcs_class.upload_changes.called)
 
-            def _throw_exception(conf, native_translations, vcs_class):
+            def _throw_exception(
+                conf,
+                native_translations,
+                vcs_class,
+                translation_files
+            ):
                 raise Exception("Sample Exception")
 
             create_localized_resources_func.side_effect = _throw_exception
@@ -962,8 +1654,11 @@ class BurtonTests(unittest.TestCase):
     def test_create_db_instance(self, mock_constructor):
         def _config_get(key):
             return {
-                burton.Config.xlf_repo_path : "some_path",
-                burton.Config.database_path : "some_file"
+                burton.Config.xlf_repo_path      : "some_path",
+                burton.Config.database_adaptor   : None,
+                burton.Config.database_path      : "some_file",
+                burton.Config.database_in_memory : True,
+                burton.Config.database_pragmas   : { "synchronous" : "FULL" },
             }[key]
 
         conf = mock.Mock()
@@ -972,5 +1667,64 @@ class BurtonTests(unittest.TestCase):
         burton._create_db_instance(conf)
         mock_constructor.assert_called_with(
             os.path.join(os.path.abspath("some_path")
-            , "some_file")
+            , "some_file"),
+            in_memory = True,
+            pragmas   = { "synchronous" : "FULL" }
+        )
+
+    def test_write_coverage_report(self):
+        db = mock.Mock()
+        db.get_platforms.return_value = [ u"Mac", u"Win" ]
+        db.iter_translation_key_coverage.return_value = iter([
+            (u"OtherString",  frozenset([ ])),
+            (u"Some\tString", frozenset([ u"Win" ])),
+            (u"Caf\xe9",      frozenset([ u"Mac", u"Win" ])),
+        ])
+
+        output_file = cStringIO.StringIO()
+        burton.write_coverage_report(db, output_file)
+
+        self.assertEquals(
+            output_file.getvalue(),
+            "Translation Key\tMac\tWin\r\n" +
+            "OtherString\t\t\r\n" +
+            "\"Some\tString\"\t\tx\r\n" +
+            "Caf\xc3\xa9\tx\tx\r\n"
+        )
+
+    def test_write_differences_report(self):
+        db = mock.Mock()
+        db.get_platforms.return_value = [ u"Mac", u"Win", u"Web" ]
+        db.iter_native_translation_differences.return_value = iter([
+            (
+                u"SomeString",
+                { u"Mac" : u"Mac translation", u"Win" : u"Win translation" }
+            ),
+        ])
+
+        output_file = cStringIO.StringIO()
+        burton.write_differences_report(db, output_file)
+
+        self.assertEquals(
+            output_file.getvalue(),
+            "Translation Key\tMac\tWin\tWeb\r\n" +
+            "SomeString\tMac translation\tWin translation\t\r\n"
+        )
+
+    def test_create_db_instance_with_adaptor(self):
+        def _config_get(key):
+            return {
+                burton.Config.xlf_repo_path    : "some_path",
+                burton.Config.database_adaptor : "burton.database.FlatFile",
+                burton.Config.database_path    : "some_file",
+            }[key]
+
+        conf = mock.Mock()
+        conf.get.side_effect = _config_get
+
+        db = burton._create_db_instance(conf)
+        self.assertTrue(isinstance(db, burton.database.FlatFile))
+        self.assertEquals(
+            db.filename,
+            os.path.join(os.path.abspath("some_path"), "some_file")
         )
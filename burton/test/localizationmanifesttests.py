@@ -0,0 +1,152 @@
+import os
+import shutil
+import tempfile
+import testfixtures
+import unittest
+
+from burton import LocalizationManifest
+
+class LocalizationManifestTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.temp_dir, "manifest.json")
+        self.output   = os.path.join(self.temp_dir, "res", "Strings.fr-FR.rc")
+
+        os.mkdir(os.path.join(self.temp_dir, "res"))
+        self._write(self.output, "output")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _write(self, filename, contents):
+        fp = open(filename, "w")
+        fp.write(contents)
+        fp.close()
+
+    def test_get_inputs_hash(self):
+        manifest = LocalizationManifest(self.filename, self.temp_dir)
+        mapping  = { u"First" : u"Premier", u"Unused" : None }
+
+        inputs_hash = manifest.get_inputs_hash(
+            "source",
+            [ "RC", "fr-FR" ],
+            mapping,
+            [ u"First", u"Missing" ]
+        )
+
+        mapping[u"Unused"] = u"Inutilis\xe9"
+        self.assertEquals(
+            manifest.get_inputs_hash(
+                "source",
+                [ "RC", "fr-FR" ],
+                mapping,
+                [ u"Missing", u"First" ]
+            ),
+            inputs_hash
+        )
+
+        for source_hash, settings, changed_mapping in [
+            ("other source", [ "RC", "fr-FR" ], mapping),
+            ("source", [ "RC", "de-DE" ], mapping),
+            ("source", [ "RC", "fr-FR" ], { u"First" : u"Premi\xe8re" }),
+            ("source", [ "RC", "fr-FR" ], { u"Missing" : None }),
+        ]:
+            self.assertNotEquals(
+                manifest.get_inputs_hash(
+                    source_hash,
+                    settings,
+                    changed_mapping,
+                    [ u"First", u"Missing" ]
+                ),
+                inputs_hash
+            )
+
+        self.assertNotEquals(
+            manifest.get_inputs_hash(
+                "source",
+                [ "RC", "fr-FR" ],
+                mapping,
+                None
+            ),
+            manifest.get_inputs_hash(
+                "source",
+                [ "RC", "fr-FR" ],
+                { u"First" : u"Premier", u"Unused" : None },
+                None
+            )
+        )
+
+    def test_is_current(self):
+        manifest = LocalizationManifest(self.filename, self.temp_dir)
+        key = manifest.get_key(
+            os.path.join(self.temp_dir, "res", "Strings.rc"),
+            "French"
+        )
+        self.assertEquals(key, u"res/Strings.rc\nFrench")
+        self.assertFalse(manifest.is_current(key, "inputs"))
+
+        manifest.set(key, manifest.create_entry("inputs", [ self.output ]))
+        self.assertTrue(manifest.is_current(key, "inputs"))
+        self.assertFalse(manifest.is_current(key, "other inputs"))
+
+        manifest.save()
+        manifest = LocalizationManifest(self.filename, self.temp_dir)
+        self.assertTrue(manifest.is_current(key, "inputs"))
+
+        self._write(self.output, "edited output")
+        self.assertFalse(manifest.is_current(key, "inputs"))
+
+        os.remove(self.output)
+        self.assertFalse(manifest.is_current(key, "inputs"))
+
+    def test_create_entry(self):
+        manifest = LocalizationManifest(self.filename, self.temp_dir)
+
+        self.assertEquals(
+            manifest.create_entry("inputs", [ self.output ])["outputs"].keys(),
+            [ u"res/Strings.fr-FR.rc" ]
+        )
+        self.assertEquals(manifest.create_entry("inputs", [ None ]), None)
+        self.assertEquals(
+            manifest.create_entry(
+                "inputs",
+                [ os.path.join(self.temp_dir, "res") ]
+            ),
+            None
+        )
+
+    def test_save(self):
+        manifest = LocalizationManifest(self.filename, self.temp_dir)
+        manifest.save()
+        self.assertFalse(os.path.exists(self.filename))
+
+        manifest.set(u"key", manifest.create_entry("inputs", [ self.output ]))
+        manifest.save()
+        self.assertTrue(os.path.exists(self.filename))
+        self.assertEquals(
+            sorted(os.listdir(self.temp_dir)),
+            [ "manifest.json", "res" ]
+        )
+
+        manifest = LocalizationManifest(self.filename, self.temp_dir)
+        manifest.set(u"key", None)
+        manifest.save()
+
+        manifest = LocalizationManifest(self.filename, self.temp_dir)
+        self.assertFalse(manifest.is_current(u"key", "inputs"))
+
+    def test_load_invalid_manifest(self):
+        self._write(self.filename, "{ invalid")
+
+        captured_log = testfixtures.LogCapture()
+        manifest = LocalizationManifest(self.filename, self.temp_dir)
+        captured_log.check(
+            (
+                "extensis.burton",
+                "WARNING",
+                "Unable to read localization manifest " + self.filename
+            )
+        )
+        captured_log.uninstall()
+
+        self.assertFalse(manifest.is_current(u"key", "inputs"))
@@ -0,0 +1,89 @@
+import codecs
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+from burton.outputfile import OutputFile, hash_file, write_if_changed
+
+class OutputFileTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.temp_dir, "Strings.fr-FR.rc")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _read(self):
+        fp = open(self.filename, "rb")
+        contents = fp.read()
+        fp.close()
+        return contents
+
+    def test_write_if_changed(self):
+        self.assertTrue(write_if_changed(self.filename, "contents"))
+        self.assertEquals(self._read(), "contents")
+        self.assertEquals(
+            stat.S_IMODE(os.stat(self.filename).st_mode),
+            0o666 & ~self._get_umask()
+        )
+
+        os.chmod(self.filename, 0o600)
+        os.utime(self.filename, (0, 0))
+        self.assertFalse(write_if_changed(self.filename, "contents"))
+        self.assertEquals(os.path.getmtime(self.filename), 0)
+
+        self.assertTrue(write_if_changed(self.filename, "contents 2"))
+        self.assertTrue(write_if_changed(self.filename, "contents 3"))
+        self.assertEquals(self._read(), "contents 3")
+        self.assertEquals(stat.S_IMODE(os.stat(self.filename).st_mode), 0o600)
+        self.assertEquals(os.listdir(self.temp_dir), [ "Strings.fr-FR.rc" ])
+
+    def test_close(self):
+        output_file = OutputFile(self.filename, "utf_16")
+        output_file.write(u"STRINGTABLE\r\n")
+        output_file.write(u"\"Premi\xe8re\"\r\n")
+        self.assertFalse(os.path.exists(self.filename))
+
+        output_file.close()
+        self.assertTrue(output_file.changed)
+
+        fp = codecs.open(self.filename, "r", "utf_16")
+        self.assertEquals(fp.read(), u"STRINGTABLE\r\n\"Premi\xe8re\"\r\n")
+        fp.close()
+
+        with OutputFile(self.filename, "utf_16") as output_file:
+            output_file.write(u"STRINGTABLE\r\n\"Premi\xe8re\"\r\n")
+
+        self.assertFalse(output_file.changed)
+
+    def test_close_without_encoding(self):
+        output_file = OutputFile(self.filename)
+        output_file.close()
+        self.assertTrue(output_file.changed)
+        self.assertEquals(self._read(), "")
+
+        output_file = OutputFile(self.filename)
+        output_file.writelines([ "<strings>\n", "</strings>\n" ])
+        output_file.close()
+        self.assertTrue(output_file.changed)
+        self.assertEquals(
+            self._read(),
+            "<strings>" + os.linesep + "</strings>" + os.linesep
+        )
+
+    def test_hash_file(self):
+        self.assertEquals(hash_file(self.filename), None)
+        self.assertEquals(hash_file(self.temp_dir), None)
+
+        write_if_changed(self.filename, "contents")
+        self.assertEquals(
+            hash_file(self.filename),
+            "4a756ca07e9487f482465a99e8286abc86ba4dc7"
+        )
+
+    def _get_umask(self):
+        umask = os.umask(0)
+        os.umask(umask)
+        return umask
@@ -0,0 +1,81 @@
+import mock
+import os
+import shutil
+import tempfile
+import unittest
+
+from burton import TranslationFileCache
+
+class TranslationFileCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.temp_dir, "fr.xlf")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _write(self, contents):
+        fp = open(self.filename, "w")
+        fp.write(contents)
+        fp.close()
+
+    def test_get(self):
+        self._write("contents")
+        load_func = mock.Mock(return_value = "translation file")
+        cache = TranslationFileCache()
+
+        self.assertFalse(self.filename in cache)
+        self.assertEquals(
+            cache.get(self.filename, load_func),
+            "translation file"
+        )
+        self.assertEquals(
+            cache.get(self.filename, load_func),
+            "translation file"
+        )
+        self.assertTrue(self.filename in cache)
+        self.assertEquals(load_func.call_count, 1)
+
+    def test_get_reloads_changed_file(self):
+        load_func = mock.Mock(return_value = "translation file")
+        cache = TranslationFileCache()
+
+        cache.get(self.filename, load_func)
+        self._write("changed contents")
+        cache.get(self.filename, load_func)
+        self.assertEquals(load_func.call_count, 2)
+
+    def test_get_reloads_for_other_settings(self):
+        self._write("contents")
+        load_func = mock.Mock(return_value = "translation file")
+        cache = TranslationFileCache()
+
+        cache.get(self.filename, load_func, ("First Company",))
+        cache.get(self.filename, load_func, ("First Company",))
+        self.assertEquals(load_func.call_count, 1)
+
+        cache.get(self.filename, load_func, ("Second Company",))
+        self.assertEquals(load_func.call_count, 2)
+        self.assertEquals(cache.lookup(self.filename, ("First Company",)), None)
+
+    def test_update(self):
+        load_func = mock.Mock(return_value = "translation file")
+        cache = TranslationFileCache()
+
+        cache.get(self.filename, load_func)
+        self._write("written contents")
+        cache.update(self.filename)
+        cache.get(self.filename, load_func)
+        self.assertEquals(load_func.call_count, 1)
+
+    def test_clear(self):
+        self._write("contents")
+        load_func = mock.Mock(return_value = "translation file")
+        cache = TranslationFileCache()
+
+        cache.get(self.filename, load_func)
+        cache.clear()
+        self.assertFalse(self.filename in cache)
+
+        cache.get(self.filename, load_func)
+        self.assertEquals(load_func.call_count, 2)
@@ -1,6 +1,43 @@
+import collections
+
 ellipsis = u'\xe2\x80\xa6'
 three_dots = '...'
 
+class _TranslationDictView(collections.Mapping):
+    """A read-only view of a dictionary, which reflects later changes to it
+    without copying it.
+    """
+
+    def __init__(self, wrapped_dict):
+        self._dict = wrapped_dict
+
+    def __getitem__(self, key):
+        return self._dict[key]
+
+    def __contains__(self, key):
+        return key in self._dict
+
+    def __iter__(self):
+        return iter(self._dict)
+
+    def __len__(self):
+        return len(self._dict)
+
+    def __repr__(self):
+        return repr(self._dict)
+
+    def get(self, key, default = None):
+        return self._dict.get(key, default)
+
+    def keys(self):
+        return self._dict.keys()
+
+    def items(self):
+        return self._dict.items()
+
+    def iteritems(self):
+        return self._dict.iteritems()
+
 class Base(object):
     """This class is the base of the translation hierarchy. Translation objects
     represent a mapping from native-language strings into strings of another
@@ -19,6 +56,8 @@ class Base(object):
     ):
         object.__init__(self)
         self._translation_dict = {}
+        self._expanded_dict    = {}
+        self._expanded_view    = _TranslationDictView(self._expanded_dict)
         self.language          = language
         self.language_code     = language_code
         self.source_language   = source_language
@@ -39,12 +78,14 @@ class Base(object):
                     return
 
         self._translation_dict[native_string] = translation
+        self._update_expanded_dict(native_string)
 
     def delete_translation(self, native_string):
         """This methods deletes the translation for the native string, if any.
         """
         if native_string in self._translation_dict:
             del self._translation_dict[native_string]
+            self._update_expanded_dict(native_string)
 
     def get_translation(self, native_string):
         """Returns the translation for the native-language string, or None if
@@ -53,26 +94,54 @@ class Base(object):
         return self._translation_dict.get(native_string, None)
 
     def get_translation_dict(self):
-        """This method returns a dictionary containing the translations held in
-        this object. The return value can be freely modified without affecting
-        the contents of this object"""
-        copied_dict = self._translation_dict.copy()
-
-        for key in copied_dict.keys():
-            if not key.endswith(ellipsis) and not key.endswith(three_dots):
-                mac_key = key + ellipsis
-                win_key = key + three_dots
-
-                value = copied_dict[key]
+        """This method returns a read-only mapping containing the translations
+        held in this object. For every translated string which does not end in
+        an ellipsis or three dots, the mapping also holds variants of the string
+        and its translation ending in an ellipsis and in three dots, unless the
+        object already has translations for them.
+
+        The mapping is kept up to date as translations are added and deleted, so
+        callers which need to modify it, or keep it unchanged, should copy it
+        with dict() first."""
+        return self._expanded_view
+
+    def _update_expanded_dict(self, native_string):
+        """Updates the entries of the expanded dictionary which depend on
+        native_string after its translation has been added or deleted.
+        """
+        for key in (
+            native_string,
+            native_string + ellipsis,
+            native_string + three_dots
+        ):
+            if key in self._translation_dict:
+                self._expanded_dict[key] = self._translation_dict[key]
+                continue
+
+            value = self._get_variant_translation(key)
+            if value is not None:
+                self._expanded_dict[key] = value
+            elif key in self._expanded_dict:
+                del self._expanded_dict[key]
+
+    def _get_variant_translation(self, key):
+        """Returns the translation of the ellipsis or three dots variant key,
+        derived from the translation of the string it was made from, or None if
+        key is not such a variant.
+        """
+        for suffix in (ellipsis, three_dots):
+            if key.endswith(suffix):
+                base_key = key[:-len(suffix)]
+                if base_key.endswith(ellipsis) or base_key.endswith(three_dots):
+                    return None
 
-                if value is not None:
-                    if not mac_key in copied_dict:
-                        copied_dict[mac_key] = value + ellipsis
+                value = self._translation_dict.get(base_key, None)
+                if value is None:
+                    return None
 
-                    if not win_key in copied_dict:
-                        copied_dict[win_key] = value + three_dots
+                return value + suffix
 
-        return copied_dict
+        return None
 
     translation_dict = property(get_translation_dict, None)
 
@@ -84,9 +153,7 @@ class Base(object):
         be replaced.
         """
 
-        other_dict = other.translation_dict
-        for key in other_dict:
-            translation = other_dict[key]
+        for key, translation in other.translation_dict.items():
             if not (translation is None and \
               self._translation_dict.get(key, None) is not None):
                 self.add_translation(key, translation)
@@ -103,7 +170,7 @@ class Base(object):
                 keys_to_delete.append(key)
 
         for key in keys_to_delete:
-            del self._translation_dict[key]
+            self.delete_translation(key)
 
     def remove_translated_strings(self):
         """Removes all strings which are untranslated."""
@@ -114,7 +181,7 @@ class Base(object):
                 keys_to_delete.append(key)
 
         for key in keys_to_delete:
-            del self._translation_dict[key]
+            self.delete_translation(key)
 
     def read(self, file):
         """This method accepts a file-like object and reads its contents,
@@ -57,6 +57,36 @@ class BaseTests(unittest.TestCase):
         trans.delete_translation(u"Some native string")
         self.assertEquals(trans.translation_dict,{})
 
+    def test_translation_dict_is_updated_view(self):
+        trans = translation.Base("Italian", "it-IT", "en", "", "", "")
+        translation_dict = trans.translation_dict
+
+        trans.add_translation(u"Some native string", u"Some translation")
+        trans.add_translation(u"Some native string...", u"Other translation")
+        self.assertTrue(trans.translation_dict is translation_dict)
+        self.assertEquals(
+            translation_dict,
+            {
+                u"Some native string"             : u"Some translation",
+                u"Some native string..."          : u"Other translation",
+                u"Some native string\xe2\x80\xa6" : u"Some translation\xe2\x80\xa6"
+            }
+        )
+
+        trans.delete_translation(u"Some native string...")
+        self.assertEquals(
+            translation_dict[u"Some native string..."],
+            u"Some translation..."
+        )
+
+        trans.add_translation(u"Some native string", None)
+        self.assertEquals(translation_dict, { u"Some native string" : None })
+
+        def _set_translation():
+            translation_dict[u"Other native string"] = u"Other translation"
+
+        self.assertRaises(TypeError, _set_translation)
+
     def test_get_translation(self):
         trans = translation.Base("Italian", "it-IT", "en", "", "", "")
         trans.add_translation(u"Some native string", u"Some translation")
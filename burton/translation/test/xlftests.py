@@ -1,7 +1,9 @@
 import cStringIO
+import mock
 import random
 import unittest
 
+from burton import parser
 from burton import translation
 
 class XLFTests(unittest.TestCase):
@@ -91,6 +93,39 @@ class XLFTests(unittest.TestCase):
             }
         )
 
+    def test_read_ignores_trans_units_outside_group(self):
+        trans = translation.XLF("Italian", "it-IT", "en", "", "", "")
+        file = cStringIO.StringIO(
+            XLFTests.test_xlf.replace(
+                "    </body>",
+                """      <group resname="Other Group">
+        <trans-unit restype="string">
+          <source xml:lang="en">Some other string</source>
+          <target>Traduzione</target>
+        </trans-unit>
+      </group>
+    </body>"""
+            )
+        )
+
+        trans.read(file)
+        file.close()
+
+        self.assertEquals(
+            trans.get_translation(u"Some translated string"),
+            u"Traduzione di Bablefish per questa stringa"
+        )
+        self.assertEquals(trans.get_translation(u"Some other string"), None)
+
+    def test_read_raises_on_empty_or_invalid_file(self):
+        for contents in [ "", XLFTests.test_xlf[:-100] ]:
+            trans = translation.XLF("Italian", "it-IT", "en", "", "", "")
+            file = cStringIO.StringIO(contents)
+
+            self.assertRaises(Exception, trans.read, file)
+            self.assertEquals(trans.translation_dict, { })
+            file.close()
+
     def test_write(self):
         trans = translation.XLF(
             "Italian",
@@ -114,6 +149,66 @@ class XLFTests(unittest.TestCase):
         self.assertEquals(file.getvalue(), XLFTests.test_xlf)
         file.close()
 
+    def test_write_filters_each_key_once(self):
+        trans = translation.XLF(
+            "Italian",
+            "it-IT",
+            "en",
+            "Test Company",
+            "Test Product",
+            "foo@example.com"
+        )
+
+        trans.add_translation(
+            u"Some translated string",
+            u"Traduzione di Bablefish per questa stringa"
+        )
+        trans.add_translation("Some untranslated string %d", None)
+
+        with mock.patch.object(
+            parser,
+            "replace_params",
+            side_effect = parser.replace_params
+        ) as replace_params_func:
+            for i in range(2):
+                file = cStringIO.StringIO()
+                trans.write(file)
+                self.assertEquals(file.getvalue(), XLFTests.test_xlf)
+                file.close()
+
+            self.assertEquals(replace_params_func.call_count, 2)
+
+            trans.delete_translation("Some untranslated string %d")
+            trans.add_translation("Some untranslated string %d", None)
+            trans.write(cStringIO.StringIO())
+            self.assertEquals(replace_params_func.call_count, 3)
+
+    def test_write_without_translations(self):
+        trans = translation.XLF(
+            "Italian",
+            "it-IT",
+            "en",
+            "Test Company",
+            "Test Product",
+            "foo@example.com"
+        )
+
+        trans.add_translation(u" ", None)
+
+        file = cStringIO.StringIO()
+        trans.write(file)
+
+        self.assertEquals(
+            file.getvalue(),
+            XLFTests.test_xlf[:XLFTests.test_xlf.index("      <group")] +
+                """      <group resname="Group Name"/>
+    </body>
+  </file>
+</xliff>
+"""
+        )
+        file.close()
+
     def test_sorts_by_key__untranslated_first__when_writing(self):
         trans = translation.XLF(
             "Italian",
@@ -1,4 +1,5 @@
 import lxml
+import lxml.etree
 import os
 
 from pkg_resources import resource_stream
@@ -23,37 +24,121 @@ class XLF(Base):
     target_language_attrib = "target-language"
     lang_attrib            = "{http://www.w3.org/XML/1998/namespace}lang"
 
+    group_indent           = "\n" + " " * 6
+    unit_indent            = "\n" + " " * 8
+    unit_child_indent      = "\n" + " " * 10
+
+    def __init__(
+        self,
+        language,
+        language_code,
+        source_language,
+        company_name,
+        product_name,
+        contact_email
+    ):
+        Base.__init__(
+            self,
+            language,
+            language_code,
+            source_language,
+            company_name,
+            product_name,
+            contact_email
+        )
+
+        self._filtered_sources = { }
+
+    def delete_translation(self, native_string):
+        Base.delete_translation(self, native_string)
+        self._filtered_sources.pop(native_string, None)
+
     def read(self, file):
-        tree = None
+        """Reads the trans-units in the file's group one at a time with
+        iterparse, clearing each one once it has been read, so that the whole
+        file is never held in memory as a tree.
+
+        Translations are only added once the whole file has been parsed. If
+        the file cannot be parsed, the template is read instead, as if the file
+        were empty.
+        """
+        translations = []
 
         try:
-            tree = lxml.etree.fromstring(file.read())
+            for event, element in lxml.etree.iterparse(
+                file,
+                events = ("end",),
+                tag = XLF.trans_unit_tag
+            ):
+                if self._is_in_translation_group(element) and len(element) > 1:
+                    translations.append(self._read_trans_unit(element))
+
+                element.clear()
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+
         except Exception as e:
             tree = self._read_template()
+            group = tree.find(XLF.file_tag).find(XLF.body_tag).\
+                find(XLF.group_tag)
 
-        group = tree.find(XLF.file_tag).find(XLF.body_tag).find(XLF.group_tag)
-
-        for child in group:
-            if child.tag == XLF.trans_unit_tag and len(child) > 1:
-                source = child.find(XLF.source_tag).text
-                target = child.find(XLF.target_tag).text
+            translations = [
+                self._read_trans_unit(child) for child in group
+                if child.tag == XLF.trans_unit_tag and len(child) > 1
+            ]
 
-                self.add_translation(source, target)
+        for source, target in translations:
+            self.add_translation(source, target)
 
         if len(self._translation_dict) == 0:
             raise Exception(
                 "Attempted to an read XLF file with no translations."
             )
 
-    def write(self, file):
-        tree = self._read_template()
-        group = tree.find(XLF.file_tag).find(XLF.body_tag).find(XLF.group_tag)
-        group.text = None # Needed for pretty_print to work
+    def _read_trans_unit(self, trans_unit):
+        return (
+            trans_unit.find(XLF.source_tag).text,
+            trans_unit.find(XLF.target_tag).text,
+        )
+
+    def _is_in_translation_group(self, trans_unit):
+        """Returns whether the trans-unit is in the first group of the first
+        body of the first file of the XLF file, which is the only group read.
+        """
+        group = trans_unit.getparent()
+        if group is None or group.tag != XLF.group_tag:
+            return False
+
+        body = group.getparent()
+        if body is None or body.tag != XLF.body_tag or \
+          body.find(XLF.group_tag) is not group:
+            return False
+
+        file = body.getparent()
+        if file is None or file.tag != XLF.file_tag or \
+          file.find(XLF.body_tag) is not body:
+            return False
 
+        root = file.getparent()
+        return root is not None and root.getparent() is None and \
+            root.find(XLF.file_tag) is file
+
+    def write(self, file):
+        """Writes the template with one trans-unit per translation, with the
+        untranslated strings first, each sorted by key.
+
+        The template is serialized up to and after its group, and the group
+        and its trans-units are written between the two one at a time with
+        xmlfile, so that the output is the same as pretty-printing the whole
+        tree without ever building it.
+        """
         untranslated_keys = []
         translated_keys   = []
 
         for key in self._translation_dict:
+            if key is None or key.strip() == "":
+                continue
+
             if self._translation_dict[key] is None:
                 untranslated_keys.append(key)
             else:
@@ -65,43 +150,73 @@ class XLF(Base):
         all_keys = untranslated_keys
         all_keys.extend(translated_keys)
 
-        for key in all_keys:
-            if key is not None and key.strip() != "":
-                trans_unit = lxml.etree.Element(
-                    XLF.trans_unit_tag,
-                    { "restype" : "string" },
-                )
+        tree = self._read_template()
+        group = tree.find(XLF.file_tag).find(XLF.body_tag).find(XLF.group_tag)
+        group.text = None
 
-                source = lxml.etree.Element(
-                    XLF.source_tag,
-                    { XLF.lang_attrib : self.source_language },
-                )
+        placeholder = lxml.etree.Element(XLF.group_tag + "-placeholder")
+        group.addprevious(placeholder)
+        group.getparent().remove(group)
 
-                filtered_source = None
-                if key is not None:
-                    filtered_source, replaced_params = \
-                        parser.replace_params(key)
+        header, footer = lxml.etree.tostring(
+            tree,
+            xml_declaration = True,
+            pretty_print = True,
+            encoding = XLF.encoding
+        ).split(lxml.etree.tostring(placeholder))
 
-                source.text = filtered_source
+        file.write(header)
 
-                target = lxml.etree.Element(
-                    XLF.target_tag,
-                    { },
-                )
+        with lxml.etree.xmlfile(file, encoding = XLF.encoding) as xml_file:
+            if len(all_keys) == 0:
+                xml_file.write(group)
+            else:
+                with xml_file.element(group.tag, group.attrib):
+                    for key in all_keys:
+                        xml_file.write(XLF.unit_indent)
+                        xml_file.write(self._create_trans_unit(key))
 
-                target.text = self._translation_dict[key]
+                    xml_file.write(XLF.group_indent)
 
-                trans_unit.append(source)
-                trans_unit.append(target)
+        file.write(footer)
 
-                group.append(trans_unit)
+    def _create_trans_unit(self, key):
+        trans_unit = lxml.etree.Element(
+            XLF.trans_unit_tag,
+            { "restype" : "string" },
+        )
+        trans_unit.text = XLF.unit_child_indent
 
-        tree.write(
-            file,
-            xml_declaration = True,
-            pretty_print = True,
-            encoding = XLF.encoding
+        source = lxml.etree.SubElement(
+            trans_unit,
+            XLF.source_tag,
+            { XLF.lang_attrib : self.source_language },
+        )
+        source.text = self._get_filtered_source(key)
+        source.tail = XLF.unit_child_indent
+
+        target = lxml.etree.SubElement(
+            trans_unit,
+            XLF.target_tag,
+            { },
         )
+        target.text = self._translation_dict[key]
+        target.tail = XLF.unit_indent
+
+        return trans_unit
+
+    def _get_filtered_source(self, key):
+        """Returns key with its params replaced, as it is written in its
+        source element. Keys are only filtered the first time they are written,
+        since a translation object is written once for every platform that
+        shares it.
+        """
+        filtered_source = self._filtered_sources.get(key)
+        if filtered_source is None:
+            filtered_source = parser.replace_params(key)[0]
+            self._filtered_sources[key] = filtered_source
+
+        return filtered_source
 
     def _read_template(self):
         tree = lxml.etree.parse(
@@ -0,0 +1,87 @@
+import os
+
+class TranslationFileCache(object):
+    """The TranslationFileCache class holds parsed translation files for the
+    length of a run, so that a file shared by several platforms is read from
+    disk and parsed once, rather than once for each platform and step that uses
+    it.
+
+    Files are cached by their path, along with their modification time and size
+    when they were loaded or last written. A file which has changed on disk
+    since then, for example after a VCS update or revert, is loaded again.
+    Changes made to a cached translation object are seen by later callers, so
+    after it is written back to disk, call update() so that the file is not
+    considered changed.
+
+    Files can also be cached with the settings their translation object was
+    created with, such as the company and product names written in its header.
+    A file is only returned for the settings it was cached with, and is loaded
+    again for any other settings, so that platforms with different settings
+    which share a file each write their own.
+    """
+
+    def __init__(self):
+        object.__init__(self)
+        self._files = { }
+
+    def __contains__(self, filename):
+        return filename in self._files
+
+    def get(self, filename, load_func, settings = None):
+        """Returns the translation object for the file at filename, calling
+        load_func to load it if it is not cached with the same settings or has
+        changed on disk since it was cached.
+        """
+        translation_file = self.lookup(filename, settings)
+        if translation_file is None:
+            translation_file = load_func()
+            self.add(filename, translation_file, settings)
+
+        return translation_file
+
+    def lookup(self, filename, settings = None):
+        """Returns the cached translation object for the file at filename, or
+        None if it is not cached with the same settings or has changed on disk
+        since it was cached.
+        """
+        if filename in self._files:
+            translation_file, cached_stat, cached_settings = \
+                self._files[filename]
+
+            if cached_settings == settings and \
+              cached_stat == self._get_file_stat(filename):
+                return translation_file
+
+        return None
+
+    def add(self, filename, translation_file, settings = None):
+        """Caches a translation object created with settings which matches the
+        file at filename as it currently is on disk, such as one loaded or
+        written by another process.
+        """
+        self._files[filename] = (
+            translation_file,
+            self._get_file_stat(filename),
+            settings
+        )
+
+    def update(self, filename):
+        """Records that the cached translation object for filename has been
+        written to disk.
+        """
+        if filename in self._files:
+            translation_file, cached_stat, settings = self._files[filename]
+            self.add(filename, translation_file, settings)
+
+    def clear(self):
+        """Drops all cached translation files, so that they are loaded from disk
+        again the next time they are requested.
+        """
+        self._files.clear()
+
+    def _get_file_stat(self, filename):
+        if not os.path.exists(filename):
+            return None
+
+        file_stat = os.stat(filename)
+        return file_stat.st_mtime, file_stat.st_size
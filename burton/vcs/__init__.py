@@ -1,3 +1,4 @@
 from noop import NoOp
+from deferred import Deferred
 from git import Git
 from vcsexception import VCSException
@@ -0,0 +1,23 @@
+from noop import NoOp
+
+class Deferred(NoOp):
+    """The Deferred class records the files passed to add_file instead of
+    adding them, so that they can be added later with another VCS class by
+    calling replay(). This allows work that would otherwise add files to the
+    VCS, such as updating translation files, to be done in worker processes,
+    while the VCS itself is only used by the parent process.
+    """
+
+    def __init__(self):
+        NoOp.__init__(self)
+        self.added_files = [ ]
+
+    def add_file(self, file, xlf_repo_path = None):
+        self.added_files.append((file, xlf_repo_path))
+
+    def replay(self, vcs_class):
+        """Adds the recorded files with vcs_class, in the order they were
+        recorded.
+        """
+        for file, xlf_repo_path in self.added_files:
+            vcs_class.add_file(file, xlf_repo_path)
@@ -0,0 +1,21 @@
+import mock
+import unittest
+
+from burton import vcs
+
+class DeferredTests(unittest.TestCase):
+    def test_replay(self):
+        deferred = vcs.Deferred()
+        deferred.add_file("some_file")
+        deferred.add_file("other_file", "xlf_repo_path")
+
+        vcs_class = mock.Mock()
+        deferred.replay(vcs_class)
+
+        self.assertEquals(
+            vcs_class.add_file.call_args_list,
+            [
+                mock.call("some_file", None),
+                mock.call("other_file", "xlf_repo_path"),
+            ]
+        )
@@ -0,0 +1,116 @@
+"""Compares the database backends by replaying a history of string mappings,
+such as a run of burton would write, into each of them.
+
+Usage: python benchmark_database.py [--keys 200000] [--runs 5]
+"""
+
+import optparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(
+    0,
+    os.path.join(os.path.abspath(os.path.dirname(sys.argv[0])), "..")
+)
+
+from burton import database
+
+platforms = [ "Mac", "Win" ]
+
+def create_history(num_keys, num_runs):
+    """Returns a list of runs, each of which maps every platform to the string
+    mapping written for it. Each run changes 1% of the existing translations and
+    adds 0.5% new strings.
+    """
+    generator = random.Random(0)
+    mapping = { }
+    for index in xrange(num_keys):
+        mapping[u"String %d \u65e5\u672c %%d" % index] = \
+            u"Translation %d for {0}" % index
+
+    history = [ ]
+    next_key = num_keys
+    for run in xrange(num_runs):
+        keys = mapping.keys()
+        for key in generator.sample(keys, len(keys) / 100):
+            mapping[key] = u"Translation changed in run %d" % run
+
+        for index in xrange(num_keys / 200):
+            mapping[u"String %d \u65e5\u672c %%d" % next_key] = \
+                u"Translation %d for {0}" % next_key
+            next_key += 1
+
+        history.append(dict(
+            (platform, dict(mapping)) for platform in platforms
+        ))
+
+    return history
+
+def benchmark(name, create_db, history):
+    timings = { "connect" : 0, "write" : 0, "read" : 0, "disconnect" : 0 }
+
+    for run in history:
+        db = create_db()
+
+        start = time.time()
+        db.connect()
+        timings["connect"] += time.time() - start
+
+        start = time.time()
+        for platform in platforms:
+            db.write_string_mapping_for_platform(platform, run[platform])
+        timings["write"] += time.time() - start
+
+        start = time.time()
+        for platform in platforms:
+            db.get_native_translations_for_platform(platform)
+        db.get_all_native_translations()
+        timings["read"] += time.time() - start
+
+        start = time.time()
+        db.disconnect()
+        timings["disconnect"] += time.time() - start
+
+    print "%-10s %10.2f %10.2f %10.2f %10.2f %10.2f" % (
+        name,
+        timings["connect"],
+        timings["write"],
+        timings["read"],
+        timings["disconnect"],
+        sum(timings.values()),
+    )
+
+def main():
+    option_parser = optparse.OptionParser()
+    option_parser.add_option("--keys", type = "int", default = 200000)
+    option_parser.add_option("--runs", type = "int", default = 5)
+    options, args = option_parser.parse_args()
+
+    history = create_history(options.keys, options.runs)
+    temp_dir = tempfile.mkdtemp()
+
+    try:
+        print "%-10s %10s %10s %10s %10s %10s" % (
+            "", "connect", "write", "read", "disconnect", "total"
+        )
+
+        benchmark(
+            "SQLite",
+            lambda : database.SQLite(os.path.join(temp_dir, "saved.sql")),
+            history
+        )
+        benchmark(
+            "FlatFile",
+            lambda : database.FlatFile(os.path.join(temp_dir, "saved")),
+            history
+        )
+
+    finally:
+        shutil.rmtree(temp_dir)
+
+if __name__ == "__main__":
+    main()
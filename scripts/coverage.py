@@ -0,0 +1,17 @@
+"""Reports which translation keys are mapped on which platforms, or which
+native translations differ between platforms, as tab-separated text.
+
+Usage: python coverage.py [coverage|differences] [path] [arguments]
+"""
+
+import os
+import sys
+
+sys.path.insert(
+    0,
+    os.path.join(os.path.abspath(os.path.dirname(sys.argv[0])), "..")
+)
+
+import burton
+
+burton.report()
@@ -0,0 +1,31 @@
+"""Merges SQL files saved by runs of different platforms which started from
+the same SQL file, so that platforms can run concurrently on different
+machines. The platforms are merged in the order the files are passed in.
+
+Usage: python merge_database.py base.sql output.sql platform.sql...
+"""
+
+import os
+import sys
+
+sys.path.insert(
+    0,
+    os.path.join(os.path.abspath(os.path.dirname(sys.argv[0])), "..")
+)
+
+import burton
+
+burton.setup_default_logger()
+logger = burton.logging.getLogger(burton.logger_name)
+
+if len(sys.argv) < 4:
+    logger.error(
+        "usage: python " + sys.argv[0] + " base.sql output.sql platform.sql..."
+    )
+    exit(1)
+
+try:
+    burton.database.merge_databases(sys.argv[1], sys.argv[3:], sys.argv[2])
+except burton.database.MergeConflict as e:
+    logger.error(e.value)
+    exit(1)